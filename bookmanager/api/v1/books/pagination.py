@@ -0,0 +1,105 @@
+from django.conf import settings
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+from rest_framework.utils.urls import replace_query_param
+
+from bookmanager.books.counts import filterset_count, get_count
+from bookmanager.books.search import is_ranked
+
+PAGINATE_BY = settings.PAGINATE_BY  # type: ignore
+MAX_PAGE_SIZE = settings.BOOKS_API_MAX_PAGE_SIZE  # type: ignore
+MAX_OFFSET = settings.BOOKS_API_MAX_OFFSET  # type: ignore
+
+
+class BookLimitOffsetPagination(LimitOffsetPagination):
+    """Limit/offset pagination with cached count and bounded offset.
+
+    Counts of many books are estimated (see counts module). Estimated count
+    is only returned, next link is given when there is a book after page.
+    """
+
+    default_limit = PAGINATE_BY
+    max_limit = MAX_PAGE_SIZE
+    count_exact = True
+    next_exists = False
+
+    def get_offset(self, request):
+        offset = super().get_offset(request)
+        if offset > MAX_OFFSET:
+            raise NotFound(f"Offset can't exceed {MAX_OFFSET}, use cursor pagination.")
+        return offset
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # request and view are needed by get_count
+        self.request = request
+        self.view = view
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.offset = self.get_offset(request)
+        self.count = self.get_count(queryset)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+        if self.count_exact:
+            if self.count == 0 or self.offset > self.count:
+                return []
+            return list(queryset[self.offset : self.offset + self.limit])
+        # one book more tells if next page exists
+        rows = list(queryset[self.offset : self.offset + self.limit + 1])
+        self.next_exists = len(rows) > self.limit
+        return rows[: self.limit]
+
+    def get_next_link(self):
+        if self.count_exact:
+            return super().get_next_link()
+        if not self.next_exists:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(
+            url, self.offset_query_param, self.offset + self.limit
+        )
+
+    def get_count(self, queryset):
+        # count is cached under filters applied by view, not under all params
+        filterset = DjangoFilterBackend().get_filterset(
+            self.request, queryset, self.view
+        )
+        scope, filters = filterset_count(filterset)
+        count, self.count_exact = get_count(queryset, filters, scope)
+        return count
+
+
+class BookPagination(CursorPagination):
+    """Cursor pagination of books ordered by title and id.
+
+    Requests with offset param and full text searches, ordered by relevance,
+    are paginated with limit and offset instead. Both page sizes are set by
+    limit param, up to BOOKS_API_MAX_PAGE_SIZE.
+    """
+
+    ordering = ("title", "id")
+    page_size = PAGINATE_BY
+    page_size_query_param = "limit"
+    max_page_size = MAX_PAGE_SIZE
+
+    offset_pagination = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        offset_param = BookLimitOffsetPagination.offset_query_param
+        if offset_param in request.query_params or is_ranked(queryset):
+            self.offset_pagination = BookLimitOffsetPagination()
+            return self.offset_pagination.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.offset_pagination is not None:
+            return self.offset_pagination.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_fields(self, view):
+        fields = super().get_schema_fields(view)
+        offset_fields = BookLimitOffsetPagination().get_schema_fields(view)
+        return fields + [field for field in offset_fields if field.name == "offset"]
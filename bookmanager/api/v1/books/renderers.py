@@ -0,0 +1,16 @@
+from rest_framework.renderers import JSONRenderer
+
+from bookmanager.books.jsonutils import dumps_json
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer encoding with orjson, output is the same."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        if indent or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps_json(data)
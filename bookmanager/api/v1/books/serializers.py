@@ -1,10 +1,25 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from isbn_field.validators import ISBNValidator
 from rest_framework import serializers
 
-from bookmanager.books.models import Book
+from bookmanager.books.bulk import MODES
+from bookmanager.books.models import Book, ImportJob, clean_isbn
+
+GOOGLE_QUERY_KEYS = ["search", "intitle", "inauthor"]
+MAX_BATCH = settings.BOOKS_API_MAX_BATCH  # type: ignore
+MAX_BULK = settings.BOOKS_API_MAX_BULK  # type: ignore
+BULK_MODE = settings.BOOKS_API_BULK_MODE  # type: ignore
 
 
 class BookSerializer(serializers.ModelSerializer):
-    """Book serializer for all fields."""
+    """Book serializer for all fields or only fields given by fields kwarg."""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
 
     class Meta:
         model = Book
@@ -19,3 +34,125 @@ class BookSerializer(serializers.ModelSerializer):
             "cover_uri",
             "language",
         ]
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    """Import job serializer, only query is writable."""
+
+    class Meta:
+        model = ImportJob
+        fields = [
+            "id",
+            "query",
+            "status",
+            "total",
+            "pages_total",
+            "pages_done",
+            "pages_failed",
+            "imported",
+            "updated",
+            "skipped",
+            "invalid",
+            "error",
+            "created",
+            "modified",
+        ]
+        read_only_fields = [field for field in fields if field != "query"]
+
+    def validate_query(self, query):
+        """Keep only google search keys, at least one is required."""
+        if not isinstance(query, dict):
+            raise serializers.ValidationError("Query must be an object.")
+        query = {key: str(query[key]) for key in GOOGLE_QUERY_KEYS if query.get(key)}
+        if not query:
+            raise serializers.ValidationError(
+                f"Provide at least one of {', '.join(GOOGLE_QUERY_KEYS)}."
+            )
+        return query
+
+
+class FederatedSearchQuerySerializer(serializers.Serializer):
+    """Google search query params, at least one is required."""
+
+    search = serializers.CharField(max_length=200, required=False)
+    intitle = serializers.CharField(max_length=200, required=False)
+    inauthor = serializers.CharField(max_length=200, required=False)
+    page = serializers.IntegerField(min_value=1, required=False, default=1)
+
+    def validate(self, attrs):
+        if not any(attrs.get(key) for key in GOOGLE_QUERY_KEYS):
+            raise serializers.ValidationError(
+                f"Provide at least one of {', '.join(GOOGLE_QUERY_KEYS)}."
+            )
+        return attrs
+
+
+class FederatedBookSerializer(serializers.Serializer):
+    """Book found in catalog or in google api.
+
+    Id is catalog book id for books in catalog and google volume id for
+    others.
+    """
+
+    id = serializers.CharField()
+    title = serializers.CharField()
+    author = serializers.CharField()
+    published_date = serializers.CharField()
+    isbn_10 = serializers.CharField(allow_null=True)
+    isbn_13 = serializers.CharField(allow_null=True)
+    pages = serializers.CharField()
+    language = serializers.CharField()
+    cover_uri = serializers.CharField()
+    google_id = serializers.CharField(allow_null=True)
+    in_catalog = serializers.BooleanField()
+    source = serializers.CharField()
+
+
+class BooksBatchSerializer(serializers.Serializer):
+    """Ids or isbns of looked up books, exactly one list is required."""
+
+    ids = serializers.ListField(
+        child=serializers.UUIDField(), required=False, max_length=MAX_BATCH
+    )
+    isbns = serializers.ListField(
+        child=serializers.CharField(max_length=17),
+        required=False,
+        max_length=MAX_BATCH,
+    )
+
+    def validate_isbns(self, value):
+        """Return isbns without dashes and spaces, like saved ones."""
+        isbns = [clean_isbn(isbn) for isbn in value]
+        errors = {}
+        for index, isbn in enumerate(isbns):
+            try:
+                ISBNValidator(isbn)
+            except DjangoValidationError as e:
+                errors[index] = e.messages
+        if errors:
+            raise serializers.ValidationError(errors)
+        return isbns
+
+    def validate(self, attrs):
+        given = [key for key in ("ids", "isbns") if attrs.get(key)]
+        if len(given) != 1:
+            raise serializers.ValidationError("Provide either ids or isbns.")
+        return attrs
+
+
+class BooksBulkSerializer(serializers.Serializer):
+    """Books of bulk create or update, validated by bulk module."""
+
+    mode = serializers.ChoiceField(choices=MODES, default=BULK_MODE)
+    books = serializers.ListField(
+        child=serializers.JSONField(), allow_empty=False, max_length=MAX_BULK
+    )
+
+
+class BooksBulkDeleteSerializer(serializers.Serializer):
+    """Ids of books to delete, validated by bulk module."""
+
+    mode = serializers.ChoiceField(choices=MODES, default=BULK_MODE)
+    ids = serializers.ListField(
+        child=serializers.JSONField(), allow_empty=False, max_length=MAX_BULK
+    )
@@ -5,7 +5,18 @@ from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 from rest_framework import permissions
 
-from .views import BooksDetail, BooksList, BooksSearch
+from .views import (
+    BooksBatch,
+    BooksBulk,
+    BooksDetail,
+    BooksExport,
+    BooksList,
+    BooksSearch,
+    FederatedSearch,
+    GoogleApiStatus,
+    ImportJobCreate,
+    ImportJobDetail,
+)
 
 schema_view = get_schema_view(
     openapi.Info(
@@ -24,6 +35,13 @@ urlpatterns = [
     path("", RedirectView.as_view(url="list")),
     path("list", BooksList.as_view(), name="list"),
     path("search", BooksSearch.as_view(), name="search"),
+    path("export.<str:export_format>", BooksExport.as_view(), name="export"),
     path("detail/<str:pk>", BooksDetail.as_view(), name="detail"),
+    path("batch", BooksBatch.as_view(), name="batch"),
+    path("bulk", BooksBulk.as_view(), name="bulk"),
+    path("federated-search", FederatedSearch.as_view(), name="federated-search"),
+    path("import-job", ImportJobCreate.as_view(), name="import-job-create"),
+    path("import-job/<str:pk>", ImportJobDetail.as_view(), name="import-job"),
+    path("google-status", GoogleApiStatus.as_view(), name="google-status"),
     path("docs", schema_view.with_ui(cache_timeout=0), name="docs"),
 ]
@@ -1,25 +1,121 @@
+from typing import List
+
 from django.conf import settings
-from rest_framework.generics import ListAPIView, RetrieveAPIView
+from django.db.models import Q
+from django.http import Http404, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from rest_framework.exceptions import Throttled, ValidationError
+from rest_framework.generics import (
+    CreateAPIView,
+    GenericAPIView,
+    ListAPIView,
+    RetrieveAPIView,
+)
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from bookmanager.books.bulk import (
+    ATOMIC,
+    BulkWrite,
+    create_books,
+    delete_books,
+    update_books,
+)
+from bookmanager.books.catalog import catalog_condition
+from bookmanager.books.export import FORMATS, book_values, export_books, represent_books
+from bookmanager.books.federated import federated_search
 from bookmanager.books.filters import InternalBooksFilter
-from bookmanager.books.models import Book
+from bookmanager.books.google_cache import stats
+from bookmanager.books.google_client import get_client
+from bookmanager.books.jobs import can_start_import_job, start_import_job
+from bookmanager.books.models import Book, ImportJob
+
+from .pagination import BookPagination
+from .renderers import FastJSONRenderer
+from .serializers import (
+    BooksBatchSerializer,
+    BooksBulkDeleteSerializer,
+    BooksBulkSerializer,
+    BookSerializer,
+    FederatedBookSerializer,
+    FederatedSearchQuerySerializer,
+    ImportJobSerializer,
+)
+
+
+class SparseFieldsMixin(object):
+    """Return only book fields listed in fields param, like fields=id,title.
+
+    Fields are returned in the order of serializer fields, unknown fields
+    are rejected with 400 response.
+    """
 
-from .serializers import BookSerializer
+    fields_param = "fields"
 
-PAGINATE_BY = settings.PAGINATE_BY  # type: ignore
+    def get_fields(self) -> List[str]:
+        allowed = BookSerializer.Meta.fields
+        value = self.request.query_params.get(self.fields_param, "")
+        requested = {name.strip() for name in value.split(",") if name.strip()}
+        if not requested:
+            return allowed
+        unknown = requested - set(allowed)
+        if unknown:
+            raise ValidationError(
+                {
+                    self.fields_param: [
+                        f"Unknown fields: {', '.join(sorted(unknown))}. "
+                        f"Allowed fields: {', '.join(allowed)}."
+                    ]
+                }
+            )
+        return [name for name in allowed if name in requested]
 
 
-class BookListBaseMixin(object):
+class BookListBaseMixin(SparseFieldsMixin):
+    """Serialize books from values() rows, without building Book objects.
+
+    Data is the same as data of serializer_class, which describes it in docs.
+    """
+
     queryset = Book.objects.all()
     serializer_class = BookSerializer
-    paginate_by = PAGINATE_BY
-    order_by = "title"
+    pagination_class = BookPagination
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
 
+    def list(self, request, *args, **kwargs):
+        fields = self.get_fields()
+        # cursor position is read from title of last book on page
+        selected = [
+            name
+            for name in BookSerializer.Meta.fields
+            if name in fields or name in BookPagination.ordering
+        ]
+        queryset = self.filter_queryset(self.get_queryset())
+        queryset = book_values(queryset, selected)
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(represent_books(list(queryset), fields))
+        return self.get_paginated_response(represent_books(page, fields))
 
+
+@method_decorator(catalog_condition, name="dispatch")
 class BooksList(BookListBaseMixin, ListAPIView):
-    """Return list of books ordered by title."""
+    """Return list of books ordered by title.
+
+    Pages are linked by cursor in next and previous urls, limit param sets
+    page size. With offset param pages are selected by offset instead and
+    count of books is returned. Fields param, like fields=id,title,isbn_13,
+    limits returned fields.
 
+    Responses have ETag and Last-Modified headers changed by every change
+    of books, conditional requests get 304 when nothing changed.
 
+    """
+
+
+@method_decorator(catalog_condition, name="dispatch")
 class BooksSearch(BookListBaseMixin, ListAPIView):
     """Filter books by given fields.
 
@@ -30,15 +126,56 @@ class BooksSearch(BookListBaseMixin, ListAPIView):
     - published_date search within given date range
     - language
 
+    Pagination is the same as in list, but books matching title or author
+    are ordered by relevance and paginated by limit and offset.
+
     """
 
     filterset_class = InternalBooksFilter
 
 
-class BooksDetail(RetrieveAPIView):
+class BooksExport(GenericAPIView):
+    """Stream all books matching filters as JSON lines or CSV.
+
+    Format is given by extension: export.ndjson or export.csv. Filters are
+    the same as in search, books are ordered by title (or relevance when
+    searched by title or author). Response is gzipped when client accepts
+    gzip encoding.
+
+    """
+
+    queryset = Book.objects.all()
+    # fields of exported rows
+    serializer_class = BookSerializer
+    filterset_class = InternalBooksFilter
+
+    def perform_content_negotiation(self, request, force=False):
+        # clients may accept only export format, errors are rendered as json
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, export_format):
+        if export_format not in FORMATS:
+            raise Http404("Unknown export format")
+        queryset = self.filter_queryset(self.get_queryset())
+        gzip = "gzip" in request.META.get("HTTP_ACCEPT_ENCODING", "")
+        response = StreamingHttpResponse(
+            export_books(queryset, export_format, gzip=gzip),
+            content_type=f"{FORMATS[export_format]}; charset=utf-8",
+        )
+        response[
+            "Content-Disposition"
+        ] = f'attachment; filename="books.{export_format}"'
+        response["Vary"] = "Accept-Encoding"
+        if gzip:
+            response["Content-Encoding"] = "gzip"
+        return response
+
+
+@method_decorator(catalog_condition, name="dispatch")
+class BooksDetail(SparseFieldsMixin, RetrieveAPIView):
     """Return book details for given pk.
 
-    Fields that values are returned:
+    Fields that values are returned, fields param may list some of them:
 
     - id
     - title
@@ -55,3 +192,198 @@ class BooksDetail(RetrieveAPIView):
     kwargs = {}
     queryset = Book.objects.all()
     serializer_class = BookSerializer
+
+    def get_queryset(self):
+        return super().get_queryset().only(*self.get_fields())
+
+    def get_serializer(self, *args, **kwargs):
+        return super().get_serializer(*args, fields=self.get_fields(), **kwargs)
+
+
+@method_decorator(catalog_condition, name="dispatch")
+class BooksBatch(SparseFieldsMixin, APIView):
+    """Return many books by ids or isbns with one query.
+
+    Query params (or POST body lists for long lists):
+
+    - ids - comma separated book ids
+    - isbns - comma separated isbn 10 or 13 numbers
+
+    Up to BOOKS_API_MAX_BATCH ids or isbns can be given. Results are in
+    requested order, one for every id or isbn, with found false and book
+    null when there is no such book. Fields param limits book fields.
+
+    """
+
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    def get(self, request):
+        data = {
+            key: [value for value in request.query_params[key].split(",") if value]
+            for key in ("ids", "isbns")
+            if key in request.query_params
+        }
+        return self.batch(data)
+
+    def post(self, request):
+        return self.batch(request.data)
+
+    def batch(self, data):
+        query = BooksBatchSerializer(data=data)
+        query.is_valid(raise_exception=True)
+        fields = self.get_fields()
+        if query.validated_data.get("ids"):
+            key = "id"
+            requested = [str(pk) for pk in query.validated_data["ids"]]
+            lookup = Q(pk__in=requested)
+            keys = ["id"]
+        else:
+            key = "isbn"
+            requested = query.validated_data["isbns"]
+            lookup = Q(isbn_13__in=requested) | Q(isbn_10__in=requested)
+            keys = ["isbn_10", "isbn_13"]
+
+        selected = [
+            name for name in BookSerializer.Meta.fields if name in fields + keys
+        ]
+        rows = represent_books(list(book_values(Book.objects.filter(lookup), selected)))
+        books = {}
+        # isbn 13 matches are preferred over isbn 10 ones
+        for name in reversed(keys):
+            for row in rows:
+                if row[name]:
+                    books.setdefault(row[name], row)
+
+        results = []
+        for value in requested:
+            row = books.get(value)
+            book = {name: row[name] for name in fields} if row else None
+            results.append({key: value, "found": row is not None, "book": book})
+        return Response({"results": results})
+
+
+class BooksBulk(APIView):
+    """Create (POST), update (PATCH) or delete (DELETE) many books at once.
+
+    Body of create and update is an object with:
+
+    - books - list of books, with all required fields when created or with
+      id and changed fields when updated
+    - mode - atomic (nothing is written when any book is invalid) or
+      best-effort (valid books are written), BOOKS_API_BULK_MODE by default
+
+    Body of delete has ids list instead of books. Up to BOOKS_API_MAX_BULK
+    books are validated at once and written in chunks. Response has result
+    of every book, in request order, with its index, id, status (created,
+    updated, deleted, invalid, not_found, not_saved or failed) and errors.
+    Atomic requests with any failed book get 400 response. Only
+    authenticated users may write books in bulk.
+
+    """
+
+    permission_classes = [IsAuthenticated]
+    batch_size = settings.BOOKS_API_BULK_BATCH_SIZE  # type: ignore
+
+    def post(self, request):
+        return self.bulk_write(BooksBulkSerializer, "books", create_books)
+
+    def patch(self, request):
+        return self.bulk_write(BooksBulkSerializer, "books", update_books)
+
+    def delete(self, request):
+        return self.bulk_write(BooksBulkDeleteSerializer, "ids", delete_books)
+
+    def bulk_write(self, serializer_class, key, write):
+        serializer = serializer_class(data=self.request.data)
+        serializer.is_valid(raise_exception=True)
+        mode = serializer.validated_data["mode"]
+        bulk = write(serializer.validated_data[key], mode, self.batch_size)
+        return Response(
+            self.summary(bulk),
+            status=400 if mode == ATOMIC and bulk.failed else 200,
+        )
+
+    def summary(self, bulk: BulkWrite) -> dict:
+        return {
+            "mode": bulk.mode,
+            "saved": bulk.saved,
+            "failed": bulk.failed,
+            "results": bulk.results,
+        }
+
+
+class FederatedSearch(APIView):
+    """Search books in catalog and google api at once.
+
+    Query params:
+
+    - search
+    - intitle
+    - inauthor
+    - page - page of google results
+
+    Catalog books come first, google books already in catalog are left out
+    or marked with in_catalog. When google doesn't answer within
+    GOOGLE_FEDERATED_TIMEOUT seconds only catalog books are returned and
+    remote_pending is true.
+
+    """
+
+    def get(self, request):
+        query = FederatedSearchQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        page = query.validated_data.pop("page")
+        results = federated_search(query.validated_data, page=page)
+        return Response(
+            {
+                "remote_pending": results.remote_pending,
+                "remote_status": results.remote_status,
+                "results": FederatedBookSerializer(results.books, many=True).data,
+            }
+        )
+
+
+class ImportJobCreate(CreateAPIView):
+    """Start background job importing all google api results for query.
+
+    Query is an object with at least one of keys:
+
+    - search
+    - intitle
+    - inauthor
+
+    Progress of created job is returned by import-job/<id> endpoint. Up to
+    GOOGLE_IMPORT_MAX_RUNNING_JOBS jobs run at once, more get 429 response.
+
+    """
+
+    serializer_class = ImportJobSerializer
+
+    def perform_create(self, serializer):
+        if not can_start_import_job():
+            raise Throttled(detail="Too many import jobs are running.")
+        serializer.instance = start_import_job(serializer.validated_data["query"])
+
+
+class ImportJobDetail(RetrieveAPIView):
+    """Return status and progress of import job for given pk."""
+
+    queryset = ImportJob.objects.all()
+    serializer_class = ImportJobSerializer
+
+
+class GoogleApiStatus(APIView):
+    """Return google api circuit breaker state and cache counters.
+
+    Values describe process which handled the request:
+
+    - breaker - state (closed, open or half-open), consecutive failures and
+      seconds until open circuit lets trial call through
+    - cache - hits, misses and stale responses served
+
+    """
+
+    def get(self, request):
+        return Response(
+            {"breaker": get_client().breaker.as_dict(), "cache": stats.as_dict()}
+        )
@@ -1,6 +1,22 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_migrate, post_save
+
+
+def create_search_index(using, **kwargs):
+    # tables rebuilt by migrations lose full text index triggers
+    from .search import create_search_index
+
+    create_search_index(using)
 
 
 class BooksConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "bookmanager.books"
+
+    def ready(self):
+        from .catalog import catalog_changed
+
+        post_migrate.connect(create_search_index, sender=self)
+        book = self.get_model("Book")
+        post_save.connect(catalog_changed, sender=book)
+        post_delete.connect(catalog_changed, sender=book)
@@ -0,0 +1,356 @@
+"""Validation and saving of many books at once.
+
+Book.save validates and saves books one by one, functions below validate
+whole batch and save it with bulk_create and bulk_update.
+
+create_books, update_books and delete_books validate all rows first and
+report result of every row. In atomic mode nothing is written when any row
+is invalid, in best-effort mode valid rows are written in chunks, each in
+its own transaction.
+"""
+
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+from django.db.models import Q
+
+from .catalog import catalog_changed, catalog_changes
+from .models import Book
+
+BOOK_FIELDS = [
+    "title",
+    "author",
+    "published_date",
+    "isbn_10",
+    "isbn_13",
+    "pages",
+    "cover_uri",
+    "language",
+    "google_id",
+]
+UPDATE_FIELDS = [*BOOK_FIELDS, "slug", "modified_date"]
+
+
+def build_book(data: dict) -> Book:
+    """Create unsaved Book from dict, keys other than BOOK_FIELDS are ignored."""
+    book = Book(**{field: data[field] for field in BOOK_FIELDS if field in data})
+    book.prepare()
+    return book
+
+
+def validate_books(rows: Iterable[dict]) -> Tuple[List[Book], Dict[int, dict]]:
+    """Build and validate books from rows.
+
+    Return valid books and errors of invalid rows by row index.
+    """
+    books = []
+    errors = {}
+    for index, row in enumerate(rows):
+        book = build_book(row)
+        try:
+            book.full_clean(validate_unique=False)
+        except ValidationError as e:
+            errors[index] = e.message_dict
+        else:
+            books.append(book)
+    return books, errors
+
+
+class UpsertResult(NamedTuple):
+    created: List[Book]
+    updated: List[Book]
+    skipped: int
+
+
+def book_keys(book: Book) -> set:
+    """Return identifiers used to match imported book with saved ones."""
+    keys = {("isbn", isbn) for isbn in (book.isbn_10, book.isbn_13) if isbn}
+    if book.google_id:
+        keys.add(("google_id", book.google_id))
+    return keys
+
+
+def saved_books(books: List[Book]) -> Dict[tuple, Tuple]:
+    """Return (pk, google_id) of saved books by their keys in one query."""
+    google_ids = [book.google_id for book in books if book.google_id]
+    isbns = [key for book in books for kind, key in book_keys(book) if kind == "isbn"]
+    lookup = Q(google_id__in=google_ids) | Q(isbn_10__in=isbns) | Q(isbn_13__in=isbns)
+
+    saved = {}  # type: Dict[tuple, Tuple]
+    rows = Book.objects.filter(lookup).values_list(
+        "pk", "google_id", "isbn_10", "isbn_13"
+    )
+    for pk, google_id, isbn_10, isbn_13 in rows:
+        if google_id:
+            saved[("google_id", google_id)] = (pk, google_id)
+        for isbn in (isbn_10, isbn_13):
+            if isbn:
+                saved.setdefault(("isbn", isbn), (pk, google_id))
+    return saved
+
+
+def upsert_books(books: List[Book], batch_size: int = None) -> UpsertResult:
+    """Create new books and update already saved ones in one transaction.
+
+    Books are matched with saved ones by google id first, then by isbn, using
+    one indexed query. Books repeating identifiers of earlier books in the
+    list or matching the same saved book are skipped, so are new books which
+    couldn't be inserted because of a conflict (e.g. imported concurrently).
+    """
+    unique_books = []
+    seen = set()  # type: set
+    for book in books:
+        keys = book_keys(book)
+        if keys & seen:
+            continue
+        seen |= keys
+        unique_books.append(book)
+
+    saved = saved_books(unique_books) if seen else {}
+    created, updated = [], []
+    updated_pks = set()  # type: set
+    today = date.today()
+    for book in unique_books:
+        match = saved.get(("google_id", book.google_id)) or next(
+            (saved[key] for key in book_keys(book) if key in saved), None
+        )
+        if match is None:
+            created.append(book)
+            continue
+        if match[0] in updated_pks:
+            # one book matched by google id, other by isbn
+            continue
+        updated_pks.add(match[0])
+        book.pk, google_id = match
+        # book matched by isbn keeps google id it was imported with
+        book.google_id = google_id or book.google_id
+        book.modified_date = today
+        book._state.adding = False
+        updated.append(book)
+
+    with transaction.atomic():
+        Book.objects.bulk_create(created, batch_size=batch_size, ignore_conflicts=True)
+        if created:
+            # ignored rows aren't reported by bulk_create, ids are set client side
+            pks = [book.pk for book in created]
+            inserted = set(Book.objects.filter(pk__in=pks).values_list("pk", flat=True))
+            created = [book for book in created if book.pk in inserted]
+        Book.objects.bulk_update(updated, UPDATE_FIELDS, batch_size=batch_size)
+        # bulk operations don't send signals
+        catalog_changed()
+    return UpsertResult(created, updated, len(books) - len(created) - len(updated))
+
+
+ATOMIC = "atomic"
+BEST_EFFORT = "best-effort"
+MODES = [ATOMIC, BEST_EFFORT]
+
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+INVALID = "invalid"
+NOT_FOUND = "not_found"
+# valid rows not written in atomic mode because of other rows
+NOT_SAVED = "not_saved"
+FAILED = "failed"
+
+
+def row_errors(row: Any, allowed: List[str]) -> Optional[dict]:
+    """Return errors of row which isn't object of allowed string fields."""
+    if not isinstance(row, dict):
+        return {"non_field_errors": ["Expected an object."]}
+    errors = {}
+    for field, value in row.items():
+        if field not in allowed:
+            errors[field] = ["Unknown field."]
+        elif value is not None and not isinstance(value, str):
+            errors[field] = ["Expected a string."]
+    return errors or None
+
+
+def clean_book(book: Book) -> Optional[dict]:
+    try:
+        book.full_clean(validate_unique=False)
+    except ValidationError as e:
+        return e.message_dict
+    return None
+
+
+def google_id_errors(books: Dict[int, Book]) -> Dict[int, dict]:
+    """Return errors of books with google id of other book, in one query."""
+    errors = {}
+    indexes = {}  # type: Dict[str, int]
+    for index, book in books.items():
+        if not book.google_id:
+            continue
+        if book.google_id in indexes:
+            errors[index] = {"google_id": ["Google volume id is repeated."]}
+        else:
+            indexes[book.google_id] = index
+
+    taken = Book.objects.filter(google_id__in=list(indexes)).values_list(
+        "google_id", "pk"
+    )
+    for google_id, pk in taken:
+        index = indexes[google_id]
+        if books[index].pk != pk:
+            errors[index] = {
+                "google_id": ["Book with this Google volume id already exists."]
+            }
+    return errors
+
+
+class BulkWrite:
+    """Rows of bulk operation, valid items to write and results by index."""
+
+    def __init__(self, size: int, mode: str, batch_size: int):
+        self.results = [{"index": index} for index in range(size)]
+        self.items = {}  # type: Dict[int, Any]
+        self.mode = mode
+        self.batch_size = batch_size
+        self.saved = 0
+
+    def fail(self, index: int, status: str, errors: dict = None):
+        self.items.pop(index, None)
+        self.results[index]["status"] = status
+        if errors:
+            self.results[index]["errors"] = errors
+
+    @property
+    def failed(self) -> int:
+        return len(self.results) - self.saved
+
+    def write(self, write: Callable[[List[Any]], Any], status: str):
+        """Write valid items with write called for chunks of batch_size."""
+        if self.mode == ATOMIC and len(self.items) < len(self.results):
+            for index in list(self.items):
+                self.fail(index, NOT_SAVED)
+            return
+
+        indexes = list(self.items)
+        chunks = [
+            indexes[start : start + self.batch_size]
+            for start in range(0, len(indexes), self.batch_size)
+        ]
+        if self.mode == ATOMIC:
+            # all chunks in one transaction
+            chunks = [indexes] if indexes else []
+        for chunk in chunks:
+            try:
+                with transaction.atomic(), catalog_changes():
+                    for start in range(0, len(chunk), self.batch_size):
+                        batch = chunk[start : start + self.batch_size]
+                        write([self.items[index] for index in batch])
+                    # bulk_create and bulk_update don't send signals
+                    catalog_changed()
+            except DatabaseError as e:
+                for index in chunk:
+                    self.fail(index, FAILED, {"non_field_errors": [str(e)]})
+            else:
+                self.saved += len(chunk)
+                for index in chunk:
+                    self.results[index]["id"] = str(self.items[index].pk)
+                    self.results[index]["status"] = status
+
+
+def validate_new_books(bulk: BulkWrite, rows: List[Any]):
+    for index, row in enumerate(rows):
+        errors = row_errors(row, BOOK_FIELDS)
+        if errors is None:
+            book = build_book(row)
+            errors = clean_book(book)
+        if errors:
+            bulk.fail(index, INVALID, errors)
+        else:
+            bulk.items[index] = book
+    for index, errors in google_id_errors(bulk.items).items():
+        bulk.fail(index, INVALID, errors)
+
+
+def create_books(rows: List[Any], mode: str, batch_size: int) -> BulkWrite:
+    """Validate rows of book fields and create valid books."""
+    bulk = BulkWrite(len(rows), mode, batch_size)
+    validate_new_books(bulk, rows)
+    bulk.write(
+        lambda books: Book.objects.bulk_create(books, batch_size=batch_size),
+        CREATED,
+    )
+    return bulk
+
+
+def saved_books_by_id(bulk: BulkWrite, ids: Dict[int, Any]) -> Dict[int, Book]:
+    """Return saved books of valid unique ids (by row index) in one query."""
+    indexes = {}  # type: Dict[str, int]
+    for index, pk in ids.items():
+        try:
+            pk = str(Book._meta.pk.to_python(pk))
+        except ValidationError as e:
+            bulk.fail(index, INVALID, {"id": e.messages})
+            continue
+        bulk.results[index]["id"] = pk
+        if pk in indexes:
+            bulk.fail(index, INVALID, {"id": ["Id is repeated."]})
+        else:
+            indexes[pk] = index
+
+    saved = Book.objects.in_bulk(list(indexes))
+    books = {}
+    for pk, index in indexes.items():
+        book = saved.get(Book._meta.pk.to_python(pk))
+        if book is None:
+            bulk.fail(index, NOT_FOUND, {"id": ["Book not found."]})
+        else:
+            books[index] = book
+    return books
+
+
+def update_books(rows: List[Any], mode: str, batch_size: int) -> BulkWrite:
+    """Validate rows with id and changed fields of books and update them."""
+    bulk = BulkWrite(len(rows), mode, batch_size)
+    checked = {}
+    for index, row in enumerate(rows):
+        errors = row_errors(row, ["id", *BOOK_FIELDS])
+        if errors is None and not row.get("id"):
+            errors = {"id": ["This field is required."]}
+        if errors:
+            bulk.fail(index, INVALID, errors)
+        else:
+            checked[index] = row
+
+    books = saved_books_by_id(
+        bulk, {index: row["id"] for index, row in checked.items()}
+    )
+    today = date.today()
+    for index, book in books.items():
+        for field in BOOK_FIELDS:
+            if field in checked[index]:
+                setattr(book, field, checked[index][field])
+        book.prepare()
+        book.modified_date = today
+        errors = clean_book(book)
+        if errors:
+            bulk.fail(index, INVALID, errors)
+        else:
+            bulk.items[index] = book
+    for index, errors in google_id_errors(bulk.items).items():
+        bulk.fail(index, INVALID, errors)
+
+    bulk.write(
+        lambda books: Book.objects.bulk_update(books, UPDATE_FIELDS),
+        UPDATED,
+    )
+    return bulk
+
+
+def delete_books(ids: List[Any], mode: str, batch_size: int) -> BulkWrite:
+    """Delete books with given ids."""
+    bulk = BulkWrite(len(ids), mode, batch_size)
+    bulk.items = saved_books_by_id(bulk, dict(enumerate(ids)))
+    # post_delete signals of books in a chunk bump catalog version once
+    bulk.write(
+        lambda books: Book.objects.filter(pk__in=[book.pk for book in books]).delete(),
+        DELETED,
+    )
+    return bulk
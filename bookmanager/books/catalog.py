@@ -0,0 +1,132 @@
+"""Version of books catalog and conditional responses of book lists.
+
+CatalogVersion row is updated in the same transaction as books, on every
+save and delete (signal handlers) and by bulk operations, which call
+catalog_changed as they don't send signals. Requests see version matching
+books they read and all processes share it. Writes of many books wrapped in
+catalog_changes() bump version once, however many signals they send.
+
+Book lists and details are served with strong ETag made of version and
+requested url and with Last-Modified of last write, so unchanged responses
+are answered with 304 before books are queried. HTML pages get weak ETag,
+as responses rendering CSRF token differ in bytes on every render. Pages
+made conditional must not render CSRF token, 304 response wouldn't set
+CSRF cookie.
+"""
+
+import hashlib
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional, Tuple
+
+from django.contrib.messages import get_messages
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from .models import CatalogVersion
+
+CATALOG_PK = 1
+
+
+def catalog_changed(**kwargs):
+    """Increment catalog version, used as Book post_save/post_delete handler.
+
+    Inside catalog_changes() block the change is only recorded.
+    """
+    connection = transaction.get_connection(kwargs.get("using"))
+    if getattr(connection, "catalog_changed", None) is not None:
+        connection.catalog_changed = True
+        return
+
+    now = timezone.now()
+    versions = CatalogVersion.objects.filter(pk=CATALOG_PK)
+    if versions.update(version=F("version") + 1, modified=now):
+        return
+    try:
+        with transaction.atomic():
+            CatalogVersion.objects.create(pk=CATALOG_PK, version=1, modified=now)
+    except IntegrityError:
+        # created concurrently
+        versions.update(version=F("version") + 1, modified=now)
+
+
+@contextmanager
+def catalog_changes(using: str = None):
+    """Increment catalog version once, at the end of block with any change.
+
+    Use inside transaction.atomic(), so version changes in the same
+    transaction as books. Nested blocks leave the change to outer one.
+    """
+    connection = transaction.get_connection(using)
+    if getattr(connection, "catalog_changed", None) is not None:
+        yield
+        return
+
+    connection.catalog_changed = False
+    try:
+        yield
+        changed = connection.catalog_changed
+    finally:
+        connection.catalog_changed = None
+    if changed:
+        catalog_changed(using=using)
+
+
+def catalog_state() -> Tuple[int, Optional[datetime]]:
+    """Return catalog version and time of last write (None if never)."""
+    state = (
+        CatalogVersion.objects.filter(pk=CATALOG_PK)
+        .values_list("version", "modified")
+        .first()
+    )
+    return state or (0, None)
+
+
+def catalog_version() -> int:
+    return catalog_state()[0]
+
+
+def request_catalog_state(request) -> Tuple[int, Optional[datetime]]:
+    # read once for both etag and last modified
+    if not hasattr(request, "catalog_state"):
+        request.catalog_state = catalog_state()
+    return request.catalog_state
+
+
+def has_messages(request) -> bool:
+    # pages with flash messages differ from cached ones
+    return hasattr(request, "_messages") and len(get_messages(request)) > 0
+
+
+def catalog_etag(request, *args, **kwargs) -> Optional[str]:
+    if has_messages(request):
+        return None
+    version = request_catalog_state(request)[0]
+    representation = "\n".join(
+        [request.get_full_path(), request.META.get("HTTP_ACCEPT", "")]
+    )
+    digest = hashlib.sha1(representation.encode()).hexdigest()[:16]
+    return f"{version}-{digest}"
+
+
+def catalog_last_modified(request, *args, **kwargs) -> Optional[datetime]:
+    if has_messages(request):
+        return None
+    return request_catalog_state(request)[1]
+
+
+catalog_condition = condition(
+    etag_func=catalog_etag, last_modified_func=catalog_last_modified
+)
+
+
+def catalog_page_etag(request, *args, **kwargs) -> Optional[str]:
+    etag = catalog_etag(request)
+    return f'W/"{etag}"' if etag else None
+
+
+catalog_page_condition = condition(
+    etag_func=catalog_page_etag, last_modified_func=catalog_last_modified
+)
@@ -0,0 +1,162 @@
+"""Counting rows of paginated book lists.
+
+Exact counts are cached in "default" cache per normalized filter. Cache keys
+include catalog version (see catalog module), which is bumped on every Book
+write, so counts cached before a write are never read again.
+
+Counting is bounded: rows are counted only up to
+BOOKS_COUNT_ESTIMATE_THRESHOLD, above it count is estimated from share of
+matching rows in a sample of BOOKS_COUNT_SAMPLE_SIZE books. Ids are random
+uuids, so first books in id order are a random sample. Estimates are only
+displayed, pages of lists with estimated count don't know the last page and
+are checked by fetching one row more than page size.
+"""
+
+import hashlib
+import json
+from typing import Any, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+from .catalog import catalog_version
+
+config = settings  # type: Any
+
+
+def count_key(model, filters: dict, scope: str = "") -> str:
+    """Return cache key of count of model rows matching filters.
+
+    Empty filters are dropped and values stripped, so equal searches share
+    the cached count. Scope tells what filters rows, see filterset_count.
+    """
+    normalized = {
+        name: str(value).strip()
+        for name, value in filters.items()
+        if value not in (None, "") and str(value).strip()
+    }
+    digest = hashlib.sha1(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+    label = model._meta.label_lower
+    return f"books:count:{catalog_version()}:{label}:{scope}:{digest}"
+
+
+def estimate_count(queryset: QuerySet) -> int:
+    """Return count of queryset rows estimated from sample of all rows."""
+    model = queryset.model
+    sample_size = config.BOOKS_COUNT_SAMPLE_SIZE
+    sample = model.objects.order_by("pk").values("pk")[:sample_size]
+    total = cached_total(model)
+    sampled = min(total, sample_size)
+    if not sampled:
+        return 0
+    matching = queryset.filter(pk__in=sample).order_by().count()
+    return round(total * matching / sampled)
+
+
+def cached_total(model) -> int:
+    key = f"{count_key(model, {})}:total"
+    total = cache.get(key)
+    if total is None:
+        total = model.objects.count()
+        cache.set(key, total, config.BOOKS_COUNT_CACHE_TTL)
+    return total
+
+
+def filterset_count(filterset) -> Tuple[str, dict]:
+    """Return scope and filters of count of rows filtered by filterset.
+
+    Filters are cleaned values of filterset form, lists without filterset
+    (None) have empty scope and filters.
+    """
+    if filterset is None or not filterset.is_bound or not filterset.is_valid():
+        return "", {}
+    filterset_class = type(filterset)
+    scope = f"{filterset_class.__module__}.{filterset_class.__qualname__}"
+    return scope, filterset.form.cleaned_data
+
+
+def get_count(queryset: QuerySet, filters: dict, scope: str = "") -> tuple:
+    """Return (count, exact) of queryset rows, made by filters of scope.
+
+    Count is exact up to BOOKS_COUNT_ESTIMATE_THRESHOLD and estimated above.
+    """
+    key = count_key(queryset.model, filters, scope)
+    cached = cache.get(key)
+    if cached is not None:
+        return tuple(cached)
+
+    threshold = config.BOOKS_COUNT_ESTIMATE_THRESHOLD
+    count = queryset.order_by()[: threshold + 1].count()
+    exact = count <= threshold
+    if not exact:
+        # estimate of common filter can't be lower than what was counted
+        count = max(estimate_count(queryset), count)
+    cache.set(key, (count, exact), config.BOOKS_COUNT_CACHE_TTL)
+    return count, exact
+
+
+class EstimatedCountPage(Page):
+    """Page of paginator with estimated count, which knows if next exists."""
+
+    def __init__(self, object_list, number, paginator, next_exists: bool):
+        super().__init__(object_list, number, paginator)
+        self.next_exists = next_exists
+
+    def has_next(self) -> bool:
+        return self.next_exists
+
+    def end_index(self) -> int:
+        return self.start_index() + len(self) - 1
+
+
+class CountCachingPaginator(Paginator):
+    """Paginator taking count from get_count, see count_exact.
+
+    With exact count pages are validated as usual. Estimated count (see
+    count_exact) is only displayed, any page number is valid as long as the
+    page has rows, num_pages shouldn't be used.
+    """
+
+    def __init__(self, object_list, per_page, filters=None, scope="", **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.filters = filters or {}
+        self.scope = scope
+
+    @cached_property
+    def count_and_exact(self) -> tuple:
+        return get_count(self.object_list, self.filters, self.scope)
+
+    @cached_property
+    def count(self) -> int:
+        return self.count_and_exact[0]
+
+    @property
+    def count_exact(self) -> bool:
+        return self.count_and_exact[1]
+
+    def validate_number(self, number):
+        if self.count_exact:
+            return super().validate_number(number)
+        # last page isn't known, page checks if it has rows
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger("That page number is not an integer")
+        if number < 1:
+            raise EmptyPage("That page number is less than 1")
+        return number
+
+    def page(self, number):
+        if self.count_exact:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom : bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage("That page contains no results")
+        return EstimatedCountPage(
+            rows[: self.per_page], number, self, len(rows) > self.per_page
+        )
@@ -0,0 +1,199 @@
+"""Streaming readers of google books api dumps.
+
+Dumps are files with volumes api responses or volume items, in JSON (single
+response, array of responses or array of items) or JSON lines format (one
+response or item per line). Files are read in chunks and items are yielded
+one by one, so the whole file is never loaded into memory. Files ending with
+.gz are decompressed on the fly.
+
+Readers yield (item, cursor) pairs, where cursor passed back to reader
+resumes reading right after that item. JSON lines cursor holds byte offset
+of line, so resume seeks to it. JSON cursor is a number of items, resuming
+parses the file from its start again and skips them.
+
+JSON lines readers yield None item for lines which aren't valid JSON and go
+on with next line. Malformed JSON dump can't be read past the error, reader
+raises ValueError.
+"""
+
+import gzip
+import json
+import re
+from typing import IO, Any, Iterator, Optional, Tuple
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = re.compile(r"\s*")
+JSON_LINES_EXTENSIONS = (".jsonl", ".ndjson")
+# longest JSON token cut by end of buffer without "Unterminated string" error:
+# \uXXXX escape, "false" literal
+MAX_CUT_TOKEN = 6
+
+
+def open_dump(path: str, mode: str = "rt") -> IO:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode, encoding="utf-8" if "t" in mode else None)
+    return open(path, mode, encoding="utf-8" if "t" in mode else None)
+
+
+def is_json_lines(path: str) -> bool:
+    if path.endswith(".gz"):
+        path = path[: -len(".gz")]
+    return path.endswith(JSON_LINES_EXTENSIONS)
+
+
+def volumes_of(value: Any) -> Iterator[dict]:
+    """Yield volume items of api response, list or single volume."""
+    if isinstance(value, list):
+        for item in value:
+            yield from volumes_of(item)
+    elif isinstance(value, dict):
+        if "items" in value:
+            yield from value["items"] or []
+        elif "volumeInfo" in value:
+            yield value
+
+
+class JSONStreamReader:
+    """Read JSON values from file without loading it whole.
+
+    Top level objects with "items" array and top level arrays are walked
+    element by element, only single elements are decoded at once.
+    """
+
+    def __init__(self, file: IO, chunk_size: int = CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.decoder = json.JSONDecoder()
+
+    def read_more(self) -> bool:
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            return False
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return next non whitespace character or empty string at the end."""
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()  # type: ignore
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.read_more():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Expected one of {chars!r}, got {char!r}")
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as error:
+                # error in the middle of buffer won't go away with more data
+                if not self.is_cut(error) or not self.read_more():
+                    raise
+                continue
+            # number at the end of buffer may continue in next chunk
+            if end == len(self.buffer) and self.read_more():
+                continue
+            self.pos = end
+            return value
+
+    def is_cut(self, error: json.JSONDecodeError) -> bool:
+        """Check if decode error may be caused by value cut by end of buffer."""
+        return (
+            error.msg.startswith("Unterminated string")
+            or error.pos >= len(self.buffer) - MAX_CUT_TOKEN
+        )
+
+    def array(self) -> Iterator[Any]:
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect(",]") == "]":
+                return
+
+    def response_items(self) -> Iterator[dict]:
+        """Yield items of object, streaming its "items" array."""
+        self.expect("{")
+        fields = {}
+        streamed = False
+        while self.peek() != "}":
+            key = self.value()
+            self.expect(":")
+            if key == "items" and self.peek() == "[":
+                yield from self.array()
+                streamed = True
+            else:
+                fields[key] = self.value()
+            if self.expect(",}") == "}":
+                self.pos -= 1
+        self.pos += 1
+        if not streamed:
+            yield from volumes_of(fields)
+
+    def items(self) -> Iterator[dict]:
+        while True:
+            char = self.peek()
+            if not char:
+                return
+            if char == "{":
+                yield from self.response_items()
+            elif char == "[":
+                for value in self.array():
+                    yield from volumes_of(value)
+            else:
+                raise ValueError(f"Unexpected {char!r} at top level of dump")
+
+
+def read_json(path: str, cursor: int = 0) -> Iterator[Tuple[dict, int]]:
+    """Read items of JSON dump, cursor is the number of already read items.
+
+    Items before cursor are parsed again, resume time grows with cursor.
+    """
+    with open_dump(path) as file:
+        for index, item in enumerate(JSONStreamReader(file).items(), start=1):
+            if index > cursor:
+                yield item, index
+
+
+def read_json_lines(
+    path: str, cursor: Tuple = (0, 0)
+) -> Iterator[Tuple[Optional[dict], Tuple]]:
+    """Read items of JSON lines dump, None for lines which aren't valid JSON.
+
+    Cursor is (offset of line, number of already read items of that line).
+    """
+    offset, skip = cursor
+    with open_dump(path, "rb") as file:
+        file.seek(offset)
+        for line in file:
+            if line.strip():
+                try:
+                    value = json.loads(line)
+                except ValueError:
+                    # resume after invalid line
+                    yield None, (offset + len(line), 0)
+                else:
+                    for index, item in enumerate(volumes_of(value), start=1):
+                        if index > skip:
+                            yield item, (offset, index)
+            offset += len(line)
+            skip = 0
+
+
+def read_dump(path: str, cursor=None) -> Iterator[Tuple[Optional[dict], Any]]:
+    if is_json_lines(path):
+        return read_json_lines(path, tuple(cursor or (0, 0)))
+    return read_json(path, cursor or 0)
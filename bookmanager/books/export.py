@@ -0,0 +1,129 @@
+"""Streaming export of books as JSON lines or CSV.
+
+Rows are read with values() and iterator(), so only one chunk of rows
+is held in memory, and are encoded into pieces of about CHUNK_SIZE bytes
+which are sent one by one. Pieces can be gzipped on the fly.
+"""
+
+import csv
+import zlib
+from itertools import islice
+from typing import Iterable, Iterator, List
+
+from django.db.models import QuerySet
+
+from .jsonutils import dumps_json
+from .utils import DEFAULT_COVER_URI
+
+EXPORT_FIELDS = [
+    "id",
+    "title",
+    "author",
+    "published_date",
+    "isbn_10",
+    "isbn_13",
+    "pages",
+    "cover_uri",
+    "language",
+]
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+CHUNK_SIZE = 64 * 1024
+# rows fetched from database at once
+ITERATOR_CHUNK_SIZE = 2000
+
+
+def book_values(queryset: QuerySet, fields: List[str] = EXPORT_FIELDS) -> QuerySet:
+    return queryset.values(*fields)
+
+
+def represent_books(rows: List[dict], fields: List[str] = None) -> List[dict]:
+    """Turn rows of book_values() into data equal to BookSerializer data.
+
+    Rows are changed in place, Book.from_db isn't called for values() rows,
+    so empty covers are replaced by default cover here. Values of fields
+    not in fields, if given, are dropped.
+    """
+    if not rows:
+        return rows
+    selected = list(rows[0])
+    has_id = "id" in selected
+    has_date = "published_date" in selected
+    has_cover = "cover_uri" in selected
+    dropped = [field for field in selected if fields and field not in fields]
+    for row in rows:
+        if has_id:
+            row["id"] = str(row["id"])
+        if has_date and row["published_date"] is not None:
+            row["published_date"] = row["published_date"].isoformat()
+        if has_cover and not row["cover_uri"]:
+            row["cover_uri"] = DEFAULT_COVER_URI
+        for field in dropped:
+            del row[field]
+    return rows
+
+
+def export_rows(queryset: QuerySet) -> Iterator[List[dict]]:
+    """Yield chunks of represented book rows of ITERATOR_CHUNK_SIZE."""
+    if not queryset.ordered:
+        queryset = queryset.order_by("title", "id")
+    rows = book_values(queryset).iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+    while True:
+        chunk = list(islice(rows, ITERATOR_CHUNK_SIZE))
+        if not chunk:
+            return
+        yield represent_books(chunk)
+
+
+def ndjson_lines(chunks: Iterable[List[dict]]) -> Iterator[bytes]:
+    for rows in chunks:
+        for row in rows:
+            yield dumps_json(row) + b"\n"
+
+
+class Echo:
+    """File-like object returning written value, lets csv.writer stream."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def csv_lines(chunks: Iterable[List[dict]]) -> Iterator[bytes]:
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS).encode()
+    for rows in chunks:
+        for row in rows:
+            yield writer.writerow(row.values()).encode()
+
+
+def chunked(lines: Iterable[bytes], size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Join lines into pieces of at least size bytes."""
+    buffer = []
+    length = 0
+    for data in lines:
+        buffer.append(data)
+        length += len(data)
+        if length >= size:
+            yield b"".join(buffer)
+            buffer = []
+            length = 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def gzipped(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_books(queryset: QuerySet, export_format: str, gzip=False) -> Iterator[bytes]:
+    """Yield pieces of queryset books encoded in export_format (see FORMATS)."""
+    lines = ndjson_lines if export_format == "ndjson" else csv_lines
+    chunks = chunked(lines(export_rows(queryset)))
+    return gzipped(chunks) if gzip else chunks
@@ -0,0 +1,157 @@
+"""Search of local catalog and google api at once.
+
+Google page is requested in background thread while catalog is queried in
+request thread. Google results are awaited only until GOOGLE_FEDERATED_TIMEOUT
+passes since the search started. Late google response isn't dropped, it's
+cached like any other, so repeated search usually gets it.
+
+Results are merged, catalog books first. Google books matching catalog books
+by google id or isbn are left out or, when the catalog book isn't on the
+list, marked as already in catalog.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from django.conf import settings
+from django.db.models import Q
+
+from .models import Book, clean_isbn
+from .utils import DEFAULT_COVER_URI, PAGINATE_BY, get_google_api_books
+
+RESULT_FIELDS = [
+    "title",
+    "author",
+    "published_date",
+    "isbn_10",
+    "isbn_13",
+    "pages",
+    "language",
+    "cover_uri",
+    "google_id",
+]
+
+
+class FederatedResults(NamedTuple):
+    books: List[dict]
+    remote_pending: bool
+    remote_status: Optional[int]
+
+
+_executor = None  # type: Optional[ThreadPoolExecutor]
+_executor_pid = None  # type: Optional[int]
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return thread pool for google requests shared by current process."""
+    global _executor, _executor_pid
+
+    pid = os.getpid()
+    if _executor is None or _executor_pid != pid:
+        with _executor_lock:
+            if _executor is None or _executor_pid != pid:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.GOOGLE_FEDERATED_WORKERS,  # type: ignore
+                    thread_name_prefix="google-federated",
+                )
+                _executor_pid = pid
+    return _executor
+
+
+def book_keys(book: dict) -> set:
+    """Return google id and isbns of book as comparable keys."""
+    keys = {
+        ("isbn", clean_isbn(book[field]))
+        for field in ("isbn_10", "isbn_13")
+        if book.get(field)
+    }
+    if book.get("google_id"):
+        keys.add(("google_id", book["google_id"]))
+    return keys
+
+
+def search_catalog(query_dict: dict, limit: int = PAGINATE_BY) -> List[dict]:
+    """Return catalog books matching google search query params."""
+    lookup = Q()
+    search = query_dict.get("search")
+    if search:
+        lookup &= Q(title__icontains=search) | Q(author__icontains=search)
+    if query_dict.get("intitle"):
+        lookup &= Q(title__icontains=query_dict["intitle"])
+    if query_dict.get("inauthor"):
+        lookup &= Q(author__icontains=query_dict["inauthor"])
+    if not lookup:
+        return []
+
+    books = Book.objects.filter(lookup).order_by("title")
+    rows = []
+    for row in books.values("pk", *RESULT_FIELDS)[:limit]:
+        row["id"] = row.pop("pk")
+        row["cover_uri"] = row["cover_uri"] or DEFAULT_COVER_URI
+        row["in_catalog"] = True
+        row["source"] = "local"
+        rows.append(row)
+    return rows
+
+
+def catalog_ids(books: List[dict]) -> Dict[tuple, Any]:
+    """Return pk of catalog books matching given google books by their keys."""
+    google_ids = [book["google_id"] for book in books if book.get("google_id")]
+    isbns = [key for book in books for kind, key in book_keys(book) if kind == "isbn"]
+    if not google_ids and not isbns:
+        return {}
+
+    saved = {}
+    rows = Book.objects.filter(
+        Q(google_id__in=google_ids) | Q(isbn_10__in=isbns) | Q(isbn_13__in=isbns)
+    ).values("pk", "google_id", "isbn_10", "isbn_13")
+    for row in rows:
+        for key in book_keys(row):
+            saved.setdefault(key, row["pk"])
+    return saved
+
+
+def merge_results(local: List[dict], remote: List[dict]) -> List[dict]:
+    """Append google books not present in local results to them."""
+    books = list(local)
+    seen = set().union(*(book_keys(book) for book in local))
+    saved = catalog_ids(remote)
+    for book in remote:
+        keys = book_keys(book)
+        if keys & seen:
+            continue
+        seen |= keys
+        pk = next((saved[key] for key in keys if key in saved), None)
+        row = {field: book[field] for field in RESULT_FIELDS}
+        row["id"] = pk or book["id"]
+        row["in_catalog"] = pk is not None
+        row["source"] = "google"
+        books.append(row)
+    return books
+
+
+def federated_search(
+    query_dict: dict, page: int = 1, timeout: float = None
+) -> FederatedResults:
+    """Search catalog and google api concurrently within timeout seconds."""
+    if timeout is None:
+        timeout = settings.GOOGLE_FEDERATED_TIMEOUT  # type: ignore
+    deadline = time.monotonic() + timeout
+    # request's QueryDict isn't passed to other thread
+    query_dict = {key: query_dict.get(key) for key in query_dict}
+    future = get_executor().submit(get_google_api_books, query_dict, page=page)
+
+    local = search_catalog(query_dict)
+    try:
+        remote, _, status = future.result(max(0, deadline - time.monotonic()))
+    except FutureTimeoutError:
+        return FederatedResults(local, remote_pending=True, remote_status=None)
+
+    return FederatedResults(
+        merge_results(local, remote), remote_pending=False, remote_status=status
+    )
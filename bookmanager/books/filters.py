@@ -1,11 +1,17 @@
 import django_filters
 
 from .models import Book
+from .search import search_books
 
 
 class InternalBooksFilter(django_filters.FilterSet):
-    title = django_filters.CharFilter(lookup_expr="icontains")
-    author = django_filters.CharFilter(lookup_expr="icontains")
+    """Filter books, title and author are searched with full text index.
+
+    See search module, results of text search are ordered by relevance.
+    """
+
+    title = django_filters.CharFilter(method="search_text")
+    author = django_filters.CharFilter(method="search_text")
 
     date_from = django_filters.DateFilter(
         required=False,
@@ -21,3 +27,11 @@ class InternalBooksFilter(django_filters.FilterSet):
     class Meta:
         model = Book
         fields = ["title", "author", "language", "published_date"]
+
+    def search_text(self, queryset, name, value):
+        # title and author are searched together in filter_queryset
+        return queryset
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        return search_books(queryset, self.form.cleaned_data)
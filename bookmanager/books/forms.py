@@ -1,8 +1,12 @@
 from django import forms
-from django.forms import DateTimeInput, ModelForm
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.forms import DateTimeInput, HiddenInput, ModelForm
 
 from .models import Book
 
+PAGINATE_BY = settings.PAGINATE_BY  # type: ignore
+
 
 class BookAddEditForm(ModelForm):
     class Meta:
@@ -16,15 +20,17 @@ class BookAddEditForm(ModelForm):
             "pages",
             "cover_uri",
             "language",
+            "google_id",
         ]
         widgets = {
+            "google_id": HiddenInput(),
             "published_date": DateTimeInput(
                 attrs={
                     "type": "date",
                     "class": "form-control datetimepicker-input",
                     "data-target": "#datetimepicker1",
                 }
-            )
+            ),
         }
 
 
@@ -35,3 +41,20 @@ class GoogleSearchForm(forms.Form):
 
     def is_valid(self):
         return super().is_valid()
+
+
+class GoogleImportForm(GoogleSearchForm):
+    """Google volume ids selected on google search results page."""
+
+    page = forms.IntegerField(min_value=1, required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        cleaned_data["page"] = cleaned_data.get("page") or 1
+        cleaned_data["ids"] = list(dict.fromkeys(self.data.getlist("ids")))
+        if not cleaned_data["ids"]:
+            raise ValidationError("Select books to import.")
+        # a results page never shows more, and each id may cost a request
+        if len(cleaned_data["ids"]) > PAGINATE_BY:
+            raise ValidationError(f"Select at most {PAGINATE_BY} books to import.")
+        return cleaned_data
@@ -0,0 +1,157 @@
+"""Cache for parsed google books api responses.
+
+Responses are stored in "google" cache (see CACHES setting) with TTL and
+bounded number of entries. Search results are keyed by normalized query and
+request params (page), volumes by google id. Books of fetched search pages
+are stored as volumes in "google-volumes" cache, about 40 per page would
+evict search pages from "google" cache.
+
+Every cached response has also stale copy kept for GOOGLE_CACHE_STALE_TTL,
+it's returned instead of 429/5xx response when google api is unavailable.
+
+Concurrent misses for the same key are coalesced, so only one request per
+key goes to google api at a time. With GOOGLE_SINGLE_FLIGHT_CROSS_PROCESS
+enabled processes also coordinate through a lock stored in the cache, which
+requires cache backend shared by all processes.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from typing import Callable, Optional, Tuple
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .google_client import RETRY_STATUSES
+from .singleflight import SingleFlight
+
+CACHE_ALIAS = "google"
+VOLUME_CACHE_ALIAS = "google-volumes"
+LOCK_POLL_INTERVAL = 0.05
+
+
+class CacheStats:
+    """Thread safe hit/miss/stale counters of current process."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+
+    def hit(self):
+        with self.lock:
+            self.hits += 1
+
+    def miss(self):
+        with self.lock:
+            self.misses += 1
+
+    def stale(self):
+        with self.lock:
+            self.stale_hits += 1
+
+    def reset(self):
+        with self.lock:
+            self.hits = 0
+            self.misses = 0
+            self.stale_hits = 0
+
+    def as_dict(self) -> dict:
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale_hits": self.stale_hits,
+            }
+
+
+stats = CacheStats()
+flights = SingleFlight()
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def get_volume_cache():
+    return caches[VOLUME_CACHE_ALIAS]
+
+
+def normalize_query(query: str) -> str:
+    """Return query lowercased with collapsed whitespaces."""
+    return " ".join(query.lower().split())
+
+
+def search_cache_key(query: str, params: dict) -> str:
+    """Return cache key for google search query and request params."""
+    params_string = urlencode(sorted((params or {}).items()))
+    digest = hashlib.sha1(f"{normalize_query(query)}&{params_string}".encode())
+    return f"search:{digest.hexdigest()}"
+
+
+def volume_cache_key(volume_id: str) -> str:
+    return f"volume:{hashlib.sha1(volume_id.encode()).hexdigest()}"
+
+
+def wait_for_response(key: str, timeout: float) -> Optional[Tuple]:
+    """Wait until other process puts response for key into the cache."""
+    cache = get_cache()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if cache.get(f"lock:{key}") is None:
+            break
+        time.sleep(LOCK_POLL_INTERVAL)
+    return cache.get(key)
+
+
+def fetch_and_cache(key: str, fetch: Callable[[], Tuple]) -> Tuple:
+    cache = get_cache()
+    lock_key = f"lock:{key}"
+    timeout = settings.GOOGLE_SINGLE_FLIGHT_TIMEOUT  # type: ignore
+    locked = False
+    if settings.GOOGLE_SINGLE_FLIGHT_CROSS_PROCESS:  # type: ignore
+        locked = cache.add(lock_key, os.getpid(), timeout)
+        if not locked:
+            response = wait_for_response(key, timeout)
+            if response is not None:
+                return response
+
+    try:
+        response = fetch()
+        if response[-1] == 200:
+            cache.set(key, response)
+            cache.set(
+                f"stale:{key}",
+                response,
+                settings.GOOGLE_CACHE_STALE_TTL,  # type: ignore
+            )
+        elif response[-1] in RETRY_STATUSES:
+            stale = cache.get(f"stale:{key}")
+            if stale is not None:
+                stats.stale()
+                response = stale
+    finally:
+        if locked:
+            cache.delete(lock_key)
+    return response
+
+
+def cached_response(key: str, fetch: Callable[[], Tuple]) -> Tuple:
+    """Return cached response for key or fetch and cache it.
+
+    Fetch must return tuple with status code as the last item, only responses
+    with status 200 are cached. Stale response is returned instead of 429/5xx
+    if there is one. Concurrent callers with the same key share
+    result of one fetch.
+    """
+    response = get_cache().get(key)
+    if response is not None:
+        stats.hit()
+        return response
+
+    stats.miss()
+    return flights.do(key, lambda: fetch_and_cache(key, fetch))
@@ -0,0 +1,267 @@
+"""Shared http client for google books api.
+
+Every process keeps one requests session so connections to googleapis are
+pooled and kept alive between requests. Calls have timeouts and are retried
+with backoff on connection errors and 5xx responses. Retry-After header isn't
+respected, it could make request thread sleep for any time google asks for,
+and 429 responses aren't retried, they fail fast and count for the breaker.
+
+Calls of shared client go through rate limiter and circuit breaker shared by
+all threads. After GOOGLE_BREAKER_FAILURES failed calls in a row the circuit
+opens and calls fail fast with GoogleApiUnavailable for
+GOOGLE_BREAKER_RESET_TIMEOUT seconds, then single trial call decides whether
+it closes again.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Optional
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# responses counted as failures by circuit breaker
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# responses retried by session, retry after rate limit can't succeed in time
+SESSION_RETRY_STATUSES = (500, 502, 503, 504)
+
+
+class GoogleApiUnavailable(requests.RequestException):
+    """Call was not sent, circuit is open or rate limit is exceeded."""
+
+
+class RateLimiter:
+    """Token bucket shared by threads.
+
+    Bucket holds up to capacity tokens and is refilled with rate tokens per
+    second, acquire blocks until token is available. Bucket with rate 0 is
+    never refilled and holds no tokens, it lets no calls through.
+    """
+
+    def __init__(self, rate: float, capacity: int = None):
+        self.rate = max(0.0, rate)
+        self.capacity = 0 if not self.rate else capacity or max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, timeout: float = None) -> bool:
+        """Take token, return False if it's not available within timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self.lock:
+                self.refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                if not self.rate:
+                    return False
+                wait = (1 - self.tokens) / self.rate
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """Circuit breaker shared by threads.
+
+    Closed circuit lets calls through and counts consecutive failures. Open
+    circuit rejects calls until reset_timeout passes, then it's half open and
+    lets one trial call through, its result closes or opens circuit again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None  # type: Optional[float]
+        self.trial = False
+
+    def current_state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    @property
+    def state(self) -> str:
+        with self.lock:
+            return self.current_state()
+
+    def allow(self) -> bool:
+        with self.lock:
+            state = self.current_state()
+            if state == self.HALF_OPEN and not self.trial:
+                self.trial = True
+                return True
+            return state == self.CLOSED
+
+    def cancel(self):
+        """Forget call allowed by allow which was not made."""
+        with self.lock:
+            self.trial = False
+
+    def success(self):
+        self.reset()
+
+    def reset(self):
+        """Close circuit and forget failures."""
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial = False
+
+    def failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.trial or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.trial = False
+
+    def as_dict(self) -> dict:
+        with self.lock:
+            state = self.current_state()
+            retry_in = None
+            if state == self.OPEN:
+                retry_in = self.reset_timeout - (time.monotonic() - self.opened_at)
+            return {
+                "state": state,
+                "failures": self.failures,
+                "retry_in": round(retry_in, 1) if retry_in is not None else None,
+            }
+
+
+class GoogleBooksClient:
+    """Client for google books volumes api.
+
+    Api url, timeouts, retries, backoff and pool size default to GOOGLE_*
+    settings.
+    """
+
+    def __init__(
+        self,
+        api_url: str = None,
+        connect_timeout: float = None,
+        read_timeout: float = None,
+        retries: int = None,
+        backoff_factor: float = None,
+        pool_size: int = None,
+        limiter: RateLimiter = None,
+        breaker: CircuitBreaker = None,
+    ):
+        config = settings  # type: Any
+        self.api_url = api_url or config.GOOGLE_BOOKS_API_URL
+        self.timeout = (
+            connect_timeout or config.GOOGLE_API_CONNECT_TIMEOUT,
+            read_timeout or config.GOOGLE_API_READ_TIMEOUT,
+        )
+        self.retries = config.GOOGLE_API_RETRIES if retries is None else retries
+        self.backoff_factor = (
+            config.GOOGLE_API_BACKOFF_FACTOR
+            if backoff_factor is None
+            else backoff_factor
+        )
+        self.pool_size = pool_size or config.GOOGLE_API_POOL_SIZE
+        self.limiter = limiter or RateLimiter(config.GOOGLE_API_RATE_LIMIT)
+        self.rate_limit_wait = config.GOOGLE_API_RATE_LIMIT_WAIT
+        self.breaker = breaker or CircuitBreaker(
+            config.GOOGLE_BREAKER_FAILURES, config.GOOGLE_BREAKER_RESET_TIMEOUT
+        )
+        self.session = self.create_session()
+
+    def create_session(self) -> requests.Session:
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=SESSION_RETRY_STATUSES,
+            allowed_methods=frozenset(["GET"]),
+            raise_on_status=False,
+            # waits are bounded by backoff only, not by google
+            respect_retry_after_header=False,
+        )
+        adapter = HTTPAdapter(pool_maxsize=self.pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        # google serves gzip only to user agents containing "gzip"
+        session.headers.update(
+            {"Accept-Encoding": "gzip", "User-Agent": "BookManager (gzip)"}
+        )
+        return session
+
+    def get(
+        self, url: str, params: dict = None, headers: dict = None
+    ) -> requests.Response:
+        """Send request unless circuit is open or rate limit is exceeded.
+
+        Connection errors and 429/5xx responses left after retries count as
+        breaker failures.
+        """
+        if not self.breaker.allow():
+            raise GoogleApiUnavailable("Google api circuit is open")
+        if not self.limiter.acquire(timeout=self.rate_limit_wait):
+            # call was not made, it doesn't count as breaker failure
+            self.breaker.cancel()
+            raise GoogleApiUnavailable("Google api rate limit exceeded")
+        try:
+            response = self.session.get(
+                url, params=params, headers=headers, timeout=self.timeout
+            )
+        except requests.RequestException:
+            self.breaker.failure()
+            raise
+        if response.status_code in RETRY_STATUSES:
+            self.breaker.failure()
+        else:
+            self.breaker.success()
+        return response
+
+    def search(self, query: str, params: dict = None) -> requests.Response:
+        """Get volumes for query string created by utils.google_api_query."""
+        return self.get(f"{self.api_url}?{query}", params=params)
+
+    def volume(
+        self, volume_id: str, params: dict = None, etag: str = None
+    ) -> requests.Response:
+        """Get single volume with given google id.
+
+        With etag of previous response the request is conditional, google
+        answers 304 without body when volume didn't change.
+        """
+        headers = {"If-None-Match": etag} if etag else None
+        return self.get(f"{self.api_url}/{volume_id}", params=params, headers=headers)
+
+
+_client = None  # type: Optional[GoogleBooksClient]
+_client_pid = None  # type: Optional[int]
+_client_lock = threading.Lock()
+
+
+def get_client() -> GoogleBooksClient:
+    """Return client shared by all threads of current process.
+
+    Client is recreated after fork so workers don't share sockets.
+    """
+    global _client, _client_pid
+
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _client_lock:
+            if _client is None or _client_pid != pid:
+                _client = GoogleBooksClient()
+                _client_pid = pid
+    return _client
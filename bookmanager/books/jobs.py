@@ -0,0 +1,191 @@
+"""Background import of all google api results for query.
+
+Job fetches first page to learn totalItems, then fetches remaining pages in
+thread pool limited to GOOGLE_IMPORT_CONCURRENCY workers. At most two pages
+per worker are in flight, so memory doesn't grow with number of results.
+totalItems is only an estimate, results end earlier, so no more pages are
+fetched after first page with less than PAGINATE_BY items.
+
+Pages are parsed by google_book_parser in workers, while deduplication,
+validation and upsert in batches of GOOGLE_IMPORT_BATCH_SIZE books happen in
+job thread only. Up to GOOGLE_IMPORT_MAX_RUNNING_JOBS jobs run at once.
+"""
+
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+from math import ceil
+from typing import List
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .bulk import upsert_books, validate_books
+from .google_client import GoogleBooksClient
+from .models import ImportJob
+from .utils import (
+    PAGINATE_BY,
+    fetch_google_api_books,
+    google_api_params,
+    google_api_query,
+)
+
+STALE_JOB_TIMEOUT = timedelta(minutes=10)
+
+
+class ImportAllJob:
+    """Import all results of ImportJob query."""
+
+    def __init__(
+        self,
+        job: ImportJob,
+        client: GoogleBooksClient = None,
+        concurrency: int = None,
+        batch_size: int = None,
+    ):
+        self.job = job
+        self.client = client
+        self.concurrency = (
+            concurrency or settings.GOOGLE_IMPORT_CONCURRENCY  # type: ignore
+        )
+        self.batch_size = (
+            batch_size or settings.GOOGLE_IMPORT_BATCH_SIZE  # type: ignore
+        )
+        self.query = google_api_query(job.query)
+        self.seen_ids = set()  # type: set
+        self.batch = []  # type: List[dict]
+        self.last_page_seen = False
+
+    def fetch_page(self, page: int) -> tuple:
+        return fetch_google_api_books(
+            self.query, google_api_params(page=page), client=self.client
+        )
+
+    def pages_count(self, total: int) -> int:
+        pages = ceil(total / PAGINATE_BY)
+        max_pages = settings.GOOGLE_IMPORT_MAX_PAGES  # type: ignore
+        return min(pages, max_pages) if max_pages else pages
+
+    def update(self, **fields):
+        for field, value in fields.items():
+            setattr(self.job, field, value)
+        self.job.save(update_fields=[*fields.keys(), "modified"])
+
+    def add_page(self, books: List[dict], status: int):
+        if status != 200:
+            self.job.pages_failed += 1
+        elif len(books) < PAGINATE_BY:
+            self.last_page_seen = True
+        for book in books:
+            if book["id"] in self.seen_ids:
+                self.job.skipped += 1
+                continue
+            self.seen_ids.add(book["id"])
+            self.batch.append(book)
+        self.job.pages_done += 1
+        if len(self.batch) >= self.batch_size:
+            self.save_batch()
+        else:
+            self.save_progress()
+
+    def save_progress(self):
+        self.update(
+            pages_done=self.job.pages_done,
+            pages_failed=self.job.pages_failed,
+            imported=self.job.imported,
+            updated=self.job.updated,
+            skipped=self.job.skipped,
+            invalid=self.job.invalid,
+        )
+
+    def save_batch(self):
+        """Validate collected books and create or update them."""
+        books, errors = validate_books(self.batch)
+        self.batch = []
+
+        with transaction.atomic():
+            result = upsert_books(books)
+            self.job.imported += len(result.created)
+            self.job.updated += len(result.updated)
+            self.job.skipped += result.skipped
+            self.job.invalid += len(errors)
+            self.save_progress()
+
+    def run(self):
+        self.update(status=ImportJob.RUNNING)
+        books, total, status = self.fetch_page(1)
+        if status != 200:
+            self.update(
+                status=ImportJob.FAILED, error=f"Google api response - {status}"
+            )
+            return
+
+        pages_total = self.pages_count(total)
+        self.update(total=total, pages_total=pages_total)
+        self.add_page(books, status)
+
+        pages = iter(range(2, pages_total + 1))
+        window = self.concurrency * 2
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = set()  # type: set
+            while True:
+                while not self.last_page_seen and len(futures) < window:
+                    page = next(pages, None)
+                    if page is None:
+                        break
+                    futures.add(executor.submit(self.fetch_page, page))
+                if not futures:
+                    break
+                done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    books, _, status = future.result()
+                    self.add_page(books, status)
+
+        self.save_batch()
+        if self.last_page_seen:
+            # results ended before pages of totalItems
+            self.job.pages_total = self.job.pages_done
+        self.update(status=ImportJob.FINISHED, pages_total=self.job.pages_total)
+
+
+def run_import_job(job_pk, **kwargs):
+    """Run import job, mark it failed on unexpected error."""
+    job = ImportJob.objects.get(pk=job_pk)
+    try:
+        ImportAllJob(job, **kwargs).run()
+    except Exception as e:
+        ImportJob.objects.filter(pk=job_pk).update(
+            status=ImportJob.FAILED, error=str(e)[:200]
+        )
+
+
+def run_import_job_in_thread(job_pk):
+    try:
+        run_import_job(job_pk)
+    finally:
+        connection.close()
+
+
+def can_start_import_job() -> bool:
+    """Return if running jobs leave room for new one.
+
+    Jobs save progress after every page, jobs which didn't for
+    STALE_JOB_TIMEOUT were interrupted and aren't counted.
+    """
+    max_jobs = settings.GOOGLE_IMPORT_MAX_RUNNING_JOBS  # type: ignore
+    running = ImportJob.objects.filter(
+        status__in=[ImportJob.PENDING, ImportJob.RUNNING],
+        modified__gte=timezone.now() - STALE_JOB_TIMEOUT,
+    )
+    return running.count() < max_jobs
+
+
+def start_import_job(query: dict) -> ImportJob:
+    """Create import job and run it in background thread after commit."""
+    job = ImportJob.objects.create(query=query)
+    thread = threading.Thread(
+        target=run_import_job_in_thread, args=(job.pk,), daemon=True
+    )
+    transaction.on_commit(thread.start)
+    return job
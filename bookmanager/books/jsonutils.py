@@ -0,0 +1,28 @@
+"""Fast JSON encoding compatible with DRF JSONRenderer.
+
+orjson output is compact and not ascii escaped like default DRF output.
+Values it doesn't support natively, dates and times included (DRF formats
+them differently), go to DRF JSONEncoder. U+2028 and U+2029 are escaped like
+by DRF, so output can be embedded in javascript.
+"""
+
+import json
+
+import orjson
+from rest_framework.utils.encoders import JSONEncoder
+
+OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME
+encoder = JSONEncoder()
+
+
+def dumps_json(data) -> bytes:
+    try:
+        dumped = orjson.dumps(data, default=encoder.default, option=OPTIONS)
+    except orjson.JSONEncodeError:
+        # integers over 64 bits, strings DRF can't encode either
+        dumped = json.dumps(
+            data, cls=JSONEncoder, ensure_ascii=False, separators=(",", ":")
+        ).encode()
+    return dumped.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+        b"\xe2\x80\xa9", b"\\u2029"
+    )
@@ -0,0 +1,178 @@
+"""Keyset pagination of querysets.
+
+Instead of OFFSET, next page is selected by values of ordering fields of the
+last row of current page, so it's read from index starting right after that
+row and time of getting any page doesn't depend on its number. Total count
+isn't needed and isn't computed.
+
+Position is passed between requests as opaque cursor, which holds ordering
+values of row the page starts after (or ends before), direction and page
+number.
+"""
+
+import base64
+import json
+from typing import List, Optional
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q, QuerySet
+
+# fields of unique (with id) orderings that can be paginated with keyset
+KEYSET_FIELDS = {"published_date", "title", "id"}
+
+NEXT = "n"
+PREVIOUS = "p"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def keyset_ordering(queryset: QuerySet) -> Optional[List[str]]:
+    """Return queryset ordering made unique with id or None if unsupported."""
+    ordering = list(queryset.query.order_by)
+    if not ordering or queryset.query.extra_order_by:
+        return None
+    if any(
+        not isinstance(field, str) or field.lstrip("-") not in KEYSET_FIELDS
+        for field in ordering
+    ):
+        return None
+    if ordering[-1].lstrip("-") != "id":
+        ordering.append("-id" if ordering[-1].startswith("-") else "id")
+    return ordering
+
+
+def encode_cursor(direction: str, number: int, values: list) -> str:
+    data = json.dumps([direction, number, values]).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        direction, number, values = json.loads(data)
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+    if direction not in (NEXT, PREVIOUS) or not isinstance(number, int):
+        raise InvalidCursor("Invalid cursor")
+    return direction, number, values
+
+
+def seek_lookup(ordering: List[str], values: list, forward: bool) -> Q:
+    """Return lookup of rows after (or before) row with given values.
+
+    For ordering (a, b) rows after (x, y) are a >= x AND (a > x OR b > y),
+    first condition lets database seek in (a, b) index.
+    """
+    field = ordering[0].lstrip("-")
+    ascending = not ordering[0].startswith("-")
+    after = "gt" if ascending == forward else "lt"
+    if len(ordering) == 1:
+        return Q(**{f"{field}__{after}": values[0]})
+    return Q(**{f"{field}__{after}e": values[0]}) & (
+        Q(**{f"{field}__{after}": values[0]})
+        | seek_lookup(ordering[1:], values[1:], forward)
+    )
+
+
+def reverse_ordering(ordering: List[str]) -> List[str]:
+    return [field[1:] if field.startswith("-") else f"-{field}" for field in ordering]
+
+
+class KeysetPage:
+    """Page of keyset paginator, has interface of Page used by templates."""
+
+    def __init__(
+        self, object_list, number, paginator, has_next, has_previous, cursor=""
+    ):
+        self.object_list = object_list
+        self.number = number
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.cursor = cursor
+
+    def __repr__(self):
+        return f"<Keyset page {self.number}>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self) -> bool:
+        return self._has_next
+
+    def has_previous(self) -> bool:
+        return self._has_previous
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+    def next_cursor(self) -> Optional[str]:
+        if not self.has_next():
+            return None
+        values = self.paginator.cursor_values(self.object_list[-1])
+        return encode_cursor(NEXT, self.number + 1, values)
+
+    def previous_cursor(self) -> Optional[str]:
+        if not self.has_previous():
+            return None
+        values = self.paginator.cursor_values(self.object_list[0])
+        return encode_cursor(PREVIOUS, self.number - 1, values)
+
+
+class KeysetPaginator:
+    """Paginate queryset by keyset of its ordering, see keyset_ordering."""
+
+    def __init__(self, queryset: QuerySet, per_page: int, ordering: List[str]):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = ordering
+        self.fields = [field.lstrip("-") for field in ordering]
+
+    def cursor_values(self, obj) -> list:
+        values = []
+        for field in self.fields:
+            value = getattr(obj, field)
+            values.append(value if isinstance(value, str) else str(value))
+        return values
+
+    def parse_values(self, values) -> list:
+        if not isinstance(values, list) or len(values) != len(self.fields):
+            raise InvalidCursor("Invalid cursor")
+        model = self.queryset.model
+        try:
+            return [
+                model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+        except ValidationError:
+            raise InvalidCursor("Invalid cursor")
+
+    def page(self, cursor: str = None) -> KeysetPage:
+        """Return first page or page pointed by cursor."""
+        if not cursor:
+            rows = list(self.queryset.order_by(*self.ordering)[: self.per_page + 1])
+            has_next = len(rows) > self.per_page
+            return KeysetPage(rows[: self.per_page], 1, self, has_next, False)
+
+        direction, number, values = decode_cursor(cursor)
+        values = self.parse_values(values)
+        forward = direction == NEXT
+        ordering = self.ordering if forward else reverse_ordering(self.ordering)
+        queryset = self.queryset.filter(seek_lookup(self.ordering, values, forward))
+        rows = list(queryset.order_by(*ordering)[: self.per_page + 1])
+        more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+
+        if forward:
+            return KeysetPage(rows, number, self, more, True, cursor)
+        rows.reverse()
+        # no more rows before, it's the first page
+        return KeysetPage(rows, number if more else 1, self, True, more, cursor)
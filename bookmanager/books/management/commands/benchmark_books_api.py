@@ -0,0 +1,85 @@
+"""Compare serialization of book lists by BookSerializer and fast path.
+
+Usage: manage.py benchmark_books_api [--rows 10000] [--repeat 5]
+
+Books are created in a transaction rolled back at the end, so the catalog
+isn't changed. Both ways must give the same bytes, best time of repeats is
+reported.
+"""
+
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from bookmanager.api.v1.books.renderers import FastJSONRenderer
+from bookmanager.api.v1.books.serializers import BookSerializer
+from bookmanager.books.export import book_values, represent_books
+from bookmanager.books.models import Book
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Benchmark serialization of books api lists."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.create_books(options["rows"])
+                self.benchmark(options["repeat"])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def create_books(self, rows: int):
+        books = []
+        for i in range(rows):
+            book = Book(
+                title=f"Title {i}",
+                author=f"Author {i % 100}",
+                published_date=date(2000, 1, 1) + timedelta(days=i),
+                pages=str(i % 1000),
+                language="en",
+                cover_uri="" if i % 2 else f"http://covers/{i}",
+            )
+            book.prepare()
+            books.append(book)
+        Book.objects.bulk_create(books, batch_size=1000)
+
+    def best_time(self, fn, repeat: int):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = fn()
+            times.append(time.perf_counter() - start)
+        return min(times), result
+
+    def benchmark(self, repeat: int):
+        queryset = Book.objects.order_by("title", "id")
+
+        def serializer():
+            return JSONRenderer().render(BookSerializer(queryset, many=True).data)
+
+        def fast():
+            return FastJSONRenderer().render(
+                represent_books(list(book_values(queryset)))
+            )
+
+        serializer_time, expected = self.best_time(serializer, repeat)
+        fast_time, result = self.best_time(fast, repeat)
+        if result != expected:
+            raise CommandError("Fast serialization output differs.")
+
+        rows = queryset.count()
+        self.stdout.write(f"BookSerializer: {serializer_time:.3f}s for {rows} rows")
+        self.stdout.write(f"values() + orjson: {fast_time:.3f}s for {rows} rows")
+        self.stdout.write(f"Speedup: {serializer_time / fast_time:.1f}x")
@@ -0,0 +1,151 @@
+"""Import books from dump of google books api responses.
+
+Usage: manage.py import_google_dump volumes.jsonl [--batch-size 1000] [--resume]
+
+Items are streamed from file, parsed with google_book_parser, validated and
+saved in batches, books imported before are updated. After every saved batch
+position in file is stored in checkpoint file, so interrupted import can be
+continued with --resume. JSON lines dumps are resumed at stored byte offset,
+JSON dumps are parsed again up to stored position, so use JSON lines for big
+dumps.
+
+Items which can't be decoded or parsed are counted as invalid and skipped.
+Import of JSON dump stops at malformed JSON, after saving items read before.
+"""
+
+import json
+import os
+import resource
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bookmanager.books.bulk import upsert_books, validate_books
+from bookmanager.books.dumps import is_json_lines, read_dump
+from bookmanager.books.utils import google_book_parser
+
+
+class Command(BaseCommand):
+    help = "Import books from JSON or JSON lines dump of google books api responses."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path to .json, .jsonl (optionally .gz).")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--checkpoint",
+            help="Path to checkpoint file, defaults to <path>.checkpoint.",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue import from position stored in checkpoint file.",
+        )
+
+    def handle(self, *args, **options):
+        self.path = os.path.abspath(options["path"])
+        if not os.path.exists(self.path):
+            raise CommandError(f"File {self.path} doesn't exist.")
+        self.checkpoint_path = options["checkpoint"] or f"{self.path}.checkpoint"
+        self.batch_size = options["batch_size"]
+        self.verbosity = options["verbosity"]
+        self.progress = {
+            "items": 0,
+            "created": 0,
+            "updated": 0,
+            "skipped": 0,
+            "invalid": 0,
+        }
+
+        cursor = None
+        if options["resume"]:
+            cursor = self.load_checkpoint()
+            if not is_json_lines(self.path):
+                self.stderr.write(
+                    f"Warning: skipping {cursor} already imported items of JSON "
+                    "dump requires parsing them again, JSON lines dumps are "
+                    "resumed without it."
+                )
+
+        self.resumed_items = self.progress["items"]
+        self.started = time.monotonic()
+        self.import_items(read_dump(self.path, cursor))
+        self.report()
+
+    def import_items(self, items):
+        batch = []
+        invalid = 0
+        cursor = None
+        while True:
+            try:
+                item, cursor = next(items)
+            except StopIteration:
+                break
+            except ValueError as error:
+                self.save_batch(batch, invalid, cursor)
+                raise CommandError(f"Malformed dump after item {cursor}: {error}")
+            row = self.parse(item)
+            if row is None:
+                invalid += 1
+            else:
+                batch.append(row)
+            if len(batch) + invalid >= self.batch_size:
+                self.save_batch(batch, invalid, cursor)
+                batch, invalid = [], 0
+        if batch or invalid:
+            self.save_batch(batch, invalid, cursor)
+
+    def parse(self, item):
+        """Return Book row of volume item, None for undecodable or broken one."""
+        if item is None:
+            return None
+        try:
+            return google_book_parser(item)
+        except (AttributeError, KeyError, TypeError, ValueError):
+            # e.g. identifier without "type" or "authors": null
+            return None
+
+    def save_batch(self, rows, invalid, cursor):
+        if cursor is None:
+            return
+        books, errors = validate_books(rows)
+        result = upsert_books(books)
+
+        self.progress["items"] += len(rows) + invalid
+        self.progress["created"] += len(result.created)
+        self.progress["updated"] += len(result.updated)
+        self.progress["skipped"] += result.skipped
+        self.progress["invalid"] += len(errors) + invalid
+        self.save_checkpoint(cursor)
+        if self.verbosity > 1:
+            self.report()
+
+    def load_checkpoint(self):
+        try:
+            with open(self.checkpoint_path) as file:
+                checkpoint = json.load(file)
+        except FileNotFoundError:
+            raise CommandError(f"Checkpoint {self.checkpoint_path} doesn't exist.")
+        if checkpoint["path"] != self.path:
+            raise CommandError(f"Checkpoint was created for {checkpoint['path']}.")
+        self.progress.update(checkpoint["progress"])
+        return checkpoint["cursor"]
+
+    def save_checkpoint(self, cursor):
+        checkpoint = {"path": self.path, "cursor": cursor, "progress": self.progress}
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(checkpoint, file)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def report(self):
+        elapsed = time.monotonic() - self.started
+        items = self.progress["items"] - self.resumed_items
+        rate = items / elapsed if elapsed else 0
+        # ru_maxrss is in kilobytes on Linux
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        self.stdout.write(
+            "Items: {items}, created: {created}, updated: {updated}, "
+            "skipped: {skipped}, "
+            "invalid: {invalid}".format(**self.progress)
+            + f" in {elapsed:.1f}s ({rate:.0f} rows/s), peak RSS {peak_rss:.1f} MB"
+        )
@@ -0,0 +1,174 @@
+"""Refresh books imported from google api.
+
+Usage: manage.py refresh_google_books [--batch-size 100] [--concurrency 4]
+
+Volumes of books with google id are fetched in batches by thread pool, with
+requests limited to GOOGLE_REFRESH_RATE per second for all threads. Requests
+are conditional on etag saved by previous refresh, so unchanged volumes are
+answered with 304 without body. Only books whose parsed fields or etag
+changed are written, with bulk_update once per batch. Volumes are requested
+with "etag" in partial response fields, so the etag is saved even when the
+ETag header is missing.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Any, List, Optional
+
+import requests
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from bookmanager.books.bulk import BOOK_FIELDS, build_book
+from bookmanager.books.catalog import catalog_changed
+from bookmanager.books.google_client import GoogleBooksClient, RateLimiter
+from bookmanager.books.models import Book
+from bookmanager.books.utils import (
+    GOOGLE_VOLUME_FIELDS,
+    google_book_parser,
+    google_fields_selector,
+)
+
+REFRESH_FIELDS = [field for field in BOOK_FIELDS if field != "google_id"]
+ETAG_FIELDS = ["google_etag", "google_fetched_at"]
+REFRESH_PARAMS = {"fields": google_fields_selector(["etag", *GOOGLE_VOLUME_FIELDS])}
+
+
+class Command(BaseCommand):
+    help = "Refresh books imported from google api with conditional requests."
+    # GoogleBooksClient instance may be passed by call_command
+    stealth_options = ("client",)
+
+    def add_arguments(self, parser):
+        config = settings  # type: Any
+        parser.add_argument(
+            "--batch-size", type=int, default=config.GOOGLE_REFRESH_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=config.GOOGLE_IMPORT_CONCURRENCY
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=config.GOOGLE_REFRESH_RATE,
+            help="Max google api requests per second.",
+        )
+
+    def handle(self, *args, **options):
+        if options["rate"] <= 0:
+            raise CommandError("--rate must be greater than 0.")
+        self.client = options.get("client") or GoogleBooksClient()
+        self.limiter = RateLimiter(options["rate"])
+        self.concurrency = options["concurrency"]
+        self.batch_size = options["batch_size"]
+        self.verbosity = options["verbosity"]
+        self.progress = {
+            "checked": 0,
+            "not_modified": 0,
+            "changed": 0,
+            "unchanged": 0,
+            "invalid": 0,
+            "failed": 0,
+        }
+
+        self.started = time.monotonic()
+        last_pk = None
+        while True:
+            rows = self.next_batch(last_pk)
+            if not rows:
+                break
+            self.refresh_batch(rows)
+            last_pk = rows[-1]["pk"]
+            if self.verbosity > 1:
+                self.report()
+        self.report()
+
+    def next_batch(self, last_pk) -> List[dict]:
+        """Return saved data of next batch of imported books, ordered by pk."""
+        books = Book.objects.exclude(google_id=None).order_by("pk")
+        if last_pk is not None:
+            books = books.filter(pk__gt=last_pk)
+        fields = ["pk", "google_id", "google_etag", "google_fetched_at"]
+        return list(books.values(*fields, *REFRESH_FIELDS)[: self.batch_size])
+
+    def fetch(self, row: dict) -> Optional[requests.Response]:
+        self.limiter.acquire()
+        try:
+            return self.client.volume(
+                row["google_id"], params=REFRESH_PARAMS, etag=row["google_etag"]
+            )
+        except requests.RequestException:
+            return None
+
+    def refresh_batch(self, rows: List[dict]):
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            responses = list(executor.map(self.fetch, rows))
+
+        changed, etag_changed = [], []
+        now = timezone.now()
+        for row, response in zip(rows, responses):
+            self.progress["checked"] += 1
+            if response is None or response.status_code not in (200, 304):
+                self.progress["failed"] += 1
+                continue
+            if response.status_code == 304:
+                self.progress["not_modified"] += 1
+                continue
+
+            volume = response.json()
+            etag = response.headers.get("ETag") or volume.get("etag", "")
+            try:
+                book = self.changed_book(row, volume)
+            except ValidationError:
+                self.progress["invalid"] += 1
+                continue
+
+            if book is None:
+                self.progress["unchanged"] += 1
+                if etag == row["google_etag"]:
+                    continue
+                book = Book(pk=row["pk"])
+                etag_changed.append(book)
+            else:
+                self.progress["changed"] += 1
+                changed.append(book)
+            book.google_etag = etag[:64]
+            book.google_fetched_at = now
+
+        Book.objects.bulk_update(
+            changed, [*REFRESH_FIELDS, "slug", "modified_date", *ETAG_FIELDS]
+        )
+        Book.objects.bulk_update(etag_changed, ETAG_FIELDS)
+        if changed:
+            catalog_changed()
+
+    def changed_book(self, row: dict, volume: dict) -> Optional[Book]:
+        """Return book with fields parsed from volume or None if none changed.
+
+        Raise ValidationError when parsed data is not valid book.
+        """
+        book = build_book(google_book_parser(volume))
+        if not volume.get("volumeInfo", {}).get("publishedDate"):
+            # parser defaults missing date to today, keep the saved one
+            book.published_date = row["published_date"]
+        book.full_clean(validate_unique=False)
+
+        if all(
+            (getattr(book, field) or "") == (row[field] or "")
+            for field in REFRESH_FIELDS
+        ):
+            return None
+        book.pk = row["pk"]
+        book.modified_date = date.today()
+        return book
+
+    def report(self):
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(
+            "Checked: {checked}, not modified: {not_modified}, "
+            "changed: {changed}, unchanged: {unchanged}, invalid: {invalid}, "
+            "failed: {failed}".format(**self.progress) + f" in {elapsed:.1f}s"
+        )
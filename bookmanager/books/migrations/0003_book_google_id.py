@@ -0,0 +1,57 @@
+# Generated by Django 3.2.8 on 2026-10-18 01:33
+
+import isbn_field.fields
+import isbn_field.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0002_importjob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="book",
+            name="google_id",
+            field=models.CharField(
+                blank=True,
+                max_length=40,
+                null=True,
+                unique=True,
+                verbose_name="Google volume id",
+            ),
+        ),
+        migrations.AddField(
+            model_name="importjob",
+            name="updated",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="book",
+            name="isbn_10",
+            field=isbn_field.fields.ISBNField(
+                blank=True,
+                db_index=True,
+                default="",
+                max_length=28,
+                null=True,
+                validators=[isbn_field.validators.ISBNValidator],
+                verbose_name="ISBN_10",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="book",
+            name="isbn_13",
+            field=isbn_field.fields.ISBNField(
+                blank=True,
+                db_index=True,
+                default="",
+                max_length=28,
+                null=True,
+                validators=[isbn_field.validators.ISBNValidator],
+                verbose_name="ISBN_13",
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.8 on 2026-10-18 01:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0003_book_google_id"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="book",
+            name="google_etag",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+        migrations.AddField(
+            model_name="book",
+            name="google_fetched_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
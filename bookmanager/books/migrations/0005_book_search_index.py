@@ -0,0 +1,65 @@
+from django.db import OperationalError, migrations
+
+# frozen copy of bookmanager.books.search index, later changes of the module
+# mustn't change what this migration does
+CREATE_INDEX_SQL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS books_book_fts USING fts5(
+        title, author, content='books_book', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS books_book_fts_insert AFTER INSERT ON books_book
+    BEGIN
+        INSERT INTO books_book_fts(rowid, title, author)
+        VALUES (new.rowid, new.title, new.author);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS books_book_fts_delete AFTER DELETE ON books_book
+    BEGIN
+        INSERT INTO books_book_fts(books_book_fts, rowid, title, author)
+        VALUES ('delete', old.rowid, old.title, old.author);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS books_book_fts_update
+    AFTER UPDATE OF title, author ON books_book
+    BEGIN
+        INSERT INTO books_book_fts(books_book_fts, rowid, title, author)
+        VALUES ('delete', old.rowid, old.title, old.author);
+        INSERT INTO books_book_fts(rowid, title, author)
+        VALUES (new.rowid, new.title, new.author);
+    END""",
+    "INSERT INTO books_book_fts(books_book_fts) VALUES ('rebuild')",
+]
+DROP_INDEX_SQL = [
+    "DROP TRIGGER IF EXISTS books_book_fts_delete",
+    "DROP TRIGGER IF EXISTS books_book_fts_insert",
+    "DROP TRIGGER IF EXISTS books_book_fts_update",
+    "DROP TABLE IF EXISTS books_book_fts",
+]
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    try:
+        with schema_editor.connection.cursor() as cursor:
+            for sql in CREATE_INDEX_SQL:
+                cursor.execute(sql)
+    except OperationalError:
+        # sqlite compiled without fts5, search falls back to icontains
+        pass
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for sql in DROP_INDEX_SQL:
+            cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0004_book_google_etag"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
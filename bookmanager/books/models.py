@@ -2,6 +2,8 @@
 
 Models list:
 -Book
+-ImportJob
+-CatalogVersion
 
 """
 
@@ -15,6 +17,13 @@ from isbn_field import ISBNField
 from .utils import DEFAULT_COVER_URI
 
 
+def clean_isbn(isbn):
+    """Remove dashes and spaces from isbn like ISBNField does before save."""
+    if not isbn:
+        return isbn
+    return isbn.replace(" ", "").replace("-", "").upper()
+
+
 class TimeStamps(models.Model):
     created_date = models.DateField(auto_now_add=True)
     modified_date = models.DateField(auto_now=True)
@@ -32,13 +41,24 @@ class Identifiers(models.Model):
         verbose_name="ISBN_10",
         default="",
         blank=True,
+        db_index=True,
     )
     isbn_13 = ISBNField(
         null=True,
         verbose_name="ISBN_13",
         default="",
         blank=True,
+        db_index=True,
+    )
+    google_id = models.CharField(
+        max_length=40,
+        unique=True,
+        null=True,
+        blank=True,
+        verbose_name="Google volume id",
     )
+    google_etag = models.CharField(max_length=64, blank=True, default="")
+    google_fetched_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         abstract = True
@@ -53,6 +73,9 @@ class Book(TimeStamps, Identifiers):
     -published (required), - date of publication in YYYY-MM-DD format
     -isbn_10 - ISBN_10 number
     -isbn_13 - ISBN_13 number
+    -google_id - id of google api volume the book was imported from
+    -google_etag, google_fetched_at - etag and time of last google api data
+     saved by refresh_google_books command
     -cover_uri - uri to cover image,
     -language - language of publication,
     -slug - slugified version of title
@@ -70,6 +93,20 @@ class Book(TimeStamps, Identifiers):
         max_length=120,
     )
 
+    class Meta:
+        # orderings of list views and their keyset pagination, language and
+        # date range filters of InternalBooksFilter
+        indexes = [
+            models.Index(
+                fields=["published_date", "id"], name="book_published_date_id_idx"
+            ),
+            models.Index(fields=["title", "id"], name="book_title_id_idx"),
+            models.Index(
+                fields=["language", "published_date"],
+                name="book_language_published_idx",
+            ),
+        ]
+
     def __repr__(self) -> str:
         """Return object representation."""
         return (
@@ -84,15 +121,110 @@ class Book(TimeStamps, Identifiers):
     @classmethod
     def from_db(cls, db, field_names, values):
         book = super().from_db(db, field_names, values)
-        if not book.cover_uri:
+        # cover_uri is deferred when book is loaded with only()
+        if "cover_uri" in field_names and not book.cover_uri:
             book.cover_uri = DEFAULT_COVER_URI
 
         return book
 
-    def save(self, *args, **kwargs):
-        """Create slug from book title and save."""
+    @classmethod
+    def find_imported(cls, google_id=None, isbn_10=None, isbn_13=None):
+        """Return book with given google id or isbn in one query or None.
+
+        Book with matching google id is preferred over books matching isbn.
+        """
+        lookup = models.Q()
+        for field, value in [
+            ("google_id", google_id),
+            ("isbn_13", clean_isbn(isbn_13)),
+            ("isbn_10", clean_isbn(isbn_10)),
+        ]:
+            if value:
+                lookup |= models.Q(**{field: value})
+        if not lookup:
+            return None
+
+        books = list(cls.objects.filter(lookup)[:3])
+        for book in books:
+            if google_id and book.google_id == google_id:
+                return book
+        return books[0] if books else None
+
+    def prepare(self):
+        """Create slug from book title, drop default cover uri, clean ids.
+
+        Called by save and before bulk_create which doesn't call save.
+        """
         self.slug = slugify(self.title)
         if self.cover_uri == DEFAULT_COVER_URI:
             self.cover_uri = ""
+        if not self.google_id:
+            self.google_id = None
+        self.isbn_10 = clean_isbn(self.isbn_10)
+        self.isbn_13 = clean_isbn(self.isbn_13)
+
+    def save(self, *args, **kwargs):
+        """Create slug from book title and save."""
+        self.prepare()
         self.full_clean()
         return super().save(*args, **kwargs)
+
+
+class ImportJob(models.Model):
+    """Job importing all google api results for query.
+
+    Fields:
+    -query - google search form data (search, intitle, inauthor),
+    -status - pending, running, finished or failed,
+    -total - total number of items reported by google api,
+    -pages_total, pages_done, pages_failed - progress of fetched pages,
+    -imported - number of created books,
+    -updated - number of books updated with google api data,
+    -skipped - number of duplicated items,
+    -invalid - number of items that didn't pass Book validation,
+    -error - reason of failure
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    FINISHED = "finished"
+    FAILED = "failed"
+    STATUSES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (FINISHED, "Finished"),
+        (FAILED, "Failed"),
+    ]
+
+    id = models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True)
+    query = models.JSONField()
+    status = models.CharField(max_length=8, choices=STATUSES, default=PENDING)
+    total = models.PositiveIntegerField(default=0)
+    pages_total = models.PositiveIntegerField(default=0)
+    pages_done = models.PositiveIntegerField(default=0)
+    pages_failed = models.PositiveIntegerField(default=0)
+    imported = models.PositiveIntegerField(default=0)
+    updated = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+    invalid = models.PositiveIntegerField(default=0)
+    error = models.CharField(max_length=200, blank=True, default="")
+    created = models.DateTimeField(auto_now_add=True)
+    modified = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.query}, {self.status}"
+
+
+class CatalogVersion(models.Model):
+    """Single row with version of books catalog, see catalog module.
+
+    Fields:
+    -version - incremented on every write of books,
+    -modified - time of last write
+    """
+
+    version = models.PositiveBigIntegerField(default=0)
+    modified = models.DateTimeField()
+
+    def __str__(self) -> str:
+        return f"{self.version}, {self.modified}"
@@ -0,0 +1,92 @@
+"""Background prefetch of next page of google search results.
+
+With GOOGLE_PREFETCH enabled ImportList asks for page N + 1 after serving
+page N. The page is fetched by small thread pool into google cache, so click
+on "next" is served without request to google api.
+
+Prefetch requests have own token bucket refilled with GOOGLE_PREFETCH_SHARE
+of GOOGLE_API_RATE_LIMIT. Requests over it are dropped, not queued, so
+prefetch never takes more than that share of api quota. Nothing is
+prefetched while circuit breaker isn't closed.
+"""
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Optional
+
+from django.conf import settings
+
+from .google_cache import flights, get_cache, search_cache_key
+from .google_client import CircuitBreaker, RateLimiter, get_client
+from .utils import get_google_api_books, google_api_params, google_api_query
+
+
+class Prefetcher:
+    """Fetch search result pages into google cache in background threads."""
+
+    def __init__(self, workers: int, rate: float):
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="google-prefetch"
+        )
+        self.limiter = RateLimiter(rate)
+        self.lock = threading.Lock()
+        self.pending = set()  # type: set
+
+    def should_fetch(self, key: str) -> bool:
+        if key in self.pending or flights.in_flight(key):
+            return False
+        if get_cache().get(key) is not None:
+            return False
+        if get_client().breaker.state != CircuitBreaker.CLOSED:
+            return False
+        return self.limiter.acquire(timeout=0)
+
+    def prefetch(self, query_dict: dict, page: int) -> Optional[Future]:
+        """Start fetching page, return its future or None if it's skipped."""
+        # request's QueryDict isn't passed to other thread
+        query_dict = {key: query_dict.get(key) for key in query_dict}
+        key = search_cache_key(
+            google_api_query(query_dict), google_api_params(page=page)
+        )
+        with self.lock:
+            if not self.should_fetch(key):
+                return None
+            self.pending.add(key)
+
+        future = self.executor.submit(get_google_api_books, query_dict, page=page)
+        future.add_done_callback(lambda _: self.done(key))
+        return future
+
+    def done(self, key: str):
+        with self.lock:
+            self.pending.discard(key)
+
+
+_prefetcher = None  # type: Optional[Prefetcher]
+_prefetcher_pid = None  # type: Optional[int]
+_prefetcher_lock = threading.Lock()
+
+
+def get_prefetcher() -> Prefetcher:
+    """Return prefetcher shared by all threads of current process."""
+    global _prefetcher, _prefetcher_pid
+
+    pid = os.getpid()
+    if _prefetcher is None or _prefetcher_pid != pid:
+        with _prefetcher_lock:
+            if _prefetcher is None or _prefetcher_pid != pid:
+                config = settings  # type: Any
+                _prefetcher = Prefetcher(
+                    workers=config.GOOGLE_PREFETCH_WORKERS,
+                    rate=config.GOOGLE_API_RATE_LIMIT * config.GOOGLE_PREFETCH_SHARE,
+                )
+                _prefetcher_pid = pid
+    return _prefetcher
+
+
+def prefetch_page(query_dict: dict, page: int) -> Optional[Future]:
+    """Prefetch page of search results if prefetch is enabled."""
+    if not settings.GOOGLE_PREFETCH:  # type: ignore
+        return None
+    return get_prefetcher().prefetch(query_dict, page)
@@ -0,0 +1,156 @@
+"""Full text search of book titles and authors.
+
+On SQLite titles and authors are indexed in books_book_fts FTS5 table with
+books_book as external content. Triggers keep the index in sync with every
+insert, update and delete, bulk ones included. Searched text is split into
+tokens, each matched as prefix of word in its column, results are ordered by
+bm25 relevance.
+
+Django rebuilds SQLite tables on some schema changes, which drops triggers
+and changes rowids. Index is checked after every migrate and rebuilt when
+any part is missing, also run rebuild_search_index() after VACUUM.
+
+Other backends and SQLite built without FTS5 fall back to icontains lookups.
+"""
+
+import re
+
+from django.db import OperationalError, connections
+from django.db.models import Q, QuerySet
+
+from .models import Book
+
+BOOK_TABLE = Book._meta.db_table
+FTS_TABLE = f"{BOOK_TABLE}_fts"
+TOKEN = re.compile(r"\w+")
+COLUMNS = ["title", "author"]
+
+CREATE_INDEX_SQL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, author, content='{BOOK_TABLE}', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON {BOOK_TABLE}
+    BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, author)
+        VALUES (new.rowid, new.title, new.author);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON {BOOK_TABLE}
+    BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, author)
+        VALUES ('delete', old.rowid, old.title, old.author);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+    AFTER UPDATE OF title, author ON {BOOK_TABLE}
+    BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, author)
+        VALUES ('delete', old.rowid, old.title, old.author);
+        INSERT INTO {FTS_TABLE}(rowid, title, author)
+        VALUES (new.rowid, new.title, new.author);
+    END""",
+]
+INDEX_OBJECTS = {
+    FTS_TABLE,
+    f"{FTS_TABLE}_insert",
+    f"{FTS_TABLE}_delete",
+    f"{FTS_TABLE}_update",
+}
+
+
+def search_index_complete(connection) -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name IN (%s, %s, %s, %s)",
+            sorted(INDEX_OBJECTS),
+        )
+        return {row[0] for row in cursor.fetchall()} == INDEX_OBJECTS
+
+
+def rebuild_search_index(using: str = "default"):
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def create_search_index(using: str = "default") -> bool:
+    """Create missing parts of index on SQLite and rebuild it.
+
+    Return False if index can't be used on the database.
+    """
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return False
+    if search_index_complete(connection):
+        return True
+    try:
+        with connection.cursor() as cursor:
+            for sql in CREATE_INDEX_SQL:
+                cursor.execute(sql)
+    except OperationalError:
+        # sqlite compiled without fts5
+        return False
+    rebuild_search_index(using)
+    return True
+
+
+def drop_search_index(using: str = "default"):
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for name in sorted(INDEX_OBJECTS - {FTS_TABLE}):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def search_index_available(using: str = "default") -> bool:
+    """Return True if full text index exists, checked once per connection."""
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return False
+    if getattr(connection, "books_search_index", None) is None:
+        connection.books_search_index = search_index_complete(connection)
+    return connection.books_search_index
+
+
+def match_expression(terms: dict) -> str:
+    """Return FTS5 query matching prefixes of all tokens in their columns.
+
+    {"title": "harry pot"} gives 'title : ("harry"* AND "pot"*)'.
+    """
+    expressions = []
+    for column in COLUMNS:
+        tokens = TOKEN.findall(terms.get(column) or "")
+        if tokens:
+            phrases = " AND ".join(f'"{token}"*' for token in tokens)
+            expressions.append(f"{column} : ({phrases})")
+    return " AND ".join(expressions)
+
+
+def search_books(queryset: QuerySet, terms: dict) -> QuerySet:
+    """Filter books by title and author terms, most relevant first.
+
+    Queryset ordering is kept for books with equal relevance.
+    """
+    terms = {column: terms.get(column) for column in COLUMNS if terms.get(column)}
+    if not terms:
+        return queryset
+
+    match = match_expression(terms)
+    if not match or not search_index_available(queryset.db):
+        lookup = Q()
+        for column, value in terms.items():
+            lookup &= Q(**{f"{column}__icontains": value})
+        return queryset.filter(lookup)
+
+    # ORM can't join index table which has no model, RawSQL subquery in
+    # annotation would run MATCH once per book instead of once per query
+    return queryset.extra(
+        select={"search_rank": f"{FTS_TABLE}.rank"},
+        tables=[FTS_TABLE],
+        where=[f"{FTS_TABLE}.rowid = {BOOK_TABLE}.rowid", f"{FTS_TABLE} MATCH %s"],
+        params=[match],
+    ).order_by("search_rank", *queryset.query.order_by)
+
+
+def is_ranked(queryset: QuerySet) -> bool:
+    """Return True if queryset is ordered by full text search relevance."""
+    return "search_rank" in queryset.query.extra
@@ -0,0 +1,52 @@
+"""Coalescing of identical concurrent calls.
+
+Callers asking for the same key while a call for that key is in flight wait
+for it and share its result instead of making their own call.
+"""
+
+import threading
+from typing import Any, Callable, Dict
+
+
+class Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None  # type: Any
+        self.error = None  # type: Any
+
+
+class SingleFlight:
+    """Run only one call per key at a time within a process."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}  # type: Dict[str, Call]
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Return result of fn, called once for all concurrent callers of key."""
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self, key: str) -> bool:
+        with self.lock:
+            return key in self.calls
@@ -3,6 +3,8 @@ from django.conf import settings
 from django.conf.global_settings import LANGUAGES
 from django.urls import reverse
 
+from ..keyset import KeysetPage
+
 register = template.Library()
 
 
@@ -36,11 +38,11 @@ def internal_search_form(_filter):
 
 
 @register.inclusion_tag("../templates/books/google_search_form.html")
-def google_search_form(query_dict):
+def google_search_form(query_dict, action="books:import-list"):
     context = {}
     if isinstance(query_dict, dict):
         context = {item[0]: item[1] for item in query_dict.items()}
-    return {"action": reverse("books:import-list"), **context}
+    return {"action": reverse(action), **context}
 
 
 @register.inclusion_tag("../templates/books/cover_frame.html")
@@ -48,11 +50,41 @@ def cover_frame(cover_uri):
     return {"cover_uri": cover_uri}
 
 
+def keyset_pagination_buttons(page_obj):
+    """Return buttons of keyset page, total number of pages isn't known."""
+    buttons = []
+    if page_obj.has_previous():
+        buttons.append({"param": "cursor", "page": "", "text": "first"})
+        buttons.append(
+            {"param": "cursor", "page": page_obj.previous_cursor(), "text": "previous"}
+        )
+    buttons.append(
+        {
+            "param": "cursor",
+            "page": page_obj.cursor,
+            "current": True,
+            "text": page_obj.number,
+        }
+    )
+    if page_obj.has_next():
+        buttons.append(
+            {"param": "cursor", "page": page_obj.next_cursor(), "text": "next"}
+        )
+    return buttons
+
+
 @register.inclusion_tag("../templates/pagination.html")
 def pagination(page_obj, query=""):
+    if isinstance(page_obj, KeysetPage):
+        return {"query": query, "buttons": keyset_pagination_buttons(page_obj)}
+
     buttons = []
-    pages = page_obj.paginator.num_pages
+    paginator = page_obj.paginator
+    # paginators of lists with many rows know only estimated count
+    count_exact = getattr(paginator, "count_exact", True)
     current_page = page_obj.number
+    # last page isn't known with estimated count, links reach next page only
+    pages = paginator.num_pages if count_exact else current_page + page_obj.has_next()
 
     # add button with "previous" text if previous page exists
     if page_obj.has_previous():
@@ -67,12 +99,11 @@ def pagination(page_obj, query=""):
 
     # always add buttons with link to +-scope from current page
     scope = 2
-    for i in range(2, pages):
-        if current_page - scope <= i <= current_page + scope:
-            buttons.append({"page": i, "current": i == current_page, "text": i})
+    for i in range(max(2, current_page - scope), min(pages, current_page + scope + 1)):
+        buttons.append({"page": i, "current": i == current_page, "text": i})
 
     # add button with link to the last page if current page is not the last
-    if current_page < pages:
+    if count_exact and current_page < pages:
         buttons.append({"page": pages, "current": pages == current_page, "text": pages})
 
     # add button with "next" text if next page exists
@@ -82,4 +113,9 @@ def pagination(page_obj, query=""):
             {"page": _next, "current": _next == current_page, "text": "next"}
         )
 
-    return {"query": query, "buttons": buttons}
+    return {
+        "query": query,
+        "buttons": buttons,
+        "count": paginator.count,
+        "count_exact": count_exact,
+    }
@@ -5,8 +5,10 @@ from .views import (
     BookDeleteView,
     BookSearchListView,
     BookUpdateView,
+    FederatedSearch,
     ImportBook,
     ImportList,
+    ImportSelected,
 )
 
 urlpatterns = [
@@ -15,6 +17,8 @@ urlpatterns = [
     path("<str:pk>/update", BookUpdateView.as_view(), name="update"),
     path("<str:pk>/delete", BookDeleteView.as_view(), name="delete"),
     path("search", BookSearchListView.as_view(), name="search"),
+    path("federated-search", FederatedSearch.as_view(), name="federated-search"),
     path("import-list", ImportList.as_view(), name="import-list"),
     path("import-book", ImportBook.as_view(), name="import-book"),
+    path("import-selected", ImportSelected.as_view(), name="import-selected"),
 ]
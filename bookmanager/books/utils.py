@@ -1,16 +1,67 @@
 from datetime import date
-from math import ceil
-from typing import List
+from http import HTTPStatus
+from typing import Dict, List, Tuple
 
 import requests
 from django.conf import settings
 from django.core.paginator import EmptyPage, Page, Paginator
+from django.utils.functional import cached_property
+
+from .google_cache import (
+    cached_response,
+    get_volume_cache,
+    search_cache_key,
+    stats,
+    volume_cache_key,
+)
+from .google_client import GoogleBooksClient, get_client
 
 DEFAULT_COVER_URI = "https://books.google.pl/googlebooks/images/no_cover_thumb.gif"
-API = "https://www.googleapis.com/books/v1/volumes"
 
 PAGINATE_BY = settings.PAGINATE_BY  # type: ignore
-GOOGLE_API_QUERY_PARAMS = {"maxResults": PAGINATE_BY}
+
+# volume keys read by google_book_parser, google api is asked for these only
+GOOGLE_VOLUME_FIELDS = [
+    "id",
+    "volumeInfo/title",
+    "volumeInfo/authors",
+    "volumeInfo/publishedDate",
+    "volumeInfo/language",
+    "volumeInfo/pageCount",
+    "volumeInfo/industryIdentifiers",
+    "volumeInfo/imageLinks/thumbnail",
+    "volumeInfo/infoLink",
+]
+
+
+def google_fields_selector(paths: List[str]) -> str:
+    """Return google api partial response selector for key paths.
+
+    Paths with common parent are grouped, ["a/b", "a/c/d"] gives "a(b,c/d)".
+    """
+    children = {}  # type: Dict[str, List[str]]
+    for path in paths:
+        key, _, rest = path.partition("/")
+        children.setdefault(key, [])
+        if rest:
+            children[key].append(rest)
+
+    selectors = []
+    for key, rest in children.items():
+        if len(rest) > 1:
+            selectors.append(f"{key}({google_fields_selector(rest)})")
+        elif rest:
+            selectors.append(f"{key}/{rest[0]}")
+        else:
+            selectors.append(key)
+    return ",".join(selectors)
+
+
+GOOGLE_VOLUME_PARAMS = {"fields": google_fields_selector(GOOGLE_VOLUME_FIELDS)}
+GOOGLE_API_QUERY_PARAMS = {
+    "maxResults": PAGINATE_BY,
+    "fields": f"totalItems,items({GOOGLE_VOLUME_PARAMS['fields']})",
+}
 
 
 def identifiers_finder(identifiers):
@@ -26,6 +77,15 @@ def identifiers_finder(identifiers):
     return isbn_s
 
 
+def published_date_parser(published_date: str) -> str:
+    """Complete partial google api dates ("YYYY", "YYYY-MM") to YYYY-MM-DD."""
+    parts = published_date.split("-")
+    if len(parts) in (1, 2) and all(part.isdecimal() for part in parts):
+        parts += ["01"] * (3 - len(parts))
+        return "-".join(parts)
+    return published_date
+
+
 def google_book_parser(book):
     """Parse book item form google api response to Book model."""
 
@@ -33,7 +93,9 @@ def google_book_parser(book):
     authors = volume_info.get("authors", [])
     authors = " ".join(authors) if len(authors) else ""
     cover_uri = volume_info.get("imageLinks", {}).get("thumbnail", DEFAULT_COVER_URI)
-    published_date = volume_info.get("publishedDate", date.today().strftime("%Y-%m-%d"))
+    published_date = published_date_parser(
+        volume_info.get("publishedDate", date.today().strftime("%Y-%m-%d"))
+    )
     language = volume_info.get("language", "")
     pages = volume_info.get("pageCount", "")
     identifiers = volume_info.get("industryIdentifiers", [])
@@ -48,49 +110,66 @@ def google_book_parser(book):
         "isbn_13": isbn_s["isbn_13"],
         "pages": pages,
         "id": book.get("id", "#"),
+        "google_id": book.get("id"),
         "cover_uri": cover_uri,
         "self_link": volume_info.get("infoLink", ""),
     }
     return book
 
 
-def get_paginator_page(paginator: Paginator, page: int) -> Page:
-    """Get page results from given paginator and page."""
+class VirtualPaginator(Paginator):
+    """Paginator for results fetched one page at a time.
+
+    Google api returns total number of items and only items for requested
+    page. Paginator knows total count but holds only items of loaded page,
+    so memory and time don't depend on total.
+    """
+
+    def __init__(self, items: list, total: int, page: int = 1, per_page=PAGINATE_BY):
+        super().__init__(items[:per_page], per_page)
+        self.total = total
+        self.loaded_page = page
+
+    @cached_property
+    def count(self) -> int:
+        """Return total number of items reported by api."""
+        return self.total
+
+    def page(self, number) -> Page:
+        """Return page with loaded items or empty page for other numbers."""
+        number = self.validate_number(number)
+        items = self.object_list if number == self.loaded_page else []
+        return self._get_page(items, number, self)
+
+    @property
+    def loaded_page_number(self) -> int:
+        """Return number of page with loaded items or 1 if it's out of range."""
+        if 1 <= self.loaded_page <= self.num_pages:
+            return self.loaded_page
+        return 1
+
+
+def get_paginator_page(paginator: VirtualPaginator, page: int) -> Page:
+    """Get page results from given paginator and page.
+
+    If page is out of range return page with loaded items.
+    """
     try:
         items = paginator.page(page)
     except EmptyPage:
-        index = 1
-        for i, item in enumerate(paginator.object_list):
-            if item:
-                # if item is at index 0 return 1 so returned 'page' is not 0
-                index = i + 1
-                break
-
-        page = ceil(index / PAGINATE_BY)
-        items = paginator.page(page)
+        items = paginator.page(paginator.loaded_page_number)
 
     return items
 
 
-def create_paginator(items: list, total: int, page: int = 1) -> Paginator:
+def create_paginator(items: list, total: int, page: int = 1) -> VirtualPaginator:
     """Create paginator for given total number of item.
 
     Google api returns total number and list of items where max is equal to
-    PAGINATE_BY value. If e.g. total is 1000 and list of items contains 40
-    items function creates list with lenght of total with items shifted to
-    positions accorging to page:.
+    PAGINATE_BY value. Paginator keeps only given items as items of page.
     """
 
-    start_index = (page - 1) * PAGINATE_BY
-    my_list = []
-    top = PAGINATE_BY if PAGINATE_BY < len(items) else len(items)
-    for i in range(total):
-        if start_index <= i < start_index + top:
-            my_list.append(items[i - start_index])
-        else:
-            my_list.append("")
-
-    return Paginator(my_list, PAGINATE_BY)
+    return VirtualPaginator(items, total, page)
 
 
 def google_api_query(query_dict: dict) -> str:
@@ -114,17 +193,16 @@ def google_api_query(query_dict: dict) -> str:
     return query_string
 
 
-def get_google_api_books(query_dict: dict, params: dict = None, page: int = 1) -> tuple:
-    """Get books from google api from given page."""
-    query = google_api_query(query_dict)
-    if not params:
-        params = {}
-    params.update(GOOGLE_API_QUERY_PARAMS)
-
-    start_index = (page - 1) * PAGINATE_BY
-    params.update({"startIndex": start_index})
+def fetch_google_api_books(
+    query: str, params: dict, client: GoogleBooksClient = None
+) -> tuple:
+    """Fetch and parse books from google api for query string and params."""
+    client = client or get_client()
+    try:
+        response = client.search(query, params=params)
+    except requests.RequestException:
+        return [], 0, HTTPStatus.SERVICE_UNAVAILABLE
 
-    response = requests.get(f"{API}?{query}", params=params)
     books = []  # type: List[dict]
     total = 0
     if response.status_code == 200:
@@ -134,3 +212,94 @@ def get_google_api_books(query_dict: dict, params: dict = None, page: int = 1) -
             books.append(google_book_parser(result))
 
     return books, total, response.status_code
+
+
+def fetch_google_api_book(volume_id: str) -> Tuple[dict, int]:
+    """Fetch and parse book with given google id."""
+    try:
+        response = get_client().volume(volume_id, params=GOOGLE_VOLUME_PARAMS)
+    except requests.RequestException:
+        return {}, HTTPStatus.SERVICE_UNAVAILABLE
+
+    if response.status_code != 200:
+        return {}, response.status_code
+    return google_book_parser(response.json()), response.status_code
+
+
+def google_api_params(params: dict = None, page: int = 1) -> dict:
+    """Return google api request params for given page."""
+    params = dict(params or {})
+    params.update(GOOGLE_API_QUERY_PARAMS)
+    params.update({"startIndex": (page - 1) * PAGINATE_BY})
+    return params
+
+
+def get_google_api_books(query_dict: dict, params: dict = None, page: int = 1) -> tuple:
+    """Get books from google api from given page.
+
+    Successful responses and books they contain are cached, see google_cache
+    module.
+    """
+    query = google_api_query(query_dict)
+    params = google_api_params(params, page)
+
+    def fetch():
+        response = fetch_google_api_books(query, params)
+        books, _, status = response
+        if status == 200:
+            cache_volumes(books)
+        return response
+
+    return cached_response(search_cache_key(query, params), fetch)
+
+
+def cache_volumes(books: List[dict]):
+    """Cache parsed search results as volumes.
+
+    ImportBook opened from search results page gets book from cache, without
+    fetching volume again.
+    """
+    get_volume_cache().set_many(
+        {
+            volume_cache_key(book["google_id"]): (book, 200)
+            for book in books
+            if book["google_id"]
+        }
+    )
+
+
+def get_google_api_book(volume_id: str) -> Tuple[dict, int]:
+    """Get parsed book with given google id and response status code.
+
+    Books of recently fetched search results are taken from cache.
+    """
+    key = volume_cache_key(volume_id)
+    response = get_volume_cache().get(key)
+    if response is not None:
+        stats.hit()
+        return response
+    return cached_response(key, lambda: fetch_google_api_book(volume_id))
+
+
+def get_google_api_books_by_ids(
+    ids: List[str], query_dict: dict, page: int = 1
+) -> Tuple[List[dict], List[str]]:
+    """Get parsed books with given google ids.
+
+    Books are taken from (usually cached) search results page they were
+    selected on, only books missing there are fetched one by one. Return books
+    in order of ids and ids that couldn't be fetched.
+    """
+    books, _, status = get_google_api_books(query_dict, page=page)
+    found = {book["id"]: book for book in books}
+
+    missing = []
+    for volume_id in ids:
+        if volume_id not in found:
+            book, status = get_google_api_book(volume_id)
+            if status == 200:
+                found[volume_id] = book
+            else:
+                missing.append(volume_id)
+
+    return [found[volume_id] for volume_id in ids if volume_id in found], missing
@@ -1,28 +1,37 @@
-import requests
 from django.conf import settings
 from django.conf.global_settings import LANGUAGES
 from django.contrib import messages
-from django.http import HttpResponseBadRequest
-from django.shortcuts import redirect
+from django.http import Http404, HttpResponseBadRequest
+from django.shortcuts import redirect, render
 from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.utils.http import urlencode
 from django.views.generic import (
     CreateView,
     DeleteView,
     ListView,
     TemplateView,
     UpdateView,
+    View,
 )
 from django_filters.views import FilterView
 
+from .bulk import upsert_books, validate_books
+from .catalog import catalog_page_condition
+from .counts import CountCachingPaginator, filterset_count
+from .federated import federated_search
 from .filters import InternalBooksFilter
-from .forms import BookAddEditForm, GoogleSearchForm
+from .forms import BookAddEditForm, GoogleImportForm, GoogleSearchForm
+from .google_client import RETRY_STATUSES, CircuitBreaker, get_client
+from .keyset import InvalidCursor, KeysetPaginator, keyset_ordering
 from .models import Book
+from .prefetch import prefetch_page
 from .utils import (
-    API,
     create_paginator,
+    get_google_api_book,
     get_google_api_books,
+    get_google_api_books_by_ids,
     get_paginator_page,
-    google_book_parser,
 )
 
 languages = dict(LANGUAGES)
@@ -31,7 +40,54 @@ languages = dict(LANGUAGES)
 PAGINATE_BY = settings.PAGINATE_BY  # type: ignore
 
 
-class BookListView(ListView):
+class CountCachingMixin:
+    """Take number of pages from cached count of rows matching filters."""
+
+    paginator_class = CountCachingPaginator
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        scope, filters = filterset_count(getattr(self, "filterset", None))
+        return super().get_paginator(
+            queryset, per_page, filters=filters, scope=scope, **kwargs
+        )
+
+
+class KeysetPaginationMixin:
+    """Paginate list by cursor in "keyset" BOOKS_PAGINATION mode.
+
+    Lists ordered in ways keyset doesn't support, like full text search
+    relevance, and lists in "offset" mode get numbered pages.
+    """
+
+    pagination_mode = None
+
+    def get_pagination_mode(self):
+        return self.pagination_mode or settings.BOOKS_PAGINATION  # type: ignore
+
+    def paginate_queryset(self, queryset, page_size):
+        ordering = keyset_ordering(queryset)
+        if self.get_pagination_mode() != "keyset" or ordering is None:
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = KeysetPaginator(queryset, page_size, ordering)
+        try:
+            page = paginator.page(self.request.GET.get("cursor"))
+        except InvalidCursor:
+            raise Http404("Invalid cursor")
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # filters are kept in pagination links
+        params = self.request.GET.copy()
+        params.pop("page", None)
+        params.pop("cursor", None)
+        context.setdefault("search", params.urlencode())
+        return context
+
+
+@method_decorator(catalog_page_condition, name="dispatch")
+class BookListView(KeysetPaginationMixin, CountCachingMixin, ListView):
     paginate_by = PAGINATE_BY
     model = Book
     context_object_name = "books"
@@ -40,11 +96,22 @@ class BookListView(ListView):
 
 
 class BookCreateView(CreateView):
+    """Create book, imported books update book imported before if exists."""
+
     model = Book
     form_class = BookAddEditForm
     template_name = "books/add_edit_form.html"
     success_url = "/"
 
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        data = kwargs.get("data")
+        if data and data.get("google_id"):
+            kwargs["instance"] = Book.find_imported(
+                data.get("google_id"), data.get("isbn_10"), data.get("isbn_13")
+            )
+        return kwargs
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["action"] = reverse("books:add-form")
@@ -73,7 +140,8 @@ class BookDeleteView(DeleteView):
     success_url = "/"
 
 
-class BookSearchListView(FilterView):
+@method_decorator(catalog_page_condition, name="dispatch")
+class BookSearchListView(KeysetPaginationMixin, CountCachingMixin, FilterView):
     paginate_by = PAGINATE_BY
     model = Book
     context_object_name = "books"
@@ -86,9 +154,17 @@ class BookSearchListView(FilterView):
         return context
 
 
+def google_unavailable(request):
+    """Render page saying import is unavailable while google api is down."""
+    return render(
+        request, "books/import_unavailable.html", {"import": True}, status=503
+    )
+
+
 class ImportList(TemplateView):
     template_name = "books/list.html"
     page = None
+    google_status = None
 
     def get_context_data(self):
         form = GoogleSearchForm(self.request.GET)
@@ -97,7 +173,15 @@ class ImportList(TemplateView):
             books, total, status = get_google_api_books(
                 query_dict=self.request.GET, page=self.page
             )
+            self.google_status = status
+            if status == 200 and get_client().breaker.state != CircuitBreaker.CLOSED:
+                messages.warning(
+                    self.request,
+                    "Google Books is not responding, showing saved results.",
+                )
             paginator = create_paginator(books, total, self.page)
+            if status == 200 and self.page < paginator.num_pages:
+                prefetch_page(self.request.GET, self.page + 1)
             context = {
                 "books": books,
                 "is_paginated": paginator.num_pages - 1,
@@ -112,6 +196,12 @@ class ImportList(TemplateView):
             context = {"import": True}
         return context
 
+    def get(self, request, *args, **kwargs):
+        response = super().get(request, *args, **kwargs)
+        if self.google_status in RETRY_STATUSES:
+            return google_unavailable(request)
+        return response
+
     def dispatch(self, request, *args, **kwargs):
         page = request.GET.get("page", "1")
         if not page.isdecimal():
@@ -120,6 +210,31 @@ class ImportList(TemplateView):
         return super().dispatch(request, *args, **kwargs)
 
 
+class FederatedSearch(TemplateView):
+    """Search books in catalog and in google api at once.
+
+    Google results which don't come within GOOGLE_FEDERATED_TIMEOUT are
+    marked as pending, page shows catalog results only.
+    """
+
+    template_name = "books/federated.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["query_dict"] = self.request.GET
+        form = GoogleSearchForm(self.request.GET)
+        if self.request.GET and form.is_valid():
+            results = federated_search(form.cleaned_data)
+            context.update(
+                {
+                    "books": results.books,
+                    "remote_pending": results.remote_pending,
+                    "remote_status": results.remote_status,
+                }
+            )
+        return context
+
+
 class ImportBook(TemplateView):
     """View for import and edit books from google api.
 
@@ -130,29 +245,31 @@ class ImportBook(TemplateView):
     template_name = "books/add_edit_form.html"
     form_class = BookAddEditForm
     google_id = None
-    google_response = None
+    google_book = None
+    google_status = None
     context = None
 
     def get_google_book(self):
-        self.google_response = requests.get(f"{API}/{self.google_id}")
+        self.google_book, self.google_status = get_google_api_book(self.google_id)
 
     def get_context_data(self, **kwargs):
         self.context = super().get_context_data(**kwargs)
         self.get_google_book()
-        if self.google_response.status_code == 200:
+        if self.google_status == 200:
             self.context_response_status_200()
         return self.context
 
     def get(self, request, *args, **kwargs):
         get = super().get(request, *args, **kwargs)
-        if self.google_response.status_code != 200:
+        if self.google_status in RETRY_STATUSES:
+            return google_unavailable(request)
+        if self.google_status != 200:
             self.fetch_data_error()
             return redirect(reverse("books:import-list"))
         return get
 
     def context_response_status_200(self):
-        book = google_book_parser(self.google_response.json())
-        form = self.form_class(initial={**book})
+        form = self.form_class(initial={**self.google_book})
         self.context.update(
             {
                 "form": form,
@@ -164,10 +281,53 @@ class ImportBook(TemplateView):
     def fetch_data_error(self):
         messages.error(
             self.request,
-            message=f"Could not fetch book data error - "
-            f"{self.google_response.status_code}",
+            message=f"Could not fetch book data error - {self.google_status}",
         )
 
     def setup(self, request, *args, **kwargs):
         self.google_id = request.GET.get("id")
         return super().setup(request, *args, **kwargs)
+
+
+class ImportSelected(View):
+    """Import books selected on ImportList page.
+
+    Selected books are taken from search results they were selected on, all of
+    them are validated and valid ones are created or, if imported before,
+    updated in one transaction. Invalid books are reported in messages.
+    """
+
+    http_method_names = ["post"]
+
+    def post(self, request, *args, **kwargs):
+        form = GoogleImportForm(request.POST)
+        if not form.is_valid():
+            messages.error(request, " ".join(form.non_field_errors()))
+            return redirect(reverse("books:import-list"))
+
+        data = form.cleaned_data
+        query_dict = {key: data[key] for key in ["search", "intitle", "inauthor"]}
+        rows, missing = get_google_api_books_by_ids(
+            data["ids"], query_dict, page=data["page"]
+        )
+        books, errors = validate_books(rows)
+        result = upsert_books(books)
+
+        if result.created:
+            messages.success(request, f"Imported {len(result.created)} books.")
+        if result.updated:
+            messages.success(request, f"Updated {len(result.updated)} books.")
+        for index, row_errors in errors.items():
+            self.row_error(rows[index], row_errors)
+        for volume_id in missing:
+            messages.error(request, f"Could not fetch book data - {volume_id}")
+
+        query = urlencode({**query_dict, "page": data["page"]})
+        return redirect(f"{reverse('books:import-list')}?{query}")
+
+    def row_error(self, row, errors):
+        details = "; ".join(
+            f"{field}: {' '.join(field_errors)}"
+            for field, field_errors in errors.items()
+        )
+        messages.error(self.request, f"{row['title'] or row['id']} - {details}")
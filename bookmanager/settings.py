@@ -141,11 +141,139 @@ MESSAGE_TAGS = {
     messages.ERROR: "alert-danger",
 }
 
+# Google Books api client
+# https://developers.google.com/books/docs/v1/using
+
+GOOGLE_BOOKS_API_URL = "https://www.googleapis.com/books/v1/volumes"
+
+GOOGLE_API_CONNECT_TIMEOUT = 3.05
+
+GOOGLE_API_READ_TIMEOUT = 10
+
+GOOGLE_API_RETRIES = 2
+
+GOOGLE_API_BACKOFF_FACTOR = 0.3
+
+GOOGLE_API_POOL_SIZE = 10
+
+# requests per second of each process, calls wait up to
+# GOOGLE_API_RATE_LIMIT_WAIT seconds for free slot
+GOOGLE_API_RATE_LIMIT = 10
+
+GOOGLE_API_RATE_LIMIT_WAIT = 1
+
+# circuit opens after GOOGLE_BREAKER_FAILURES failed calls in a row, google
+# api isn't called for GOOGLE_BREAKER_RESET_TIMEOUT seconds
+GOOGLE_BREAKER_FAILURES = 5
+
+GOOGLE_BREAKER_RESET_TIMEOUT = 30
+
+# parsed google api responses are kept for GOOGLE_CACHE_TTL seconds, least
+# recently used entries are evicted after GOOGLE_CACHE_MAX_ENTRIES
+GOOGLE_CACHE_TTL = 60 * 10
+
+GOOGLE_CACHE_MAX_ENTRIES = 1000
+
+# books of fetched search pages are kept as volumes for ImportBook in separate
+# cache, so they don't evict search pages
+GOOGLE_VOLUME_CACHE_MAX_ENTRIES = 2000
+
+# stale copies of responses are served when google api is unavailable
+GOOGLE_CACHE_STALE_TTL = 60 * 60 * 24
+
+# identical concurrent google api requests are coalesced within a process,
+# enable cross process coalescing only with cache shared by all processes
+GOOGLE_SINGLE_FLIGHT_CROSS_PROCESS = False
+
+GOOGLE_SINGLE_FLIGHT_TIMEOUT = 15
+
+# import of all results for google query, see books.jobs
+GOOGLE_IMPORT_CONCURRENCY = 4
+
+GOOGLE_IMPORT_BATCH_SIZE = 500
+
+# None walks all pages reported by totalItems, up to first short page
+GOOGLE_IMPORT_MAX_PAGES = None
+
+# new import jobs are rejected while this many are pending or running
+GOOGLE_IMPORT_MAX_RUNNING_JOBS = 2
+
+# ImportList prefetches next page of results in background, prefetch uses
+# at most GOOGLE_PREFETCH_SHARE of GOOGLE_API_RATE_LIMIT
+GOOGLE_PREFETCH = False
+
+GOOGLE_PREFETCH_WORKERS = 2
+
+GOOGLE_PREFETCH_SHARE = 0.2
+
+# federated search waits GOOGLE_FEDERATED_TIMEOUT seconds for google results
+GOOGLE_FEDERATED_TIMEOUT = 1.5
+
+GOOGLE_FEDERATED_WORKERS = 4
+
+# refresh of imported books, see refresh_google_books command; requests per
+# second keep refresh within google api quota
+GOOGLE_REFRESH_RATE = 5
+
+GOOGLE_REFRESH_BATCH_SIZE = 100
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "google": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "google-books",
+        "TIMEOUT": GOOGLE_CACHE_TTL,
+        "OPTIONS": {"MAX_ENTRIES": GOOGLE_CACHE_MAX_ENTRIES, "CULL_FREQUENCY": 10},
+    },
+    "google-volumes": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "google-volumes",
+        "TIMEOUT": GOOGLE_CACHE_TTL,
+        "OPTIONS": {
+            "MAX_ENTRIES": GOOGLE_VOLUME_CACHE_MAX_ENTRIES,
+            "CULL_FREQUENCY": 10,
+        },
+    },
+}
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/3.2/howto/static-files/
 
 PAGINATE_BY = 40
 
+# "keyset" paginates catalog lists by cursor after last row, without counting
+# rows, "offset" uses numbered pages
+BOOKS_PAGINATION = "keyset"
+
+# numbered pages count rows up to BOOKS_COUNT_ESTIMATE_THRESHOLD, larger counts
+# are estimated from sample of BOOKS_COUNT_SAMPLE_SIZE books; counts are cached
+# for BOOKS_COUNT_CACHE_TTL seconds or until any book changes
+BOOKS_COUNT_ESTIMATE_THRESHOLD = 10000
+
+BOOKS_COUNT_SAMPLE_SIZE = 1000
+
+BOOKS_COUNT_CACHE_TTL = 60 * 60
+
+# api lists return at most BOOKS_API_MAX_PAGE_SIZE books per page, deeper
+# pages than BOOKS_API_MAX_OFFSET are reachable only by cursor
+BOOKS_API_MAX_PAGE_SIZE = 100
+
+BOOKS_API_MAX_OFFSET = 10000
+
+# max number of ids or isbns looked up by one batch request
+BOOKS_API_MAX_BATCH = 100
+
+# bulk write endpoints take up to BOOKS_API_MAX_BULK books and write them in
+# chunks of BOOKS_API_BULK_BATCH_SIZE; in "atomic" mode nothing is written
+# when any book is invalid, in "best-effort" mode valid books are written
+BOOKS_API_MAX_BULK = 5000
+
+BOOKS_API_BULK_BATCH_SIZE = 500
+
+BOOKS_API_BULK_MODE = "atomic"
+
 STATIC_URL = "/static/"
 
 STATIC_ROOT = BASE_DIR / "staticfiles"
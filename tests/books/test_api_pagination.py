@@ -0,0 +1,127 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from bookmanager.books.models import Book
+
+from .factories import BookFactory
+
+
+class ApiPaginationTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(130):
+            # titles repeat, order within equal titles is set by id
+            BookFactory(title=f"Title {i % 50:02}", language="pl" if i % 2 else "en")
+
+    def setUp(self):
+        cache.clear()
+
+    def walk(self, url, params):
+        ids = []
+        response = self.client.get(url, params)
+        while True:
+            data = response.json()
+            ids.extend(book["id"] for book in data["results"])
+            if not data["next"]:
+                return ids
+            response = self.client.get(data["next"])
+
+    def test_list_cursor_pages(self):
+        url = reverse("books-apiv1:list")
+        response = self.client.get(url)
+        data = response.json()
+
+        self.assertEqual(list(data), ["next", "previous", "results"])
+        self.assertEqual(len(data["results"]), 40)
+        self.assertIn("cursor=", data["next"])
+
+        expected = [
+            str(pk)
+            for pk in Book.objects.order_by("title", "id").values_list("pk", flat=True)
+        ]
+        self.assertEqual(self.walk(url, {}), expected)
+        self.assertEqual(self.walk(url, {"limit": 7}), expected)
+
+    def test_search_cursor_pages(self):
+        expected = Book.objects.filter(language="pl").order_by("title", "id")
+        self.assertEqual(
+            self.walk(reverse("books-apiv1:search"), {"language": "pl"}),
+            [str(pk) for pk in expected.values_list("pk", flat=True)],
+        )
+
+    def test_max_page_size(self):
+        response = self.client.get(reverse("books-apiv1:list"), {"limit": 1000})
+        self.assertEqual(len(response.json()["results"]), 100)
+
+        response = self.client.get(
+            reverse("books-apiv1:list"), {"limit": 1000, "offset": 0}
+        )
+        self.assertEqual(len(response.json()["results"]), 100)
+
+    def test_limit_offset(self):
+        response = self.client.get(
+            reverse("books-apiv1:search"), {"language": "en", "offset": 60, "limit": 10}
+        )
+        data = response.json()
+
+        self.assertEqual(data["count"], 65)
+        self.assertEqual(len(data["results"]), 5)
+        self.assertIn("offset=50", data["previous"])
+        self.assertIsNone(data["next"])
+
+    def test_max_offset(self):
+        response = self.client.get(reverse("books-apiv1:list"), {"offset": 10001})
+        self.assertEqual(response.status_code, 404)
+
+    def test_ranked_search_uses_offset(self):
+        response = self.client.get(
+            reverse("books-apiv1:search"), {"title": "title 07", "limit": 2}
+        )
+        data = response.json()
+
+        self.assertEqual(data["count"], 3)
+        self.assertIn("offset=2", data["next"])
+        self.assertEqual({book["title"] for book in data["results"]}, {"Title 07"})
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse("books-apiv1:list"), {"cursor": "x"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_count_is_cached_under_applied_filters(self):
+        # list has no filters, language param doesn't filter it
+        response = self.client.get(
+            reverse("books-apiv1:list"), {"offset": 0, "language": "pl"}
+        )
+        self.assertEqual(response.json()["count"], 130)
+
+        response = self.client.get(
+            reverse("books-apiv1:search"), {"offset": 0, "language": "pl"}
+        )
+        self.assertEqual(response.json()["count"], 65)
+
+    def test_unknown_params_share_count(self):
+        url = reverse("books-apiv1:search")
+        self.client.get(url, {"offset": 0, "language": "pl"})
+        # catalog version read by etag and by count key, books
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                url, {"offset": 0, "language": "pl", "junk": "1"}
+            )
+        self.assertEqual(response.json()["count"], 65)
+
+    @override_settings(BOOKS_COUNT_ESTIMATE_THRESHOLD=10)
+    def test_estimated_count_doesnt_end_pages(self):
+        url = reverse("books-apiv1:search")
+        params = {"language": "pl", "limit": 10}
+        with mock.patch("bookmanager.books.counts.estimate_count", return_value=20):
+            data = self.client.get(url, {**params, "offset": 40}).json()
+            self.assertEqual(data["count"], 20)
+            self.assertEqual(len(data["results"]), 10)
+            self.assertIn("offset=50", data["next"])
+
+            data = self.client.get(url, {**params, "offset": 60}).json()
+            self.assertEqual(len(data["results"]), 5)
+            self.assertIsNone(data["next"])
@@ -0,0 +1,88 @@
+import uuid
+
+from django.test import TestCase
+from django.urls import reverse
+
+from .factories import BookFactory
+
+
+class BooksBatchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.a = BookFactory(title="A", isbn_13="9788375780635")
+        cls.b = BookFactory(title="B", isbn_10="8375780634")
+        # isbn 13 match wins over isbn 10 one
+        cls.c = BookFactory(title="C", isbn_13="8375780634")
+
+    def setUp(self):
+        self.url = reverse("books-apiv1:batch")
+
+    def test_ids_in_request_order(self):
+        missing = str(uuid.uuid4())
+        ids = [self.b.pk, missing, self.a.pk, self.b.pk]
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                self.url, {"ids": ",".join(map(str, ids)), "fields": "title"}
+            )
+
+        self.assertEqual(
+            response.json(),
+            {
+                "results": [
+                    {"id": str(self.b.pk), "found": True, "book": {"title": "B"}},
+                    {"id": missing, "found": False, "book": None},
+                    {"id": str(self.a.pk), "found": True, "book": {"title": "A"}},
+                    {"id": str(self.b.pk), "found": True, "book": {"title": "B"}},
+                ]
+            },
+        )
+
+    def test_isbns(self):
+        response = self.client.post(
+            self.url,
+            {"isbns": ["978-83-7578-063-5", "8375780634", "0000000000"]},
+            content_type="application/json",
+        )
+        results = response.json()["results"]
+
+        self.assertEqual(
+            [result["isbn"] for result in results],
+            ["9788375780635", "8375780634", "0000000000"],
+        )
+        self.assertEqual(results[0]["book"]["id"], str(self.a.pk))
+        self.assertEqual(results[1]["book"]["title"], "C")
+        self.assertEqual(len(results[1]["book"]), 9)
+        self.assertEqual(
+            results[2], {"isbn": "0000000000", "found": False, "book": None}
+        )
+
+    def test_invalid_requests(self):
+        for data in [
+            {},
+            {"ids": [str(self.a.pk)], "isbns": ["8375780634"]},
+            {"ids": ["not uuid"]},
+            {"isbns": ["-"]},
+            {"isbns": ["8375780634", "8375780635"]},
+            {"ids": [str(self.a.pk)], "fields": "slug"},
+        ]:
+            with self.subTest(data=data):
+                params = {
+                    key: value if isinstance(value, str) else ",".join(value)
+                    for key, value in data.items()
+                }
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, 400)
+
+    def test_max_batch(self):
+        ids = ",".join(str(uuid.uuid4()) for _ in range(101))
+        response = self.client.get(self.url, {"ids": ids})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("ids", response.json())
+
+    def test_books_without_isbn_arent_matched(self):
+        BookFactory(title="No isbn")
+        response = self.client.get(self.url, {"isbns": "-"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json(), {"isbns": {"0": ["Invalid ISBN: Wrong length"]}}
+        )
@@ -0,0 +1,93 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from bookmanager.books.bulk import upsert_books, validate_books
+from bookmanager.books.models import Book
+
+from .factories import BookFactory
+
+VALID_ISBN13 = "9788365970398"
+
+
+def row(number, **kwargs):
+    return {
+        "title": f"Title {number}",
+        "author": "Author",
+        "published_date": "2004-01-01",
+        "google_id": f"volume{number}",
+        **kwargs,
+    }
+
+
+class ValidateBooksTest(TestCase):
+    def test_errors_by_row_index(self):
+        books, errors = validate_books([row(1), row(2, title=""), row(3)])
+
+        self.assertEqual([book.title for book in books], ["Title 1", "Title 3"])
+        self.assertEqual(list(errors.keys()), [1])
+        self.assertIn("title", errors[1])
+
+
+class UpsertBooksTest(TestCase):
+    def upsert(self, *rows):
+        books, _ = validate_books(rows)
+        return upsert_books(books)
+
+    def test_create(self):
+        result = self.upsert(row(1), row(2))
+
+        self.assertEqual(len(result.created), 2)
+        self.assertEqual(Book.objects.count(), 2)
+
+    def test_update_by_google_id(self):
+        book = BookFactory(google_id="volume1", title="Old")
+        result = self.upsert(row(1))
+
+        book.refresh_from_db()
+        self.assertEqual(len(result.updated), 1)
+        self.assertEqual(book.title, "Title 1")
+        self.assertEqual(Book.objects.count(), 1)
+
+    def test_update_by_isbn_keeps_google_id(self):
+        book = BookFactory(google_id="volume0", isbn_13=VALID_ISBN13)
+        self.upsert(row(1, isbn_13=VALID_ISBN13))
+
+        book.refresh_from_db()
+        self.assertEqual(book.google_id, "volume0")
+        self.assertEqual(book.title, "Title 1")
+
+    def test_duplicates_in_batch_are_skipped(self):
+        result = self.upsert(
+            row(1), row(1), row(2, isbn_13=VALID_ISBN13), row(3, isbn_13=VALID_ISBN13)
+        )
+
+        self.assertEqual(result.skipped, 2)
+        self.assertEqual(Book.objects.count(), 2)
+
+    def test_books_matching_same_saved_book(self):
+        book = BookFactory(google_id="volume1", isbn_13=VALID_ISBN13)
+        result = self.upsert(row(2, isbn_13=VALID_ISBN13), row(1, title="New"))
+
+        self.assertEqual([updated.pk for updated in result.updated], [book.pk])
+        self.assertEqual(result.skipped, 1)
+        book.refresh_from_db()
+        self.assertEqual(book.title, "Title 2")
+
+    def test_conflicting_new_books_are_skipped(self):
+        BookFactory(google_id="volume1", title="Concurrent")
+        # book saved after lookup, e.g. by concurrent import
+        with mock.patch("bookmanager.books.bulk.saved_books", return_value={}):
+            result = self.upsert(row(1), row(2))
+
+        self.assertEqual([book.google_id for book in result.created], ["volume2"])
+        self.assertEqual(result.skipped, 1)
+        self.assertEqual(Book.objects.get(google_id="volume1").title, "Concurrent")
+
+    def test_queries(self):
+        BookFactory(google_id="volume1")
+        books, _ = validate_books([row(i) for i in range(10)])
+        # lookup, savepoint, insert, inserted ids, update, catalog version,
+        # savepoint release
+        with self.assertNumQueries(7):
+            upsert_books(books)
@@ -0,0 +1,178 @@
+import uuid
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from bookmanager.books.catalog import catalog_changed, catalog_version
+from bookmanager.books.models import Book
+
+from .factories import BookFactory
+from .test_bulk import VALID_ISBN13, row
+
+
+class BooksBulkApiTest(TestCase):
+    def setUp(self):
+        self.url = reverse("books-apiv1:bulk")
+        self.client.force_login(User.objects.create_user("editor"))
+
+    def request(self, method, data):
+        return getattr(self.client, method)(
+            self.url, data, content_type="application/json"
+        )
+
+    def statuses(self, response):
+        return [result["status"] for result in response.json()["results"]]
+
+    def test_create(self):
+        response = self.request(
+            "post", {"books": [row(1), row(2, isbn_13=VALID_ISBN13, cover_uri="")]}
+        )
+        data = response.json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data["saved"], 2)
+        self.assertEqual(self.statuses(response), ["created", "created"])
+        book = Book.objects.get(pk=data["results"][1]["id"])
+        self.assertEqual(book.slug, "title-2")
+        self.assertEqual(book.isbn_13, VALID_ISBN13)
+        self.assertEqual(catalog_version(), 1)
+        self.assertEqual(Book.objects.filter(title__startswith="Title").count(), 2)
+
+    def test_atomic_create_with_errors(self):
+        BookFactory(google_id="volume5")
+        books = [
+            row(1),
+            row(2, title=""),
+            row(3, pages=3),
+            row(4, slug="x"),
+            row(5),
+            row(1),
+            "book",
+        ]
+        response = self.request("post", {"books": books})
+        data = response.json()
+        results = data["results"]
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual((data["saved"], data["failed"]), (0, 7))
+        self.assertEqual(self.statuses(response), ["not_saved"] + ["invalid"] * 6)
+        self.assertIn("title", results[1]["errors"])
+        self.assertEqual(results[2]["errors"], {"pages": ["Expected a string."]})
+        self.assertEqual(results[3]["errors"], {"slug": ["Unknown field."]})
+        self.assertEqual(
+            results[4]["errors"],
+            {"google_id": ["Book with this Google volume id already exists."]},
+        )
+        self.assertEqual(
+            results[5]["errors"], {"google_id": ["Google volume id is repeated."]}
+        )
+        self.assertIn("non_field_errors", results[6]["errors"])
+        self.assertEqual(Book.objects.count(), 1)
+        self.assertEqual(catalog_version(), 1)
+
+    def test_best_effort_create(self):
+        response = self.request(
+            "post", {"mode": "best-effort", "books": [row(1), row(2, title="")]}
+        )
+        data = response.json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((data["saved"], data["failed"]), (1, 1))
+        self.assertEqual(self.statuses(response), ["created", "invalid"])
+        self.assertIn("title", data["results"][1]["errors"])
+        self.assertEqual(Book.objects.get().title, "Title 1")
+
+    def test_update(self):
+        first = BookFactory(title="Old", google_id="volume1")
+        second = BookFactory(title="Other")
+        missing = str(uuid.uuid4())
+        response = self.request(
+            "patch",
+            {
+                "books": [
+                    {"id": str(first.pk), "title": "New", "language": "pl"},
+                    {"id": str(second.pk), "google_id": "volume1"},
+                    {"id": missing, "title": "X"},
+                    {"title": "No id"},
+                ],
+                "mode": "best-effort",
+            },
+        )
+
+        self.assertEqual(
+            self.statuses(response), ["updated", "invalid", "not_found", "invalid"]
+        )
+        results = response.json()["results"]
+        self.assertEqual(results[2]["id"], missing)
+        self.assertIn("google_id", results[1]["errors"])
+        first.refresh_from_db()
+        self.assertEqual(
+            (first.title, first.slug, first.language), ("New", "new", "pl")
+        )
+        self.assertEqual(first.google_id, "volume1")
+
+    def test_delete(self):
+        books = [BookFactory(), BookFactory()]
+        ids = [str(book.pk) for book in books]
+
+        response = self.request("delete", {"ids": [ids[0], str(uuid.uuid4())]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.statuses(response), ["not_saved", "not_found"])
+        self.assertEqual(Book.objects.count(), 2)
+
+        response = self.request(
+            "delete", {"ids": [*ids, ids[0], "x"], "mode": "best-effort"}
+        )
+        self.assertEqual(
+            self.statuses(response), ["deleted", "deleted", "invalid", "invalid"]
+        )
+        self.assertEqual(Book.objects.count(), 0)
+
+    def test_invalid_requests(self):
+        for method, data in [
+            ("post", {}),
+            ("post", {"books": []}),
+            ("post", {"books": [row(1)], "mode": "x"}),
+            ("post", {"books": [row(i) for i in range(5001)]}),
+            ("delete", {"books": []}),
+        ]:
+            with self.subTest(method=method, data=str(data)[:50]):
+                self.assertEqual(self.request(method, data).status_code, 400)
+
+    def test_anonymous_user_is_rejected(self):
+        self.client.logout()
+        book = BookFactory()
+        for method, data in [
+            ("post", {"books": [row(1)]}),
+            ("patch", {"books": [{"id": str(book.pk), "title": "Changed"}]}),
+            ("delete", {"ids": [str(book.pk)]}),
+        ]:
+            with self.subTest(method=method):
+                self.assertEqual(self.request(method, data).status_code, 403)
+        self.assertEqual(Book.objects.get().title, book.title)
+
+    def test_delete_queries(self):
+        ids = [str(BookFactory().pk) for _ in range(50)]
+        version = catalog_version()
+
+        # session, user, lookup, savepoint, books to delete, delete,
+        # catalog version, savepoint release
+        with self.assertNumQueries(8):
+            response = self.request("delete", {"ids": ids})
+
+        self.assertEqual(response.json()["saved"], 50)
+        self.assertEqual(Book.objects.count(), 0)
+        self.assertEqual(catalog_version(), version + 1)
+
+    def test_create_queries(self):
+        catalog_changed()
+        books = [row(i) for i in range(60)]
+
+        # session, user, google ids, savepoint, insert, catalog version,
+        # savepoint release
+        with self.assertNumQueries(7):
+            response = self.request("post", {"books": books})
+
+        self.assertEqual(response.json()["saved"], 60)
+        self.assertEqual(Book.objects.count(), 60)
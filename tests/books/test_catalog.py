@@ -0,0 +1,108 @@
+from datetime import date
+
+from django.conf import settings
+from django.db import transaction
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+
+from bookmanager.books.bulk import upsert_books
+from bookmanager.books.catalog import catalog_changed, catalog_changes, catalog_state
+from bookmanager.books.models import Book, CatalogVersion
+
+from .factories import BookFactory
+
+
+class CatalogVersionTest(TestCase):
+    def test_writes_bump_version(self):
+        self.assertEqual(catalog_state(), (0, None))
+
+        book = BookFactory()
+        version, modified = catalog_state()
+        self.assertEqual(version, 1)
+        self.assertIsNotNone(modified)
+
+        book.title = "Changed"
+        book.save()
+        book.delete()
+        upsert_books([Book(title="A", author="B", published_date=date(2000, 1, 1))])
+        self.assertEqual(catalog_state()[0], 4)
+        self.assertEqual(CatalogVersion.objects.count(), 1)
+
+    def test_changes_bump_version_once(self):
+        BookFactory()
+        with transaction.atomic(), catalog_changes():
+            BookFactory()
+            with catalog_changes():
+                Book.objects.all().delete()
+                catalog_changed()
+            self.assertEqual(catalog_state()[0], 1)
+        self.assertEqual(catalog_state()[0], 2)
+
+        with catalog_changes():
+            pass
+        self.assertEqual(catalog_state()[0], 2)
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.book = BookFactory()
+
+    def assertNotModified(self, url, params=None, etag_pattern=r'^"1-\w+"$', **headers):
+        response = self.client.get(url, params, **headers)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self.assertRegex(etag, etag_pattern)
+        self.assertEqual(
+            response["Last-Modified"],
+            http_date(catalog_state()[1].timestamp()),
+        )
+
+        # only catalog version is read
+        with self.assertNumQueries(1):
+            response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag, **headers)
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(
+            url, params, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"], **headers
+        )
+        self.assertEqual(response.status_code, 304)
+        return etag
+
+    def test_api(self):
+        for url, params in [
+            (reverse("books-apiv1:list"), {}),
+            (reverse("books-apiv1:search"), {"title": "x"}),
+            (reverse("books-apiv1:detail", args=[self.book.pk]), {"fields": "id"}),
+        ]:
+            with self.subTest(url=url):
+                self.assertNotModified(url, params)
+
+    def test_html_lists(self):
+        url = reverse("books:list")
+        # 304 would not set CSRF cookie of rendered page
+        response = self.client.get(url)
+        self.assertNotIn(settings.CSRF_COOKIE_NAME, response.cookies)
+
+        pattern = r'^W/"1-\w+"$'
+        self.assertNotModified(url, etag_pattern=pattern)
+        self.assertNotModified(
+            reverse("books:search"), {"language": "pl"}, etag_pattern=pattern
+        )
+
+    def test_representations_have_own_etags(self):
+        url = reverse("books-apiv1:list")
+        json_etag = self.assertNotModified(url)
+        html_etag = self.assertNotModified(url, HTTP_ACCEPT="text/html")
+        page_etag = self.assertNotModified(url, {"limit": 1})
+        self.assertEqual(len({json_etag, html_etag, page_etag}), 3)
+
+    def test_changes_invalidate_etag(self):
+        url = reverse("books-apiv1:list")
+        etag = self.client.get(url)["ETag"]
+
+        BookFactory()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 2)
+        self.assertNotEqual(response["ETag"], etag)
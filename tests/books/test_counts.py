@@ -0,0 +1,120 @@
+from datetime import date
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from bookmanager.books.bulk import upsert_books
+from bookmanager.books.counts import count_key, get_count
+from bookmanager.books.models import Book
+
+from .factories import BookFactory
+
+
+class CountTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(12):
+            BookFactory(language="pl" if i % 3 else "en")
+
+    def setUp(self):
+        cache.clear()
+
+    def count(self, **filters):
+        return get_count(Book.objects.filter(**filters), filters)
+
+    def test_exact_count_is_cached(self):
+        self.assertEqual(self.count(language="pl"), (8, True))
+        # only catalog version is read
+        with self.assertNumQueries(1):
+            self.assertEqual(self.count(language="pl"), (8, True))
+        self.assertEqual(self.count(language="en"), (4, True))
+
+    def test_filters_are_normalized(self):
+        self.assertEqual(
+            count_key(Book, {"title": " harry ", "author": "", "language": None}),
+            count_key(Book, {"title": "harry"}),
+        )
+        self.assertNotEqual(
+            count_key(Book, {"title": "harry"}), count_key(Book, {"author": "harry"})
+        )
+
+    def test_writes_invalidate_counts(self):
+        self.count(language="en")
+
+        book = BookFactory(language="en")
+        self.assertEqual(self.count(language="en"), (5, True))
+
+        book.delete()
+        self.assertEqual(self.count(language="en"), (4, True))
+
+        upsert_books(
+            [Book(title="Bulk", author="A", language="en", published_date=date.today())]
+        )
+        self.assertEqual(self.count(language="en"), (5, True))
+
+    @override_settings(BOOKS_COUNT_ESTIMATE_THRESHOLD=5, BOOKS_COUNT_SAMPLE_SIZE=6)
+    def test_estimate_above_threshold(self):
+        count, exact = self.count(language="pl")
+        self.assertFalse(exact)
+        # at least threshold + 1, at most all books
+        self.assertGreaterEqual(count, 6)
+        self.assertLessEqual(count, 12)
+
+        self.assertEqual(self.count(language="en"), (4, True))
+
+    @override_settings(BOOKS_COUNT_ESTIMATE_THRESHOLD=5, BOOKS_COUNT_SAMPLE_SIZE=100)
+    def test_estimate_of_full_sample_is_exact_number(self):
+        self.assertEqual(self.count(language="pl"), (8, False))
+
+
+@override_settings(BOOKS_PAGINATION="offset")
+class CountViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for _ in range(45):
+            BookFactory(language="pl")
+
+    def setUp(self):
+        cache.clear()
+
+    def test_count_is_rendered_and_cached(self):
+        url = reverse("books:search")
+        response = self.client.get(url, {"language": "pl"})
+        self.assertContains(response, "45 results")
+        self.assertNotContains(response, "about")
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url, {"language": "pl", "page": 2})
+        self.assertFalse(any("COUNT(" in query["sql"] for query in queries))
+
+    @override_settings(BOOKS_COUNT_ESTIMATE_THRESHOLD=10)
+    def test_estimated_count(self):
+        response = self.client.get(reverse("books:list"))
+        self.assertContains(response, "about 45 results")
+
+    @override_settings(BOOKS_COUNT_ESTIMATE_THRESHOLD=10)
+    def test_estimate_doesnt_set_pages(self):
+        url = reverse("books:list")
+        with mock.patch("bookmanager.books.counts.estimate_count", return_value=4000):
+            response = self.client.get(url)
+            self.assertContains(response, "about 4000 results")
+            self.assertNotContains(response, "page=100&")
+            self.assertContains(response, "page=2&")
+
+            response = self.client.get(url, {"page": 2})
+            self.assertEqual(len(response.context["object_list"]), 5)
+            self.assertFalse(response.context["page_obj"].has_next())
+            self.assertNotContains(response, "page=3&")
+
+            self.assertEqual(self.client.get(url, {"page": 3}).status_code, 404)
+
+    @override_settings(BOOKS_COUNT_ESTIMATE_THRESHOLD=10)
+    def test_underestimate_doesnt_hide_pages(self):
+        url = reverse("books:list")
+        with mock.patch("bookmanager.books.counts.estimate_count", return_value=20):
+            self.assertContains(self.client.get(url), "page=2&")
+            self.assertEqual(self.client.get(url, {"page": 2}).status_code, 200)
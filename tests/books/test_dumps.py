@@ -0,0 +1,193 @@
+import gzip
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase
+
+from bookmanager.books.dumps import JSONStreamReader, read_dump
+from bookmanager.books.models import Book
+
+from .utils import google_volume
+
+VOLUMES = [google_volume(i) for i in range(7)]
+
+
+def response(volumes):
+    return {"kind": "books#volumes", "totalItems": 100, "items": volumes}
+
+
+class JSONStreamReaderTest(SimpleTestCase):
+    def items(self, data, chunk_size=5):
+        reader = JSONStreamReader(io.StringIO(json.dumps(data)), chunk_size)
+        return list(reader.items())
+
+    def test_response(self):
+        self.assertEqual(self.items(response(VOLUMES)), VOLUMES)
+
+    def test_items_before_other_keys(self):
+        data = {"items": VOLUMES, "totalItems": 1234567}
+        self.assertEqual(self.items(data), VOLUMES)
+
+    def test_array_of_responses(self):
+        data = [response(VOLUMES[:3]), response(VOLUMES[3:]), response([])]
+        self.assertEqual(self.items(data), VOLUMES)
+
+    def test_array_of_volumes(self):
+        self.assertEqual(self.items(VOLUMES), VOLUMES)
+
+    def test_single_volume(self):
+        self.assertEqual(self.items(VOLUMES[0]), VOLUMES[:1])
+
+    def test_buffer_is_bounded(self):
+        data = json.dumps(response(VOLUMES * 100))
+        reader = JSONStreamReader(io.StringIO(data), 64)
+        max_buffer = 0
+        for _ in reader.items():
+            max_buffer = max(max_buffer, len(reader.buffer))
+        self.assertLess(max_buffer, len(json.dumps(VOLUMES[0])) * 3)
+
+    def test_invalid_dump(self):
+        with self.assertRaises(ValueError):
+            self.items("text")
+
+    def test_malformed_item_isnt_read_to_the_end(self):
+        data = "[" + json.dumps(VOLUMES[0]) + ", {broken}, " + json.dumps(VOLUMES * 100)
+        reader = JSONStreamReader(io.StringIO(data), 64)
+        items = reader.items()
+        self.assertEqual(next(items), VOLUMES[0])
+        with self.assertRaises(ValueError):
+            next(items)
+        self.assertLess(len(reader.buffer), 64 * 3)
+
+
+class DumpFilesMixin:
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        opener = gzip.open if name.endswith(".gz") else open
+        with opener(path, "wt") as file:
+            file.write(content)
+        return path
+
+    def write_jsonl(self, name="volumes.jsonl"):
+        lines = [response(VOLUMES[:3]), VOLUMES[3], response(VOLUMES[4:])]
+        return self.write(name, "\n".join(json.dumps(line) for line in lines))
+
+
+class ReadDumpTest(DumpFilesMixin, SimpleTestCase):
+    def test_json_lines(self):
+        items = [item for item, _ in read_dump(self.write_jsonl())]
+        self.assertEqual(items, VOLUMES)
+
+    def test_gzip(self):
+        path = self.write("volumes.json.gz", json.dumps(response(VOLUMES)))
+        self.assertEqual([item for item, _ in read_dump(path)], VOLUMES)
+
+    def test_resume_from_cursor(self):
+        for path in [
+            self.write_jsonl(),
+            self.write("volumes.json", json.dumps(response(VOLUMES))),
+        ]:
+            for position in range(len(VOLUMES)):
+                cursor = list(read_dump(path))[position][1]
+                items = [item for item, _ in read_dump(path, cursor)]
+                self.assertEqual(items, VOLUMES[position + 1 :])
+
+    def test_invalid_json_lines(self):
+        lines = [json.dumps(VOLUMES[0]), "{broken", json.dumps(response(VOLUMES[1:3]))]
+        path = self.write("volumes.jsonl", "\n".join(lines))
+        read = list(read_dump(path))
+        self.assertEqual([item for item, _ in read], [VOLUMES[0], None, *VOLUMES[1:3]])
+
+        # resuming at invalid line continues with next one
+        items = [item for item, _ in read_dump(path, read[1][1])]
+        self.assertEqual(items, VOLUMES[1:3])
+
+
+class ImportGoogleDumpCommandTest(DumpFilesMixin, TestCase):
+    def call(self, *args):
+        out = io.StringIO()
+        call_command("import_google_dump", *args, stdout=out)
+        return out.getvalue()
+
+    def test_import(self):
+        path = self.write_jsonl()
+        out = self.call(path, "--batch-size", "2")
+
+        self.assertEqual(Book.objects.count(), len(VOLUMES))
+        self.assertIn(f"Items: {len(VOLUMES)}, created: {len(VOLUMES)}", out)
+        self.assertIn("rows/s", out)
+        self.assertIn("peak RSS", out)
+
+    def test_resume(self):
+        path = self.write_jsonl()
+        checkpoint = {
+            "path": path,
+            "cursor": [0, 3],
+            "progress": {"items": 3, "created": 3, "skipped": 0, "invalid": 0},
+        }
+        with open(f"{path}.checkpoint", "w") as file:
+            json.dump(checkpoint, file)
+
+        out = self.call(path, "--resume")
+        self.assertEqual(Book.objects.count(), len(VOLUMES) - 3)
+        self.assertIn(f"Items: {len(VOLUMES)}, created: {len(VOLUMES)}", out)
+
+    def test_resume_json_warns(self):
+        path = self.write("volumes.json", json.dumps(response(VOLUMES)))
+        self.call(path, "--batch-size", "2")
+        err = io.StringIO()
+        call_command(
+            "import_google_dump", path, "--resume", stdout=io.StringIO(), stderr=err
+        )
+        self.assertIn(f"skipping {len(VOLUMES)} already imported items", err.getvalue())
+
+    def test_checkpoint_is_saved(self):
+        path = self.write("volumes.json", json.dumps(response(VOLUMES)))
+        self.call(path, "--batch-size", "5")
+        with open(f"{path}.checkpoint") as file:
+            self.assertEqual(json.load(file)["cursor"], len(VOLUMES))
+
+    def test_invalid_items(self):
+        path = self.write("volumes.json", json.dumps([google_volume(1, title="")]))
+        out = self.call(path)
+        self.assertIn("invalid: 1", out)
+        self.assertEqual(Book.objects.count(), 0)
+
+    def test_broken_items_are_skipped(self):
+        no_type = google_volume(1)
+        no_type["volumeInfo"]["industryIdentifiers"] = [{"identifier": "1234"}]
+        no_authors = google_volume(2)
+        no_authors["volumeInfo"]["authors"] = None
+        lines = [no_type, VOLUMES[0], no_authors, VOLUMES[1]]
+        path = self.write(
+            "volumes.jsonl",
+            "\n".join([*map(json.dumps, lines), "{broken", json.dumps(VOLUMES[2])]),
+        )
+
+        out = self.call(path, "--batch-size", "2")
+        self.assertIn("Items: 6, created: 3, updated: 0, skipped: 0, invalid: 3", out)
+        with open(f"{path}.checkpoint") as file:
+            self.assertEqual(json.load(file)["progress"]["invalid"], 3)
+
+    def test_malformed_json_dump(self):
+        data = json.dumps(VOLUMES[:3])[:-1] + ", {broken}]"
+        path = self.write("volumes.json", data)
+
+        with self.assertRaisesMessage(CommandError, "Malformed dump after item 3"):
+            self.call(path, "--batch-size", "2")
+        self.assertEqual(Book.objects.count(), 3)
+        with open(f"{path}.checkpoint") as file:
+            self.assertEqual(json.load(file)["cursor"], 3)
+
+    def test_missing_file(self):
+        with self.assertRaises(CommandError):
+            self.call("missing.json")
@@ -0,0 +1,90 @@
+import csv
+import gzip
+import io
+import json
+from datetime import date
+
+from django.test import TestCase
+from django.urls import reverse
+
+from bookmanager.books.export import chunked, export_books
+from bookmanager.books.models import Book
+from bookmanager.books.utils import DEFAULT_COVER_URI
+
+from .factories import BookFactory
+
+
+class ExportTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        BookFactory(
+            title="B   ż",
+            author="Author",
+            language="pl",
+            published_date=date(2001, 2, 3),
+            isbn_13="9788375780635",
+            cover_uri="",
+        )
+        BookFactory(title="A", language="en", cover_uri="http://cover")
+        BookFactory(title="C", language="pl")
+
+    def export(self, export_format, **params):
+        url = reverse("books-apiv1:export", args=[export_format])
+        return self.client.get(url, params)
+
+    def test_ndjson_matches_api(self):
+        response = self.export("ndjson")
+        self.assertTrue(response.streaming)
+        self.assertEqual(
+            response["Content-Type"], "application/x-ndjson; charset=utf-8"
+        )
+        self.assertIn('filename="books.ndjson"', response["Content-Disposition"])
+
+        lines = b"".join(response.streaming_content).splitlines()
+        api = self.client.get(reverse("books-apiv1:list")).json()["results"]
+        self.assertEqual([json.loads(line) for line in lines], api)
+        self.assertEqual(api[1]["cover_uri"], DEFAULT_COVER_URI)
+
+    def test_csv(self):
+        response = self.export("csv", language="pl")
+        content = b"".join(response.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+
+        self.assertEqual([row["title"] for row in rows], ["B   ż", "C"])
+        self.assertEqual(rows[0]["published_date"], "2001-02-03")
+        self.assertEqual(rows[0]["isbn_13"], "9788375780635")
+        self.assertEqual(rows[0]["cover_uri"], DEFAULT_COVER_URI)
+
+    def test_gzip(self):
+        response = self.client.get(
+            reverse("books-apiv1:export", args=["ndjson"]),
+            {"language": "en"},
+            HTTP_ACCEPT_ENCODING="gzip, deflate",
+        )
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        lines = gzip.decompress(b"".join(response.streaming_content)).splitlines()
+        self.assertEqual([json.loads(line)["title"] for line in lines], ["A"])
+
+    def test_text_search(self):
+        response = self.export("ndjson", title="b")
+        lines = b"".join(response.streaming_content).splitlines()
+        self.assertEqual([json.loads(line)["title"] for line in lines], ["B   ż"])
+
+    def test_errors(self):
+        self.assertEqual(self.export("xml").status_code, 404)
+        response = self.client.get(
+            reverse("books-apiv1:export", args=["csv"]),
+            {"date_from": "x"},
+            HTTP_ACCEPT="text/csv",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("date_from", response.json())
+
+    def test_rows_are_read_in_chunks(self):
+        pieces = list(chunked([b"ab", b"cd", b"e"], size=4))
+        self.assertEqual(pieces, [b"abcd", b"e"])
+
+        chunks = export_books(Book.objects.all(), "ndjson")
+        # nothing is read before first chunk is requested
+        with self.assertNumQueries(1):
+            next(chunks)
@@ -0,0 +1,93 @@
+import threading
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+
+from bookmanager.books.federated import federated_search
+from bookmanager.books.utils import google_book_parser
+
+from .factories import BookFactory
+from .utils import google_volume
+
+VALID_ISBN13 = "9788365970398"
+
+
+def google_books(*volumes):
+    books = [google_book_parser(volume) for volume in volumes]
+    return books, len(books), 200
+
+
+class FederatedSearchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.local = BookFactory(title="Harry local", google_id="volume1")
+        cls.saved = BookFactory(title="Other title", isbn_13=VALID_ISBN13)
+
+    @mock.patch("bookmanager.books.federated.get_google_api_books")
+    def test_merge_and_dedupe(self, google_mock):
+        isbn = [{"type": "ISBN_13", "identifier": "978-83-65970-39-8"}]
+        google_mock.return_value = google_books(
+            google_volume(1, title="Harry"),
+            google_volume(2, title="Harry 2", industryIdentifiers=isbn),
+            google_volume(3, title="Harry 3"),
+        )
+        results = federated_search({"search": "harry"})
+
+        self.assertFalse(results.remote_pending)
+        self.assertEqual(results.remote_status, 200)
+        self.assertEqual(
+            [(book["title"], book["in_catalog"]) for book in results.books],
+            [("Harry local", True), ("Harry 2", True), ("Harry 3", False)],
+        )
+        self.assertEqual(results.books[0]["source"], "local")
+        self.assertEqual(results.books[1]["id"], self.saved.pk)
+        self.assertEqual(results.books[2]["id"], "volume3")
+
+    @mock.patch("bookmanager.books.federated.get_google_api_books")
+    def test_google_misses_deadline(self, google_mock):
+        release = threading.Event()
+
+        def slow_google(*args, **kwargs):
+            release.wait(5)
+            return google_books(google_volume(3, title="Harry 3"))
+
+        google_mock.side_effect = slow_google
+        try:
+            results = federated_search({"search": "harry"}, timeout=0.05)
+        finally:
+            release.set()
+
+        self.assertTrue(results.remote_pending)
+        self.assertIsNone(results.remote_status)
+        self.assertEqual([book["title"] for book in results.books], ["Harry local"])
+
+    @mock.patch(
+        "bookmanager.books.federated.get_google_api_books",
+        return_value=google_books(google_volume(3, title="Harry 3")),
+    )
+    def test_view(self, _):
+        response = self.client.get(
+            reverse("books:federated-search"), {"search": "harry"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "books/federated.html")
+        self.assertContains(response, "Harry local")
+        self.assertContains(response, "Harry 3")
+        self.assertNotContains(response, "still loading")
+
+    @mock.patch(
+        "bookmanager.books.federated.get_google_api_books",
+        return_value=google_books(google_volume(3, title="Harry 3")),
+    )
+    def test_api(self, _):
+        url = reverse("books-apiv1:federated-search")
+        response = self.client.get(url, {"search": "harry"})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertFalse(data["remote_pending"])
+        self.assertEqual(data["results"][0]["id"], str(self.local.pk))
+        self.assertEqual(data["results"][1]["google_id"], "volume3")
+        self.assertEqual(self.client.get(url, {"page": 2}).status_code, 400)
@@ -0,0 +1,179 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from bookmanager.books.google_cache import (
+    cached_response,
+    get_cache,
+    get_volume_cache,
+    search_cache_key,
+    stats,
+    volume_cache_key,
+)
+from bookmanager.books.singleflight import SingleFlight
+from bookmanager.books.utils import (
+    get_google_api_book,
+    get_google_api_books,
+    google_api_params,
+)
+
+from .utils import (
+    GOOGLE_API_JSON_RESPONSES_MOCK,
+    GoogleCacheMixin,
+    RequestResponseMock,
+    google_response_404,
+    google_search_response,
+)
+
+
+class CacheKeysTest(SimpleTestCase):
+    def test_search_key_is_normalized(self):
+        params = {"startIndex": 0, "maxResults": 40}
+        self.assertEqual(
+            search_cache_key("q=Harry  Potter", params),
+            search_cache_key(" q=harry potter", dict(reversed(params.items()))),
+        )
+
+    def test_search_key_depends_on_page(self):
+        self.assertNotEqual(
+            search_cache_key("q=harry", {"startIndex": 0}),
+            search_cache_key("q=harry", {"startIndex": 40}),
+        )
+
+    def test_volume_key(self):
+        self.assertNotEqual(volume_cache_key("a"), volume_cache_key("b"))
+
+
+@mock.patch(
+    "bookmanager.books.google_client.requests.Session.get",
+    side_effect=google_search_response,
+)
+class GoogleResponsesCacheTest(GoogleCacheMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        stats.reset()
+
+    def test_search_is_cached(self, get_mock):
+        first = get_google_api_books({"search": "harry"}, page=2)
+        second = get_google_api_books({"search": "Harry"}, page=2)
+
+        self.assertEqual(first, second)
+        self.assertEqual(get_mock.call_count, 1)
+        self.assertDictEqual(stats.as_dict(), {"hits": 1, "misses": 1, "stale_hits": 0})
+
+    def test_other_page_is_not_cached(self, get_mock):
+        get_google_api_books({"search": "harry"}, page=1)
+        get_google_api_books({"search": "harry"}, page=2)
+        self.assertEqual(get_mock.call_count, 2)
+
+    def test_volume_is_cached(self, get_mock):
+        get_mock.side_effect = lambda *_, **kwargs: RequestResponseMock(
+            json_data=GOOGLE_API_JSON_RESPONSES_MOCK["correct"]
+        )
+        get_google_api_book("volume_id")
+        book, status = get_google_api_book("volume_id")
+
+        self.assertEqual(status, 200)
+        self.assertEqual(get_mock.call_count, 1)
+
+    def test_search_results_are_cached_as_volumes_apart(self, get_mock):
+        get_google_api_books({"search": "harry"})
+        key = volume_cache_key("volume1")
+
+        self.assertIsNone(get_cache().get(key))
+        self.assertIsNotNone(get_volume_cache().get(key))
+        get_google_api_book("volume1")
+        self.assertEqual(get_mock.call_count, 1)
+
+    def test_error_response_is_not_cached(self, get_mock):
+        get_mock.side_effect = google_response_404
+        get_google_api_book("volume_id")
+        book, status = get_google_api_book("volume_id")
+
+        self.assertEqual(status, 404)
+        self.assertEqual(get_mock.call_count, 2)
+
+    def test_stale_response_when_google_is_unavailable(self, get_mock):
+        first = get_google_api_books({"search": "harry"})
+        # fresh response expired, stale copy is left
+        get_cache().delete(search_cache_key("q=harry", google_api_params()))
+        get_mock.side_effect = lambda *_, **kwargs: RequestResponseMock(status_code=503)
+
+        self.assertEqual(get_google_api_books({"search": "harry"}), first)
+        self.assertEqual(stats.as_dict()["stale_hits"], 1)
+
+    def test_no_stale_response_for_not_found(self, get_mock):
+        get_mock.side_effect = google_response_404
+        book, status = get_google_api_book("volume_id")
+        self.assertEqual(status, 404)
+        self.assertEqual(stats.as_dict()["stale_hits"], 0)
+
+
+class SingleFlightTest(SimpleTestCase):
+    def test_concurrent_calls_are_coalesced(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "result"
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            leader = executor.submit(flight.do, "key", fetch)
+            started.wait(5)
+            followers = [executor.submit(flight.do, "key", fetch) for _ in range(4)]
+            # give followers time to join the call in flight
+            time.sleep(0.2)
+            release.set()
+            results = [leader.result()] + [f.result() for f in followers]
+
+        self.assertEqual(results, ["result"] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertFalse(flight.in_flight("key"))
+
+    def test_error_is_shared_and_not_kept(self):
+        flight = SingleFlight()
+
+        def fetch():
+            raise ValueError
+
+        with self.assertRaises(ValueError):
+            flight.do("key", fetch)
+        self.assertEqual(flight.do("key", lambda: "result"), "result")
+
+
+class CrossProcessSingleFlightTest(GoogleCacheMixin, SimpleTestCase):
+    @override_settings(
+        GOOGLE_SINGLE_FLIGHT_CROSS_PROCESS=True, GOOGLE_SINGLE_FLIGHT_TIMEOUT=5
+    )
+    def test_waits_for_other_process(self):
+        """Response fetched by lock owner is used instead of fetching again."""
+        key = "search:key"
+        response = ([], 0, 200)
+        get_cache().set(f"lock:{key}", "other process")
+
+        def other_process():
+            get_cache().set(key, response)
+            get_cache().delete(f"lock:{key}")
+
+        timer = threading.Timer(0.1, other_process)
+        timer.start()
+        fetch = mock.Mock(return_value=([], 0, 200))
+        self.assertEqual(cached_response(key, fetch), response)
+        timer.join()
+        fetch.assert_not_called()
+
+    @override_settings(
+        GOOGLE_SINGLE_FLIGHT_CROSS_PROCESS=True, GOOGLE_SINGLE_FLIGHT_TIMEOUT=5
+    )
+    def test_lock_is_released(self):
+        key = "search:key"
+        cached_response(key, lambda: ([], 0, 200))
+        self.assertIsNone(get_cache().get(f"lock:{key}"))
@@ -0,0 +1,183 @@
+from http import HTTPStatus
+from unittest import mock
+
+import requests
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from bookmanager.books.google_client import (
+    CircuitBreaker,
+    GoogleApiUnavailable,
+    GoogleBooksClient,
+    RateLimiter,
+    get_client,
+)
+from bookmanager.books.utils import get_google_api_book, get_google_api_books
+
+from .utils import GoogleApiStub, GoogleCacheMixin
+
+
+class GoogleBooksClientTest(GoogleCacheMixin, SimpleTestCase):
+    def test_shared_client(self):
+        self.assertIs(get_client(), get_client())
+
+    def test_session_configuration(self):
+        client = GoogleBooksClient(
+            connect_timeout=1, read_timeout=2, retries=3, pool_size=4
+        )
+        adapter = client.session.get_adapter(client.api_url)
+
+        self.assertEqual(client.timeout, (1, 2))
+        self.assertEqual(adapter.max_retries.total, 3)
+        self.assertIn(503, adapter.max_retries.status_forcelist)
+        self.assertNotIn(429, adapter.max_retries.status_forcelist)
+        self.assertFalse(adapter.max_retries.respect_retry_after_header)
+        self.assertEqual(adapter._pool_maxsize, 4)
+        self.assertEqual(client.session.headers["Accept-Encoding"], "gzip")
+        self.assertIn("gzip", client.session.headers["User-Agent"])
+
+    @mock.patch("bookmanager.books.google_client.requests.Session.get")
+    def test_requests_have_timeout(self, get_mock):
+        client = GoogleBooksClient(connect_timeout=1, read_timeout=2)
+        client.volume("volume_id")
+        get_mock.assert_called_once_with(
+            f"{client.api_url}/volume_id", params=None, headers=None, timeout=(1, 2)
+        )
+
+    @mock.patch("bookmanager.books.google_client.requests.Session.get")
+    def test_conditional_volume_request(self, get_mock):
+        client = GoogleBooksClient()
+        client.volume("volume_id", etag='"abc"')
+        self.assertEqual(
+            get_mock.call_args.kwargs["headers"], {"If-None-Match": '"abc"'}
+        )
+
+    @mock.patch(
+        "bookmanager.books.google_client.requests.Session.get",
+        side_effect=requests.Timeout,
+    )
+    def test_timeout(self, *_):
+        self.assertEqual(
+            get_google_api_books({"search": "a"}),
+            ([], 0, HTTPStatus.SERVICE_UNAVAILABLE),
+        )
+        self.assertEqual(
+            get_google_api_book("volume_id"), ({}, HTTPStatus.SERVICE_UNAVAILABLE)
+        )
+
+    def test_retry_after_isnt_waited_for(self):
+        for status, requests_count in [(429, 1), (503, 3)]:
+            with self.subTest(status=status):
+                headers = {"Retry-After": "60"}
+                with GoogleApiStub([], status=status, headers=headers) as stub:
+                    client = GoogleBooksClient(
+                        api_url=stub.api_url, retries=2, backoff_factor=0
+                    )
+                    with mock.patch("urllib3.util.retry.time.sleep") as sleep_mock:
+                        response = client.search("q=a")
+
+                self.assertEqual(response.status_code, status)
+                self.assertEqual(len(stub.requests), requests_count)
+                self.assertNotIn(mock.call(60), sleep_mock.call_args_list)
+
+
+class RateLimiterTest(SimpleTestCase):
+    @mock.patch("bookmanager.books.google_client.time.sleep")
+    def test_waits_when_bucket_is_empty(self, sleep_mock):
+        limiter = RateLimiter(rate=2, capacity=2)
+        limiter.acquire()
+        limiter.acquire()
+        sleep_mock.assert_not_called()
+
+        # sleeping doesn't refill mocked bucket, add token by hand
+        def refill(_):
+            limiter.tokens = 1
+
+        sleep_mock.side_effect = refill
+        limiter.acquire()
+        sleep_mock.assert_called_once()
+        self.assertAlmostEqual(sleep_mock.call_args.args[0], 0.5, places=1)
+
+    @mock.patch("bookmanager.books.google_client.time.sleep")
+    def test_zero_rate_lets_nothing_through(self, sleep_mock):
+        limiter = RateLimiter(rate=0)
+        self.assertFalse(limiter.acquire())
+        self.assertFalse(limiter.acquire(timeout=1))
+        sleep_mock.assert_not_called()
+
+
+class CircuitBreakerTest(SimpleTestCase):
+    def test_opens_after_failures_in_row(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+        breaker.failure()
+        breaker.success()
+        breaker.failure()
+        self.assertTrue(breaker.allow())
+        breaker.failure()
+
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+        self.assertEqual(breaker.as_dict()["failures"], 2)
+
+    @mock.patch("bookmanager.books.google_client.time.monotonic")
+    def test_half_open_lets_one_trial_call(self, monotonic_mock):
+        monotonic_mock.return_value = 100
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+        breaker.failure()
+        self.assertEqual(breaker.as_dict()["retry_in"], 30)
+
+        monotonic_mock.return_value = 131
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        monotonic_mock.return_value = 162
+        self.assertTrue(breaker.allow())
+        breaker.success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+
+class GoogleBooksClientProtectionTest(GoogleCacheMixin, SimpleTestCase):
+    @mock.patch(
+        "bookmanager.books.google_client.requests.Session.get",
+        return_value=mock.Mock(status_code=503),
+    )
+    def test_open_circuit_fails_fast(self, get_mock):
+        client = GoogleBooksClient(breaker=CircuitBreaker(2, 30))
+        client.volume("volume_id")
+        client.volume("volume_id")
+
+        with self.assertRaises(GoogleApiUnavailable):
+            client.volume("volume_id")
+        self.assertEqual(get_mock.call_count, 2)
+
+    @mock.patch("bookmanager.books.google_client.requests.Session.get")
+    def test_rate_limit_exceeded(self, get_mock):
+        client = GoogleBooksClient(limiter=RateLimiter(rate=0.01, capacity=1))
+        client.volume("volume_id")
+
+        with self.assertRaises(GoogleApiUnavailable):
+            client.volume("volume_id")
+        self.assertEqual(get_mock.call_count, 1)
+        self.assertEqual(client.breaker.state, CircuitBreaker.CLOSED)
+
+    @mock.patch("bookmanager.books.google_client.requests.Session.get")
+    def test_open_circuit_gives_service_unavailable(self, get_mock):
+        for _ in range(get_client().breaker.failure_threshold):
+            get_client().breaker.failure()
+
+        self.assertEqual(
+            get_google_api_book("volume_id"), ({}, HTTPStatus.SERVICE_UNAVAILABLE)
+        )
+        get_mock.assert_not_called()
+
+    def test_status_endpoint(self):
+        get_client().breaker.failure()
+        response = self.client.get(reverse("books-apiv1:google-status"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["breaker"]["state"], "closed")
+        self.assertEqual(response.json()["breaker"]["failures"], 1)
+        self.assertIn("stale_hits", response.json()["cache"])
@@ -0,0 +1,191 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from bookmanager.books.google_client import GoogleBooksClient
+from bookmanager.books.jobs import ImportAllJob, run_import_job
+from bookmanager.books.models import Book, ImportJob
+
+from .factories import BookFactory
+from .utils import GoogleApiStub, google_volume
+
+VALID_ISBN13 = "9788365970398"
+
+
+class ImportAllJobTest(TestCase):
+    """Test import of all results against local google api stub."""
+
+    def run_job(self, stub, **kwargs):
+        job = ImportJob.objects.create(query={"search": "stub"})
+        client = GoogleBooksClient(api_url=stub.api_url, retries=0)
+        run_import_job(job.pk, client=client, **kwargs)
+        job.refresh_from_db()
+        return job
+
+    def test_import_all_pages(self):
+        volumes = [google_volume(i) for i in range(settings.PAGINATE_BY * 2 + 5)]
+        with GoogleApiStub(volumes) as stub:
+            job = self.run_job(stub, concurrency=2, batch_size=30)
+
+        self.assertEqual(job.status, ImportJob.FINISHED)
+        self.assertEqual(job.total, len(volumes))
+        self.assertEqual(job.pages_total, 3)
+        self.assertEqual(job.pages_done, 3)
+        self.assertEqual(job.imported, len(volumes))
+        self.assertEqual(Book.objects.count(), len(volumes))
+        self.assertEqual(len(stub.requests), 3)
+        book = Book.objects.get(title="Title 1")
+        self.assertEqual(str(book.published_date), "2004-01-01")
+
+    def test_duplicates_and_invalid_items(self):
+        isbn = [{"type": "ISBN_13", "identifier": VALID_ISBN13}]
+        volumes = [
+            google_volume(1),
+            google_volume(1),
+            google_volume(2, industryIdentifiers=isbn),
+            google_volume(3, industryIdentifiers=isbn),
+            google_volume(4, title=""),
+        ]
+        with GoogleApiStub(volumes) as stub:
+            job = self.run_job(stub)
+
+        self.assertEqual(job.status, ImportJob.FINISHED)
+        self.assertEqual(job.imported, 2)
+        self.assertEqual(job.skipped, 2)
+        self.assertEqual(job.invalid, 1)
+        self.assertEqual(Book.objects.count(), 2)
+
+    def test_update_books_already_in_catalog(self):
+        BookFactory(isbn_13=VALID_ISBN13)
+        isbn = [{"type": "ISBN_13", "identifier": VALID_ISBN13}]
+        with GoogleApiStub([google_volume(1, industryIdentifiers=isbn)]) as stub:
+            job = self.run_job(stub)
+
+        self.assertEqual(job.updated, 1)
+        self.assertEqual(Book.objects.count(), 1)
+        self.assertEqual(Book.objects.get().google_id, "volume1")
+
+    def test_reimport_is_idempotent(self):
+        volumes = [google_volume(i) for i in range(5)]
+        with GoogleApiStub(volumes) as stub:
+            self.run_job(stub)
+            job = self.run_job(stub)
+
+        self.assertEqual(job.imported, 0)
+        self.assertEqual(job.updated, 5)
+        self.assertEqual(Book.objects.count(), 5)
+
+    def test_max_pages(self):
+        volumes = [google_volume(i) for i in range(settings.PAGINATE_BY * 3)]
+        with self.settings(GOOGLE_IMPORT_MAX_PAGES=2):
+            with GoogleApiStub(volumes) as stub:
+                job = self.run_job(stub)
+
+        self.assertEqual(job.pages_total, 2)
+        self.assertEqual(job.imported, settings.PAGINATE_BY * 2)
+
+    def test_pages_in_flight_are_bounded(self):
+        volumes = [google_volume(i) for i in range(settings.PAGINATE_BY * 8)]
+        submit = ThreadPoolExecutor.submit
+        add_page = ImportAllJob.add_page
+        submitted, added, in_flight = [], [], []
+
+        def counting_submit(executor, *args):
+            submitted.append(args)
+            # first page is fetched and added before pool starts
+            in_flight.append(len(submitted) - (len(added) - 1))
+            return submit(executor, *args)
+
+        def counting_add_page(job, *args):
+            added.append(args)
+            add_page(job, *args)
+
+        with mock.patch.object(ThreadPoolExecutor, "submit", counting_submit):
+            with mock.patch.object(ImportAllJob, "add_page", counting_add_page):
+                with GoogleApiStub(volumes) as stub:
+                    job = self.run_job(stub, concurrency=1)
+
+        self.assertEqual(job.pages_done, 8)
+        self.assertEqual(len(submitted), 7)
+        self.assertEqual(max(in_flight), 2)
+
+    def test_stops_at_short_page(self):
+        volumes = [google_volume(i) for i in range(settings.PAGINATE_BY * 2 + 5)]
+        # totalItems is only an estimate
+        with GoogleApiStub(volumes, total=settings.PAGINATE_BY * 100) as stub:
+            job = self.run_job(stub, concurrency=1)
+
+        self.assertEqual(job.status, ImportJob.FINISHED)
+        self.assertEqual(job.imported, len(volumes))
+        # third page is short, fourth was already in flight
+        self.assertEqual(len(stub.requests), 4)
+        self.assertEqual(job.pages_total, job.pages_done)
+
+    def test_failed_first_page(self):
+        with GoogleApiStub([]) as stub:
+            stub.search = lambda *_: (400, {})
+            job = self.run_job(stub)
+
+        self.assertEqual(job.status, ImportJob.FAILED)
+        self.assertIn("400", job.error)
+
+
+class ImportJobApiTest(TestCase):
+    @mock.patch("bookmanager.books.jobs.threading.Thread")
+    def test_create_job(self, thread_mock):
+        response = self.client.post(
+            reverse("books-apiv1:import-job-create"),
+            data={"query": {"search": "harry", "other": "x"}},
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertDictEqual(response.json()["query"], {"search": "harry"})
+        self.assertEqual(response.json()["status"], ImportJob.PENDING)
+        thread_mock.assert_called_once()
+
+    def test_create_job_without_query(self):
+        response = self.client.post(
+            reverse("books-apiv1:import-job-create"),
+            data={"query": {"other": "x"}},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_job_status(self):
+        job = ImportJob.objects.create(query={"search": "harry"}, pages_done=2)
+        response = self.client.get(
+            reverse("books-apiv1:import-job", kwargs={"pk": job.pk})
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["pages_done"], 2)
+
+    @override_settings(GOOGLE_IMPORT_MAX_RUNNING_JOBS=2)
+    @mock.patch("bookmanager.books.jobs.threading.Thread")
+    def test_running_jobs_limit(self, thread_mock):
+        def create():
+            return self.client.post(
+                reverse("books-apiv1:import-job-create"),
+                data={"query": {"search": "harry"}},
+                content_type="application/json",
+            )
+
+        ImportJob.objects.create(query={"search": "a"}, status=ImportJob.RUNNING)
+        stale = ImportJob.objects.create(
+            query={"search": "b"}, status=ImportJob.RUNNING
+        )
+        ImportJob.objects.filter(pk=stale.pk).update(
+            modified=timezone.now() - timedelta(hours=1)
+        )
+        ImportJob.objects.create(query={"search": "c"}, status=ImportJob.FINISHED)
+
+        self.assertEqual(create().status_code, 201)
+        response = create()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(thread_mock.call_count, 1)
@@ -0,0 +1,123 @@
+from datetime import date, timedelta
+
+from django.core.paginator import Page
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from bookmanager.books.keyset import (
+    InvalidCursor,
+    KeysetPage,
+    KeysetPaginator,
+    encode_cursor,
+    keyset_ordering,
+)
+from bookmanager.books.models import Book
+
+from .factories import BookFactory
+
+
+class KeysetPaginatorTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # 3 books share every date, pages split groups of equal dates
+        for i in range(25):
+            BookFactory(
+                title=f"Title {i % 7}",
+                published_date=date(2000, 1, 1) + timedelta(days=i // 3),
+            )
+
+    def walk(self, ordering, per_page=4):
+        queryset = Book.objects.order_by(*ordering)
+        paginator = KeysetPaginator(queryset, per_page, keyset_ordering(queryset))
+        pages = [paginator.page()]
+        while pages[-1].has_next():
+            pages.append(paginator.page(pages[-1].next_cursor()))
+        return paginator, pages
+
+    def test_walk_forward_and_back(self):
+        for ordering in (["-published_date"], ["title"]):
+            with self.subTest(ordering=ordering):
+                paginator, pages = self.walk(ordering)
+                expected = list(Book.objects.order_by(*paginator.ordering))
+
+                self.assertEqual([book for page in pages for book in page], expected)
+                self.assertEqual([page.number for page in pages], list(range(1, 8)))
+                self.assertFalse(pages[0].has_previous())
+                self.assertEqual(len(pages[-1]), 1)
+
+                page = pages[-1]
+                backwards = [page]
+                while page.has_previous():
+                    page = paginator.page(page.previous_cursor())
+                    backwards.append(page)
+                self.assertEqual(
+                    [book for page in reversed(backwards) for book in page], expected
+                )
+                self.assertEqual(backwards[-1].number, 1)
+                self.assertTrue(backwards[-1].has_next())
+
+    def test_one_query_per_page(self):
+        paginator, pages = self.walk(["-published_date"])
+        with self.assertNumQueries(1):
+            paginator.page(pages[3].next_cursor())
+
+    def test_ordering(self):
+        self.assertEqual(
+            keyset_ordering(Book.objects.order_by("-published_date")),
+            ["-published_date", "-id"],
+        )
+        self.assertEqual(
+            keyset_ordering(Book.objects.order_by("title")), ["title", "id"]
+        )
+        self.assertIsNone(keyset_ordering(Book.objects.order_by("author")))
+        self.assertIsNone(keyset_ordering(Book.objects.all()))
+
+    def test_invalid_cursor(self):
+        paginator = KeysetPaginator(Book.objects.all(), 4, ["title", "id"])
+        for cursor in ["x", encode_cursor("x", 1, []), encode_cursor("n", 2, ["a"])]:
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(InvalidCursor):
+                    paginator.page(cursor)
+        with self.assertRaises(InvalidCursor):
+            paginator.page(encode_cursor("n", 2, ["a", "not uuid"]))
+
+
+class KeysetListViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # list views show PAGINATE_BY (40) books per page
+        for i in range(90):
+            BookFactory(title=f"Title {i}", language="pl" if i % 3 else "en")
+
+    def test_pages_by_cursor(self):
+        url = reverse("books:search")
+        response = self.client.get(url, {"language": "pl"})
+        page = response.context["page_obj"]
+
+        self.assertIsInstance(page, KeysetPage)
+        self.assertEqual(len(response.context["books"]), 40)
+        self.assertContains(response, f"?cursor={page.next_cursor()}&language=pl")
+        self.assertNotContains(response, "?page=")
+
+        response = self.client.get(
+            url, {"language": "pl", "cursor": page.next_cursor()}
+        )
+        self.assertEqual(len(response.context["books"]), 20)
+        self.assertEqual(response.context["page_obj"].number, 2)
+        self.assertContains(response, "previous")
+        self.assertNotContains(response, "next")
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse("books:list"), {"cursor": "x"})
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(BOOKS_PAGINATION="offset")
+    def test_offset_mode(self):
+        response = self.client.get(reverse("books:list"))
+        self.assertIsInstance(response.context["page_obj"], Page)
+        self.assertContains(response, "?page=3&")
+
+    def test_text_search_uses_numbered_pages(self):
+        response = self.client.get(reverse("books:search"), {"title": "title"})
+        self.assertIsInstance(response.context["page_obj"], Page)
+        self.assertContains(response, "?page=2&title=title")
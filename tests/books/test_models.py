@@ -6,6 +6,8 @@ from django.test import TestCase
 from bookmanager.books.models import Book
 from bookmanager.books.utils import DEFAULT_COVER_URI
 
+from .factories import BookFactory
+
 
 class ValidationErrorTestMixin(object):
     @contextmanager
@@ -99,3 +101,22 @@ class CreateBookWithDefaulCoverURI(ValidationErrorTestMixin, TestCase):
         )
         book = Book.objects.first()
         self.assertEqual(book.cover_uri, DEFAULT_COVER_URI)
+
+
+class FindImportedBookTest(TestCase):
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.by_isbn = BookFactory(isbn_13="9788365970398")
+        cls.by_google_id = BookFactory(google_id="volume1")
+
+    def test_google_id_is_preferred(self):
+        book = Book.find_imported(google_id="volume1", isbn_13="9788365970398")
+        self.assertEqual(book, self.by_google_id)
+
+    def test_isbn(self):
+        book = Book.find_imported(google_id="other", isbn_13="9788365970398")
+        self.assertEqual(book, self.by_isbn)
+
+    def test_not_found(self):
+        self.assertIsNone(Book.find_imported(google_id="other"))
+        self.assertIsNone(Book.find_imported())
@@ -0,0 +1,65 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from bookmanager.books.google_client import get_client
+from bookmanager.books.prefetch import Prefetcher, prefetch_page
+
+from .utils import GoogleCacheMixin, google_search_response
+
+
+@mock.patch(
+    "bookmanager.books.google_client.requests.Session.get",
+    side_effect=google_search_response,
+)
+class PrefetcherTest(GoogleCacheMixin, SimpleTestCase):
+    def test_prefetched_page_is_cached(self, get_mock):
+        prefetcher = Prefetcher(workers=1, rate=10)
+        future = prefetcher.prefetch({"search": "harry"}, page=2)
+        future.result(timeout=5)
+
+        self.assertIsNone(prefetcher.prefetch({"search": "harry"}, page=2))
+        self.assertEqual(get_mock.call_count, 1)
+        self.assertEqual(get_mock.call_args.kwargs["params"]["startIndex"], 40)
+
+    def test_prefetch_is_limited(self, get_mock):
+        prefetcher = Prefetcher(workers=1, rate=0.01)
+        prefetcher.prefetch({"search": "harry"}, page=2).result(timeout=5)
+
+        self.assertIsNone(prefetcher.prefetch({"search": "harry"}, page=3))
+        self.assertEqual(get_mock.call_count, 1)
+
+    def test_no_prefetch_while_circuit_is_open(self, get_mock):
+        for _ in range(get_client().breaker.failure_threshold):
+            get_client().breaker.failure()
+        prefetcher = Prefetcher(workers=1, rate=10)
+
+        self.assertIsNone(prefetcher.prefetch({"search": "harry"}, page=2))
+        get_mock.assert_not_called()
+
+    @override_settings(GOOGLE_PREFETCH=True)
+    def test_next_page_is_served_from_cache(self, get_mock):
+        futures = []
+
+        def prefetch(*args):
+            futures.append(prefetch_page(*args))
+
+        url = reverse("books:import-list")
+        with mock.patch("bookmanager.books.views.prefetch_page", side_effect=prefetch):
+            self.client.get(url, {"search": "harry", "page": "1"})
+            futures[0].result(timeout=5)
+            response = self.client.get(url, {"search": "harry", "page": "2"})
+            futures[1].result(timeout=5)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["books"]), 3)
+        # page 2 was fetched once, by prefetch
+        self.assertEqual(
+            [call.kwargs["params"]["startIndex"] for call in get_mock.call_args_list],
+            [0, 40, 80],
+        )
+
+    def test_prefetch_is_disabled_by_default(self, get_mock):
+        self.client.get(reverse("books:import-list"), {"search": "harry"})
+        self.assertEqual(get_mock.call_count, 1)
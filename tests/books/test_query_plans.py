@@ -0,0 +1,60 @@
+from itertools import combinations
+
+from django.db import connection
+from django.test import TestCase, skipUnlessDBFeature
+
+from bookmanager.books.filters import InternalBooksFilter
+from bookmanager.books.keyset import keyset_ordering, seek_lookup
+from bookmanager.books.models import Book
+
+FILTERS = {
+    "language": "en",
+    "date_from": "2000-01-01",
+    "date_to": "2010-01-01",
+    "published_date": "2005-01-01",
+}
+ORDERINGS = [["-published_date"], ["title"]]
+
+
+@skipUnlessDBFeature("supports_explaining_query_execution")
+class QueryPlanTest(TestCase):
+    """Check list views queries are served by indexes, not full scans.
+
+    Plans are checked for every combination of InternalBooksFilter filters
+    (title and author go to full text index) and list views orderings.
+    """
+
+    def assertUsesIndex(self, queryset):
+        plan = queryset.explain()
+        for line in plan.splitlines():
+            if connection.vendor == "sqlite":
+                self.assertNotRegex(line, r"SCAN books_book$", plan)
+                self.assertNotIn("TEMP B-TREE FOR ORDER BY", line, plan)
+            else:
+                self.assertNotIn("Seq Scan on books_book", line, plan)
+
+    def test_filters_and_orderings(self):
+        for size in range(len(FILTERS) + 1):
+            for keys in combinations(FILTERS, size):
+                for ordering in ORDERINGS:
+                    if keys and ordering == ["title"]:
+                        # filtered lists are ordered by date only
+                        continue
+                    data = {key: FILTERS[key] for key in keys}
+                    with self.subTest(filters=keys, ordering=ordering):
+                        queryset = Book.objects.order_by(*ordering)
+                        filterset = InternalBooksFilter(data, queryset=queryset)
+                        self.assertUsesIndex(filterset.qs[:40])
+                        if keys:
+                            self.assertUsesIndex(filterset.qs.values("pk"))
+
+    def test_keyset_pages(self):
+        values = {"published_date": "2005-01-01", "title": "M", "id": "0" * 32}
+        for ordering in ORDERINGS:
+            queryset = Book.objects.order_by(*ordering)
+            ordering = keyset_ordering(queryset)
+            lookup = seek_lookup(
+                ordering, [values[field.lstrip("-")] for field in ordering], True
+            )
+            with self.subTest(ordering=ordering):
+                self.assertUsesIndex(queryset.filter(lookup)[:41])
@@ -0,0 +1,108 @@
+import io
+from urllib.parse import parse_qs, urlparse
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from bookmanager.books.google_client import GoogleBooksClient
+from bookmanager.books.models import Book
+
+from .factories import BookFactory
+from .utils import GoogleApiStub, google_volume
+
+
+class RefreshGoogleBooksCommandTest(TestCase):
+    """Test refresh of imported books against local google api stub."""
+
+    def refresh(self, stub, **options):
+        out = io.StringIO()
+        client = GoogleBooksClient(api_url=stub.api_url, retries=0)
+        call_command(
+            "refresh_google_books", client=client, rate=1000, stdout=out, **options
+        )
+        return out.getvalue()
+
+    def imported_book(self, number, **fields):
+        fields.setdefault("title", f"Title {number}")
+        return BookFactory(
+            google_id=f"volume{number}",
+            author="Author",
+            published_date="2004-01-01",
+            language="en",
+            isbn_10="",
+            isbn_13="",
+            pages="",
+            cover_uri="",
+            **fields,
+        )
+
+    def test_only_changed_books_are_written(self):
+        self.imported_book(1)
+        self.imported_book(2, title="Old title")
+        BookFactory(google_id=None)
+        volumes = [{**google_volume(1), "etag": "a"}, {**google_volume(2), "etag": "b"}]
+
+        with GoogleApiStub(volumes) as stub:
+            # batch, two updates, catalog version, empty batch
+            with self.assertNumQueries(5):
+                output = self.refresh(stub)
+
+        self.assertIn("Checked: 2", output)
+        self.assertIn("changed: 1, unchanged: 1", output)
+        self.assertEqual(len(stub.requests), 2)
+        changed = Book.objects.get(google_id="volume2")
+        self.assertEqual(changed.title, "Title 2")
+        self.assertEqual(changed.slug, "title-2")
+        self.assertEqual(changed.google_etag, "b")
+        self.assertIsNotNone(changed.google_fetched_at)
+        self.assertEqual(Book.objects.get(google_id="volume1").google_etag, "a")
+
+    def test_conditional_requests(self):
+        self.imported_book(1, google_etag="a")
+        self.imported_book(2, google_etag="old", title="Old title")
+        volumes = [{**google_volume(1), "etag": "a"}, {**google_volume(2), "etag": "b"}]
+
+        with GoogleApiStub(volumes) as stub:
+            output = self.refresh(stub)
+            self.assertIn("not modified: 1, changed: 1", output)
+            # nothing changed since previous refresh, nothing is written
+            with self.assertNumQueries(2):
+                output = self.refresh(stub)
+
+        self.assertIn("not modified: 2, changed: 0", output)
+        self.assertEqual(Book.objects.get(google_id="volume2").title, "Title 2")
+
+    def test_etag_is_requested(self):
+        self.imported_book(1)
+        with GoogleApiStub([{**google_volume(1), "etag": "a"}]) as stub:
+            self.refresh(stub)
+
+        fields = parse_qs(urlparse(stub.requests[0]).query)["fields"][0]
+        self.assertTrue(fields.startswith("etag,"))
+        self.assertEqual(Book.objects.get().google_etag, "a")
+
+    def test_missing_published_date_keeps_saved_one(self):
+        book = self.imported_book(1, google_etag="old")
+        volume = {**google_volume(1), "etag": "new"}
+        del volume["volumeInfo"]["publishedDate"]
+
+        with GoogleApiStub([volume]) as stub:
+            output = self.refresh(stub)
+
+        self.assertIn("changed: 0, unchanged: 1", output)
+        book.refresh_from_db()
+        self.assertEqual(str(book.published_date), "2004-01-01")
+        self.assertEqual(book.google_etag, "new")
+
+    def test_failed_and_invalid_volumes(self):
+        self.imported_book(1)
+        self.imported_book(2)
+        with GoogleApiStub([google_volume(2, title="")]) as stub:
+            output = self.refresh(stub, batch_size=1)
+
+        self.assertIn("invalid: 1, failed: 1", output)
+        self.assertEqual(Book.objects.get(google_id="volume2").title, "Title 2")
+
+    def test_rate_must_be_positive(self):
+        with self.assertRaisesMessage(CommandError, "--rate"):
+            call_command("refresh_google_books", rate=0, stdout=io.StringIO())
@@ -0,0 +1,109 @@
+import io
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+
+from bookmanager.api.v1.books.renderers import FastJSONRenderer
+from bookmanager.api.v1.books.serializers import BookSerializer
+from bookmanager.books.models import Book
+
+from .factories import BookFactory
+
+TEXTS = [
+    'quote " backslash \\ slash /',
+    "line \u2028 paragraph \u2029 separators",
+    "control \x00\x01\x1f\x7f\t\n\r\b\f",
+    "zażółć 書 😀 \u00a0",
+    "",
+]
+
+
+class FastJSONRendererTest(SimpleTestCase):
+    def assertSameOutput(self, data, accepted_media_type=None):
+        self.assertEqual(
+            FastJSONRenderer().render(data, accepted_media_type),
+            JSONRenderer().render(data, accepted_media_type),
+        )
+
+    def test_same_output_as_json_renderer(self):
+        self.assertSameOutput(
+            OrderedDict(
+                [
+                    ("texts", TEXTS),
+                    ("numbers", [0, -1, 2**63, 10**30, True, None]),
+                    ("date", date(2020, 1, 2)),
+                    ("datetime", datetime(2020, 1, 2, 3, 4, 5, 678901, timezone.utc)),
+                    ("uuid", uuid.UUID(int=1)),
+                    ("decimal", Decimal("1.50")),
+                    ("nested", {"list": [{}, []]}),
+                ]
+            )
+        )
+        self.assertSameOutput([{"a": 1}], "application/json; indent=4")
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+
+class FastListSerializationTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i, text in enumerate(TEXTS):
+            BookFactory(
+                title=f"{i} {text}",
+                author=text or "author",
+                cover_uri="" if i % 2 else f"http://cover/{i}",
+                pages=str(i),
+                isbn_13="9788375780635" if i == 1 else "",
+            )
+
+    def test_list_bytes(self):
+        response = self.client.get(reverse("books-apiv1:list"), {"limit": 3})
+        books = Book.objects.order_by("title", "id")[:3]
+        data = response.json()
+        expected = JSONRenderer().render(
+            OrderedDict(
+                [
+                    ("next", data["next"]),
+                    ("previous", None),
+                    ("results", BookSerializer(books, many=True).data),
+                ]
+            )
+        )
+        self.assertEqual(response.content, expected)
+
+    def test_search_bytes(self):
+        response = self.client.get(
+            reverse("books-apiv1:search"), {"author": "author", "offset": 0}
+        )
+        expected = BookSerializer(Book.objects.filter(author="author"), many=True)
+        self.assertEqual(
+            response.content,
+            JSONRenderer().render(
+                OrderedDict(
+                    [
+                        ("count", 1),
+                        ("next", None),
+                        ("previous", None),
+                        ("results", expected.data),
+                    ]
+                )
+            ),
+        )
+
+    def test_list_builds_no_books(self):
+        # catalog version and books
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("books-apiv1:list"))
+        self.assertEqual(len(response.json()["results"]), 5)
+
+    def test_benchmark_command(self):
+        stdout = io.StringIO()
+        # fails when outputs differ
+        call_command("benchmark_books_api", rows=20, repeat=1, stdout=stdout)
+        self.assertIn("Speedup", stdout.getvalue())
+        self.assertEqual(Book.objects.count(), 5)
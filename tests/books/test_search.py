@@ -0,0 +1,149 @@
+from datetime import date
+from importlib import import_module
+from unittest import mock
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from bookmanager.books.filters import InternalBooksFilter
+from bookmanager.books.models import Book
+from bookmanager.books.search import (
+    create_search_index,
+    drop_search_index,
+    match_expression,
+    search_books,
+    search_index_available,
+    search_index_complete,
+)
+
+from .factories import BookFactory
+
+
+class MatchExpressionTest(SimpleTestCase):
+    def test_tokens_are_prefixes(self):
+        self.assertEqual(
+            match_expression({"title": "Harry  pot", "author": "row"}),
+            'title : ("Harry"* AND "pot"*) AND author : ("row"*)',
+        )
+
+    def test_operators_and_quotes_are_dropped(self):
+        self.assertEqual(
+            match_expression({"title": 'harry" OR (x*'}),
+            'title : ("harry"* AND "OR"* AND "x"*)',
+        )
+        self.assertEqual(match_expression({"title": "-"}), "")
+
+
+class SearchBooksTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        BookFactory(title="Harry Potter and the Chamber", author="J. K. Rowling")
+        BookFactory(title="Potter", author="Someone")
+        BookFactory(title="The Harrying of the North", author="Historian")
+        BookFactory(
+            title="Long book about many other things and a potter",
+            author="Someone",
+        )
+
+    def search(self, **terms):
+        queryset = Book.objects.order_by("title")
+        return [book.title for book in search_books(queryset, terms)]
+
+    def test_index_is_used_on_sqlite(self):
+        self.assertTrue(search_index_available())
+
+    def test_prefix_tokens(self):
+        self.assertEqual(
+            self.search(title="harr pot"), ["Harry Potter and the Chamber"]
+        )
+        self.assertCountEqual(
+            self.search(title="harry"),
+            ["Harry Potter and the Chamber", "The Harrying of the North"],
+        )
+
+    def test_title_and_author(self):
+        self.assertEqual(
+            self.search(title="potter", author="some"),
+            ["Potter", "Long book about many other things and a potter"],
+        )
+
+    def test_relevance_order(self):
+        self.assertEqual(self.search(title="potter")[0], "Potter")
+
+    def test_index_follows_changes(self):
+        book = Book.objects.get(title="Potter")
+        book.title = "Wheel"
+        book.save()
+        Book.objects.filter(title__startswith="Long").delete()
+        Book.objects.bulk_create(
+            [Book(title="Potter bulk", author="A", published_date=date(2000, 1, 1))]
+        )
+
+        self.assertCountEqual(
+            self.search(title="potter"),
+            ["Harry Potter and the Chamber", "Potter bulk"],
+        )
+        self.assertEqual(self.search(title="wheel"), ["Wheel"])
+
+    @mock.patch("bookmanager.books.search.search_index_available", return_value=False)
+    def test_fallback(self, _):
+        self.assertEqual(
+            self.search(title="arry"),
+            ["Harry Potter and the Chamber", "The Harrying of the North"],
+        )
+
+    def test_filter_keeps_other_lookups(self):
+        BookFactory(title="Potter", language="pl")
+        filterset = InternalBooksFilter(
+            {"title": "potter", "language": "pl"}, queryset=Book.objects.all()
+        )
+        self.assertEqual([book.language for book in filterset.qs], ["pl"])
+
+    def test_views(self):
+        response = self.client.get(reverse("books:search"), {"title": "harr pot"})
+        self.assertEqual(len(response.context["books"]), 1)
+
+        response = self.client.get(
+            reverse("books-apiv1:search"), {"title": "potter", "author": "some"}
+        )
+        self.assertEqual(
+            [book["title"] for book in response.json()["results"]],
+            ["Potter", "Long book about many other things and a potter"],
+        )
+
+
+class SearchIndexTest(TransactionTestCase):
+    def tearDown(self):
+        connection.books_search_index = None
+        create_search_index()
+
+    def test_recreate_index(self):
+        BookFactory(title="Harry Potter")
+        drop_search_index()
+        connection.books_search_index = None
+        self.assertFalse(search_index_available())
+
+        self.assertTrue(create_search_index())
+        connection.books_search_index = None
+        self.assertTrue(search_index_available())
+        self.assertEqual(
+            [
+                book.title
+                for book in search_books(Book.objects.all(), {"title": "harry pot"})
+            ],
+            ["Harry Potter"],
+        )
+
+    def test_migration(self):
+        migration = import_module("bookmanager.books.migrations.0005_book_search_index")
+        schema_editor = mock.Mock(connection=connection)
+        BookFactory(title="Harry Potter")
+
+        migration.drop_search_index(None, schema_editor)
+        self.assertFalse(search_index_complete(connection))
+        migration.create_search_index(None, schema_editor)
+        self.assertTrue(search_index_complete(connection))
+        self.assertEqual(
+            search_books(Book.objects.all(), {"title": "harry"}).count(), 1
+        )
@@ -0,0 +1,74 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from bookmanager.books.utils import DEFAULT_COVER_URI
+
+from .factories import BookFactory
+
+
+class SparseFieldsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.book = BookFactory(title="B", isbn_13="9788375780635", language="pl")
+        BookFactory(title="A", language="pl")
+
+    def get(self, name, params, *args):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse(f"books-apiv1:{name}", args=args), params
+            )
+        self.queries = [query["sql"] for query in queries]
+        return response
+
+    def test_list(self):
+        response = self.get("list", {"fields": "isbn_13, id,title", "limit": 1})
+        data = response.json()
+
+        self.assertEqual(
+            data["results"],
+            [{"id": data["results"][0]["id"], "title": "A", "isbn_13": ""}],
+        )
+        self.assertNotIn("cover_uri", self.queries[1])
+        self.assertNotIn("author", self.queries[1])
+
+        response = self.client.get(data["next"])
+        self.assertEqual(
+            response.json()["results"],
+            [{"id": str(self.book.pk), "title": "B", "isbn_13": "9788375780635"}],
+        )
+
+    def test_search_without_ordering_fields(self):
+        response = self.get("search", {"language": "pl", "fields": "cover_uri"})
+        self.assertEqual(
+            response.json()["results"],
+            [{"cover_uri": DEFAULT_COVER_URI}, {"cover_uri": DEFAULT_COVER_URI}],
+        )
+
+        response = self.get("search", {"title": "b", "fields": "isbn_13"})
+        self.assertEqual(response.json()["results"], [{"isbn_13": "9788375780635"}])
+
+    def test_detail(self):
+        response = self.get("detail", {"fields": "cover_uri,title"}, self.book.pk)
+        self.assertEqual(
+            response.json(), {"title": "B", "cover_uri": DEFAULT_COVER_URI}
+        )
+        # catalog version and book
+        self.assertEqual(len(self.queries), 2)
+        self.assertNotIn("author", self.queries[1])
+
+        response = self.get("detail", {"fields": "isbn_13"}, self.book.pk)
+        self.assertEqual(response.json(), {"isbn_13": "9788375780635"})
+        self.assertEqual(len(self.queries), 2)
+
+    def test_all_fields_by_default(self):
+        response = self.get("detail", {"fields": ""}, self.book.pk)
+        self.assertEqual(len(response.json()), 9)
+
+    def test_unknown_fields(self):
+        for name, args in [("list", []), ("search", []), ("detail", [self.book.pk])]:
+            with self.subTest(name=name):
+                response = self.get(name, {"fields": "title,slug,x"}, *args)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("Unknown fields: slug, x.", response.json()["fields"][0])
@@ -109,3 +109,17 @@ class PaginationTemplateTagTest(SimpleTestCase):
         )
         rendered_template = template_to_render.render(context)
         self.assertTrue("next" in rendered_template)
+
+    def test_pagination_with_huge_total(self):
+        paginator = create_paginator(self.items, 1_000_000_000, 5)
+        page_obj = get_paginator_page(paginator, 5)
+
+        context = Context({"search": "search=Px48", "page_obj": page_obj})
+
+        template_to_render = Template(
+            "{% load books_tags %}" "{% pagination page_obj search%}"
+        )
+        rendered_template = template_to_render.render(context)
+        for page in [1, 3, 4, 5, 6, 7, paginator.num_pages]:
+            self.assertTrue(f"?page={page}&" in rendered_template)
+        self.assertTrue("?page=8&" not in rendered_template)
@@ -7,15 +7,19 @@ from django.test import TestCase
 from django.urls import reverse
 
 from bookmanager.books.utils import (
+    GOOGLE_API_QUERY_PARAMS,
+    GOOGLE_VOLUME_FIELDS,
+    GOOGLE_VOLUME_PARAMS,
     create_paginator,
     get_google_api_books,
     get_paginator_page,
     google_api_query,
     google_book_parser,
+    google_fields_selector,
     identifiers_finder,
 )
 
-from .utils import GOOGLE_API_JSON_RESPONSES_MOCK, RequestResponseMock
+from .utils import GOOGLE_API_JSON_RESPONSES_MOCK, GoogleCacheMixin, RequestResponseMock
 
 
 class TestGoogleParser(TestCase):
@@ -25,6 +29,77 @@ class TestGoogleParser(TestCase):
         self.assertDictEqual(parsed, pattern)
 
 
+class RecordingDict(dict):
+    """Dict recording paths of keys read with get."""
+
+    def __init__(self, data, paths, prefix=""):
+        super().__init__(data)
+        self.paths = paths
+        self.prefix = prefix
+
+    def get(self, key, default=None):
+        path = f"{self.prefix}{key}"
+        self.paths.add(path)
+        value = super().get(key, default)
+        if isinstance(value, dict):
+            return RecordingDict(value, self.paths, f"{path}/")
+        return value
+
+
+class GoogleFieldsTest(TestCase):
+    volume = {
+        "id": "volume",
+        "etag": "etag",
+        "volumeInfo": {
+            "title": "Title",
+            "description": "Long description",
+            "authors": ["A", "B"],
+            "publishedDate": "2004-05",
+            "language": "en",
+            "pageCount": 100,
+            "industryIdentifiers": [{"type": "ISBN_10", "identifier": "8365970392"}],
+            "imageLinks": {"thumbnail": "http://t", "small": "http://s"},
+            "infoLink": "http://info",
+        },
+        "saleInfo": {"country": "PL"},
+    }
+
+    def test_parser_reads_only_projected_fields(self):
+        paths = set()
+        google_book_parser(RecordingDict(self.volume, paths))
+        # parents of read keys are read too, compare leaf paths only
+        leaves = {
+            path
+            for path in paths
+            if not any(other.startswith(f"{path}/") for other in paths)
+        }
+        self.assertEqual(leaves, set(GOOGLE_VOLUME_FIELDS))
+
+    def test_projection_keeps_parsed_data(self):
+        info = self.volume["volumeInfo"]
+        projected = {
+            "id": self.volume["id"],
+            "volumeInfo": {
+                key: info[key]
+                for key in info
+                if f"volumeInfo/{key}" in GOOGLE_VOLUME_FIELDS
+            },
+        }
+        projected["volumeInfo"]["imageLinks"] = {
+            "thumbnail": info["imageLinks"]["thumbnail"]
+        }
+        self.assertEqual(google_book_parser(projected), google_book_parser(self.volume))
+
+    def test_selector(self):
+        self.assertEqual(
+            google_fields_selector(["id", "a/b", "a/c/d", "a/c/e"]), "id,a(b,c(d,e))"
+        )
+        self.assertEqual(
+            GOOGLE_API_QUERY_PARAMS["fields"],
+            f"totalItems,items({GOOGLE_VOLUME_PARAMS['fields']})",
+        )
+
+
 class TestIdentifiersFinder(TestCase):
     def test_correct_identifiers(self):
 
@@ -149,16 +224,19 @@ class GetPaginatorPage(TestCase):
         for page in range(1, ceil(self.total / settings.PAGINATE_BY) + 1):
             paginator = create_paginator(items=self.items, total=self.total, page=page)
 
-            _from = (page - 1) * settings.PAGINATE_BY
-            to = page * settings.PAGINATE_BY
-            for i, _ in enumerate(paginator.object_list[:_from]):
-                self.assertEqual("", paginator.object_list[i])
-
-            for i, _ in enumerate(paginator.object_list[_from:to]):
-                self.assertEqual("#", paginator.object_list[i + _from])
-
-            for i, _ in enumerate(paginator.object_list[to + 1 : -1]):
-                self.assertEqual("", paginator.object_list[to + i])
+            self.assertListEqual(self.items, list(paginator.page(page).object_list))
+            for other in range(1, paginator.num_pages + 1):
+                if other != page:
+                    self.assertEqual(0, len(paginator.page(other).object_list))
+
+    def test_paginator_holds_only_page_items(self):
+        """Check that paginator doesn't build list of length total."""
+        total = 1_000_000_000
+        paginator = create_paginator(items=self.items, total=total, page=3)
+        self.assertEqual(paginator.count, total)
+        self.assertEqual(len(paginator.object_list), settings.PAGINATE_BY)
+        self.assertEqual(paginator.num_pages, ceil(total / settings.PAGINATE_BY))
+        self.assertEqual(get_paginator_page(paginator, 3).number, 3)
 
     def test_paginator_empty_page(self):
         """Test if returned paginator page have correct items.
@@ -185,7 +263,7 @@ def google_uncorrect_json_response(*_) -> RequestResponseMock:
     return RequestResponseMock(status_code=400)
 
 
-class GoogleApisBooks(TestCase):
+class GoogleApisBooks(GoogleCacheMixin, TestCase):
     """Test for get_google_api_books."""
 
     @classmethod
@@ -193,7 +271,7 @@ class GoogleApisBooks(TestCase):
         cls.endpoint = "import-list/search"
 
     @mock.patch(
-        "bookmanager.books.utils.requests.get",
+        "bookmanager.books.google_client.requests.Session.get",
         return_value=google_correct_json_response(),
     )
     def test_get_google_books_with_correct_query(self, google_api_mock):
@@ -207,7 +285,7 @@ class GoogleApisBooks(TestCase):
         self.assertEqual(results[2], 200)  # OK
 
     @mock.patch(
-        "bookmanager.books.utils.requests.get",
+        "bookmanager.books.google_client.requests.Session.get",
         return_value=google_uncorrect_json_response(),
     )
     def test_get_google_books_with_uncorrect_query(self, google_api_mock):
@@ -218,7 +296,9 @@ class GoogleApisBooks(TestCase):
         self.assertIn(
             mock.call(
                 "https://www.googleapis.com/books/v1/volumes?",
-                params={"startIndex": 0, "maxResults": 40},
+                params={"startIndex": 0, **GOOGLE_API_QUERY_PARAMS},
+                headers=None,
+                timeout=mock.ANY,
             ),
             google_api_mock.call_args_list,
         )
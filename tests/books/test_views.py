@@ -1,10 +1,12 @@
 import datetime
 from unittest import mock
 
+from django.conf import settings
 from django.test import TestCase
 from django.urls import reverse
 from factory.fuzzy import FuzzyDate as Fake_Date
 
+from bookmanager.books.google_client import get_client
 from bookmanager.books.models import Book
 from bookmanager.books.views import (
     BookCreateView,
@@ -15,7 +17,14 @@ from bookmanager.books.views import (
 
 from ..utils import request_factory
 from .factories import BookFactory
-from .utils import GOOGLE_API_JSON_RESPONSES_MOCK, RequestResponseMock
+from .utils import (
+    GOOGLE_API_JSON_RESPONSES_MOCK,
+    GoogleCacheMixin,
+    RequestResponseMock,
+    google_response_404,
+    google_search_response,
+    google_volume,
+)
 
 VALID_ISBN10 = "9788362020867"
 VALID_ISBN13 = "978-83-948712-2-2"
@@ -186,7 +195,7 @@ class TestBookSearchListView(TestCase):
         self.assertTrue(book.published_date == self.date_from)
 
 
-class GoogleBookImport(TestCase):
+class GoogleBookImport(GoogleCacheMixin, TestCase):
     """Test views for list books from google api."""
 
     @classmethod
@@ -234,27 +243,34 @@ class GoogleBookImport(TestCase):
         )
         self.assertEqual(response.status_code, 400)
 
+    @mock.patch(
+        "bookmanager.books.views.get_google_api_books", return_value=[[], 0, 503]
+    )
+    def test_google_unavailable(self, _):
+        response = self.client.get(self.url, data={"search": self.search})
+        self.assertTemplateUsed(response, "books/import_unavailable.html")
+        self.assertContains(response, "temporarily unavailable", status_code=503)
+
 
-def google_response_200(*_):
+def google_response_200(*_, **kwargs):
     return RequestResponseMock(
         json_data=GOOGLE_API_JSON_RESPONSES_MOCK["correct"], status_code=200
     )
 
 
-def google_response_404(*_, **kwargs):
-    return RequestResponseMock(status_code=404)
-
-
-class ImportBookView(TestCase):
+class ImportBookView(GoogleCacheMixin, TestCase):
     @classmethod
     def setUpTestData(cls):
         cls.required_context = ["form", "action", "create"]
 
     @mock.patch(
-        "bookmanager.books.views.google_book_parser",
+        "bookmanager.books.utils.google_book_parser",
         return_value=GOOGLE_API_JSON_RESPONSES_MOCK["correct"],
     )
-    @mock.patch("bookmanager.books.views.requests.get", side_effect=google_response_200)
+    @mock.patch(
+        "bookmanager.books.google_client.requests.Session.get",
+        side_effect=google_response_200,
+    )
     def test_import_book_view_with_200_response_from_google(self, *_):
         rev = reverse("books:import-book")
         uri = f"{rev}?id=correct_id"
@@ -264,7 +280,10 @@ class ImportBookView(TestCase):
         for key in self.required_context:
             self.assertTrue(key in response.context.keys())
 
-    @mock.patch("bookmanager.books.views.requests.get", side_effect=google_response_404)
+    @mock.patch(
+        "bookmanager.books.google_client.requests.Session.get",
+        side_effect=google_response_404,
+    )
     def test_import_book_view_with_404_response_from_google(self, *_):
         rev = reverse("books:import-book")
         uri = f"{rev}?id=correct_id"
@@ -272,6 +291,29 @@ class ImportBookView(TestCase):
         self.assertContains(response, "Could not fetch book data")
         self.assertRedirects(response, reverse("books:import-list"))
 
+    @mock.patch("bookmanager.books.google_client.requests.Session.get")
+    def test_import_book_from_search_results_is_not_fetched(self, get_mock):
+        get_mock.return_value = RequestResponseMock(
+            json_data={"totalItems": 1, "items": [google_volume(1)]}
+        )
+        self.client.get(reverse("books:import-list"), {"search": "title"})
+        response = self.client.get(reverse("books:import-book"), {"id": "volume1"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["form"].initial["title"], "Title 1")
+        self.assertEqual(get_mock.call_count, 1)
+
+    @mock.patch("bookmanager.books.google_client.requests.Session.get")
+    def test_import_book_view_when_google_is_unavailable(self, get_mock):
+        for _ in range(get_client().breaker.failure_threshold):
+            get_client().breaker.failure()
+        response = self.client.get(reverse("books:import-book"), {"id": "x"})
+
+        self.assertEqual(response.status_code, 503)
+        self.assertTemplateUsed(response, "books/import_unavailable.html")
+        self.assertContains(response, "temporarily unavailable", status_code=503)
+        get_mock.assert_not_called()
+
 
 class DeleteView(TestCase):
     """Test DeleteView view from .views."""
@@ -301,3 +343,109 @@ class DeleteView(TestCase):
 
         self.client.delete(self.reverse_path)
         self.assertTrue(len(Book.objects.all()) == 0)
+
+
+@mock.patch(
+    "bookmanager.books.google_client.requests.Session.get",
+    side_effect=google_search_response,
+)
+class ImportSelectedView(GoogleCacheMixin, TestCase):
+    """Test bulk import of books selected on ImportList page."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.url = reverse("books:import-selected")
+
+    def test_import_selected(self, get_mock):
+        data = {"search": "harry", "page": "1", "ids": ["volume1", "volume2"]}
+        response = self.client.post(self.url, data=data, follow=True)
+
+        self.assertEqual(Book.objects.count(), 2)
+        self.assertEqual(get_mock.call_count, 1)
+        self.assertContains(response, "Imported 2 books.")
+        self.assertRedirects(
+            response, f"{reverse('books:import-list')}?search=harry&page=1"
+        )
+
+    def test_search_results_are_reused(self, get_mock):
+        self.client.get(reverse("books:import-list"), data={"search": "harry"})
+        data = {"search": "harry", "ids": ["volume1"]}
+        self.client.post(self.url, data=data)
+
+        self.assertEqual(Book.objects.count(), 1)
+        self.assertEqual(get_mock.call_count, 1)
+
+    def test_invalid_rows_are_reported(self, get_mock):
+        data = {"search": "harry", "ids": ["volume1", "volume3"]}
+        response = self.client.post(self.url, data=data, follow=True)
+
+        self.assertEqual(Book.objects.count(), 1)
+        self.assertContains(response, "Imported 1 books.")
+        self.assertContains(response, "volume3 - title")
+
+    def test_missing_volume(self, get_mock):
+        data = {"search": "harry", "ids": ["volume1", "unknown"]}
+        get_mock.side_effect = [google_search_response(), google_response_404()]
+        response = self.client.post(self.url, data=data, follow=True)
+
+        self.assertEqual(Book.objects.count(), 1)
+        self.assertContains(response, "Could not fetch book data - unknown")
+
+    def test_nothing_selected(self, get_mock):
+        response = self.client.post(self.url, data={"search": "harry"}, follow=True)
+
+        self.assertContains(response, "Select books to import.")
+        get_mock.assert_not_called()
+
+    def test_too_many_selected(self, get_mock):
+        ids = [f"volume{i}" for i in range(settings.PAGINATE_BY + 1)]
+        data = {"search": "harry", "ids": ids}
+        response = self.client.post(self.url, data=data, follow=True)
+
+        self.assertContains(
+            response, f"Select at most {settings.PAGINATE_BY} books to import."
+        )
+        self.assertEqual(Book.objects.count(), 0)
+        get_mock.assert_not_called()
+
+    def test_get_not_allowed(self, get_mock):
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+
+
+class ImportedBookUpsertTest(TestCase):
+    """Test that importing the same google volume again updates the book."""
+
+    data = {
+        "title": "Imported",
+        "author": "Author",
+        "language": "en",
+        "published_date": "2020-11-11",
+        "google_id": "volume1",
+    }
+
+    def test_double_submit_creates_one_book(self):
+        self.client.post(reverse("books:add-form"), data=self.data)
+        self.client.post(
+            reverse("books:add-form"), data={**self.data, "title": "Updated"}
+        )
+
+        self.assertEqual(Book.objects.count(), 1)
+        self.assertEqual(Book.objects.get().title, "Updated")
+
+    def test_import_matches_isbn(self):
+        book = BookFactory(isbn_13=VALID_ISBN13)
+        self.client.post(
+            reverse("books:add-form"), data={**self.data, "isbn_13": VALID_ISBN13}
+        )
+
+        book.refresh_from_db()
+        self.assertEqual(Book.objects.count(), 1)
+        self.assertEqual(book.google_id, "volume1")
+
+    def test_books_without_google_id_are_created(self):
+        data = {**self.data, "google_id": ""}
+        self.client.post(reverse("books:add-form"), data=data)
+        self.client.post(reverse("books:add-form"), data=data)
+
+        self.assertEqual(Book.objects.count(), 2)
+        self.assertFalse(Book.objects.filter(google_id="").exists())
@@ -1,5 +1,11 @@
+import json
+import threading
 from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
 
+from bookmanager.books.google_cache import get_cache, get_volume_cache
+from bookmanager.books.google_client import get_client
 from bookmanager.books.utils import DEFAULT_COVER_URI
 
 
@@ -24,6 +30,7 @@ GOOGLE_API_JSON_RESPONSES_MOCK = {
         "isbn_13": "",
         "pages": "",
         "id": "#",
+        "google_id": None,
         "cover_uri": DEFAULT_COVER_URI,
         "self_link": "",
     },
@@ -36,7 +43,123 @@ GOOGLE_API_JSON_RESPONSES_MOCK = {
         "isbn_13": "9788365970398",
         "pages": "1",
         "id": "#",
+        "google_id": "correct_id",
         "cover_uri": DEFAULT_COVER_URI,
         "self_link": "",
     },
 }
+
+
+class GoogleApiStubHandler(BaseHTTPRequestHandler):
+    """Serve volumes of GoogleApiStub like google books api."""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        self.server.requests.append(self.path)
+        volume_id = url.path.rstrip("/").split("/")[-1]
+        etag = None
+        if volume_id != "volumes":
+            status, data = self.server.stub.volume(volume_id)
+            etag = data.get("etag")
+        else:
+            start = int(params.get("startIndex", ["0"])[0])
+            size = int(params.get("maxResults", ["10"])[0])
+            status, data = self.server.stub.search(start, size)
+
+        if etag and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        for name, value in self.server.stub.headers.items():
+            self.send_header(name, value)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class GoogleApiStub:
+    """Local http server imitating google books volumes api.
+
+    Use as context manager, api_url points to volumes endpoint. Volumes with
+    "etag" key are served with ETag header and answer conditional requests.
+    Search responses have given status and headers.
+    """
+
+    def __init__(self, volumes, total=None, status=200, headers=None):
+        self.volumes = volumes
+        self.total = len(volumes) if total is None else total
+        self.status = status
+        self.headers = headers or {}
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), GoogleApiStubHandler)
+        self.server.stub = self
+        self.server.requests = []
+        self.api_url = f"http://127.0.0.1:{self.server.server_port}/books/v1/volumes"
+
+    @property
+    def requests(self):
+        return self.server.requests
+
+    def search(self, start, size):
+        return self.status, {
+            "totalItems": self.total,
+            "items": self.volumes[start : start + size],
+        }
+
+    def volume(self, volume_id):
+        for volume in self.volumes:
+            if volume["id"] == volume_id:
+                return 200, volume
+        return 404, {"error": {"code": 404}}
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def google_volume(number, **volume_info):
+    """Return google api volume item with valid book data."""
+    return {
+        "id": f"volume{number}",
+        "volumeInfo": {
+            "title": f"Title {number}",
+            "authors": ["Author"],
+            "publishedDate": "2004",
+            "language": "en",
+            **volume_info,
+        },
+    }
+
+
+def google_search_response(*_, **kwargs):
+    """Mock of search response with a few volumes, the last without title."""
+    volumes = [google_volume(1), google_volume(2), google_volume(3, title="")]
+    return RequestResponseMock(json_data={"totalItems": 100, "items": volumes})
+
+
+def google_response_404(*_, **kwargs):
+    return RequestResponseMock(status_code=404)
+
+
+class GoogleCacheMixin:
+    """Start every test with empty google caches and closed circuit."""
+
+    def setUp(self):
+        super().setUp()
+        get_cache().clear()
+        get_volume_cache().clear()
+        get_client().breaker.reset()